@@ -0,0 +1,44 @@
+from src.model.approximate import ApproximateKNeighborsClassifier
+from sklearn.neighbors import KNeighborsClassifier
+from time import perf_counter
+import numpy as np
+import sys
+
+def create_clusters(random: np.random.Generator, centers: np.ndarray, n_rows: int, n_features: int) -> tuple[np.ndarray, np.ndarray]:
+    target = random.integers(0, len(centers), n_rows)
+    return (centers[target] + random.normal(0, 0.25, (n_rows, n_features))).astype(np.float32), target
+
+def main(n_train: int, n_test: int, n_features: int) -> None:
+    random = np.random.default_rng(42)
+    centers = random.random((4, n_features))
+    train_features, train_target = create_clusters(random=random, centers=centers, n_rows=n_train, n_features=n_features)
+    test_features, test_target = create_clusters(random=random, centers=centers, n_rows=n_test, n_features=n_features)
+
+    exact_model = KNeighborsClassifier(n_neighbors=5).fit(train_features, train_target)
+    started_at = perf_counter()
+    exact_predictions = exact_model.predict(test_features)
+    exact_seconds = perf_counter() - started_at
+    _, exact_neighbours = exact_model.kneighbors(test_features)
+
+    print(f"train rows {n_train}, test rows {n_test}, features {n_features}")
+    print(f"{'exact':<10} | query {exact_seconds * 1000:9.1f} ms | accuracy {(exact_predictions == test_target).mean():.4f}")
+
+    for n_trees in [1, 2, 4, 8, 16]:
+        started_at = perf_counter()
+        model = ApproximateKNeighborsClassifier(n_neighbors=5, n_trees=n_trees).fit(train_features, train_target)
+        fit_seconds = perf_counter() - started_at
+
+        started_at = perf_counter()
+        predictions = model.predict(test_features)
+        query_seconds = perf_counter() - started_at
+
+        _, neighbours = model.kneighbors(test_features)
+        recall = (neighbours[:, :, None] == exact_neighbours[:, None, :]).any(axis=2).mean()
+        print(f"{n_trees:>2} trees   | query {query_seconds * 1000:9.1f} ms | accuracy {(predictions == test_target).mean():.4f} | recall {recall:.3f} | agreement {(predictions == exact_predictions).mean() * 100:6.2f}% | fit {fit_seconds:.2f} s")
+
+if __name__ == "__main__":
+    main(
+        n_train=int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+        n_test=int(sys.argv[2]) if len(sys.argv) > 2 else 20_000,
+        n_features=int(sys.argv[3]) if len(sys.argv) > 3 else 5,
+    )
@@ -0,0 +1,58 @@
+from src.model.compiled_tree import CompiledDecisionTree
+from sklearn.tree import DecisionTreeClassifier
+from src.config.main import FEATURE_COLUMNS
+from time import perf_counter
+from pandas import DataFrame
+import numpy as np
+import sys
+
+def time_per_call(predict, samples: list) -> float:
+    started_at = perf_counter()
+    for sample in samples:
+        predict(sample)
+
+    return (perf_counter() - started_at) / len(samples)
+
+def main(n_train: int, n_calls: int, n_batch: int) -> None:
+    random = np.random.default_rng(42)
+    train_features = DataFrame(random.random((n_train, len(FEATURE_COLUMNS)), dtype=np.float32), columns=FEATURE_COLUMNS)
+    target = random.choice(np.array(["High", "Low", "Middle", "very_low"]), size=n_train)
+    model = DecisionTreeClassifier(random_state=42).fit(train_features, target)
+
+    started_at = perf_counter()
+    compiled_tree = CompiledDecisionTree.from_model(model)
+    compile_seconds = perf_counter() - started_at
+
+    samples = random.random((n_calls, len(FEATURE_COLUMNS))).tolist()
+    frames = [DataFrame([sample], columns=FEATURE_COLUMNS, dtype="float32") for sample in samples]
+    expected = model.predict(DataFrame(samples, columns=FEATURE_COLUMNS))
+
+    print(f"train rows {n_train}, nodes {model.tree_.node_count}, depth {compiled_tree.max_depth}, compile {compile_seconds * 1000:.1f} ms, source {len(compiled_tree.to_source()) / 1024:.0f} KiB")
+    print(f"matches predict: generated {all(compiled_tree.predict_one(sample) == label for sample, label in zip(samples, expected))}, flat arrays {all(compiled_tree.walk(sample) == label for sample, label in zip(samples, expected))}")
+
+    # The one row DataFrame is what the menu built before, its construction is part of the call
+    baseline = time_per_call(lambda sample: model.predict(DataFrame([sample], columns=FEATURE_COLUMNS, dtype="float32")), samples)
+    single_paths = {
+        "sklearn (one row DataFrame)": baseline,
+        "sklearn (prebuilt DataFrame)": time_per_call(model.predict, frames),
+        "flat arrays (float list)": time_per_call(compiled_tree.walk, samples),
+        "generated (float list)": time_per_call(compiled_tree.predict_one, samples),
+        "generated (NumPy row)": time_per_call(compiled_tree.predict_one, list(np.asarray(samples))),
+    }
+    for name, seconds in single_paths.items():
+        print(f"{name:<29} | {seconds * 1e6:9.2f} us/call | {baseline / seconds:7.1f}x")
+
+    batch = random.random((n_batch, len(FEATURE_COLUMNS)))
+    batch_frame = DataFrame(batch, columns=FEATURE_COLUMNS)
+    for name, predict in {"sklearn batch": lambda: model.predict(batch_frame), "compiled batch": lambda: compiled_tree.predict(batch)}.items():
+        started_at = perf_counter()
+        predict()
+        seconds = perf_counter() - started_at
+        print(f"{name:<29} | {seconds * 1000:9.2f} ms for {n_batch} rows")
+
+if __name__ == "__main__":
+    main(
+        n_train=int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+        n_calls=int(sys.argv[2]) if len(sys.argv) > 2 else 5_000,
+        n_batch=int(sys.argv[3]) if len(sys.argv) > 3 else 100_000,
+    )
@@ -0,0 +1,43 @@
+from sklearn.neighbors import KNeighborsClassifier
+from src.model.knn import BatchedKNeighbors
+from resource import RUSAGE_SELF, getrusage
+from src.config.main import FEATURE_COLUMNS
+from subprocess import run
+from hashlib import sha256
+from time import perf_counter
+from pandas import DataFrame
+import numpy as np
+import sys
+
+def create_model_and_test_features(algorithm: str, n_train: int, n_test: int) -> tuple[KNeighborsClassifier, DataFrame]:
+    random = np.random.default_rng(42)
+    train_features = DataFrame(random.random((n_train, len(FEATURE_COLUMNS)), dtype=np.float32), columns=FEATURE_COLUMNS)
+    test_features = DataFrame(random.random((n_test, len(FEATURE_COLUMNS)), dtype=np.float32), columns=FEATURE_COLUMNS)
+    target = random.choice(np.array(["High", "Low", "Middle", "very_low"]), size=n_train)
+
+    return KNeighborsClassifier(n_neighbors=5, algorithm=algorithm).fit(train_features, target), test_features
+
+def measure(engine: str, algorithm: str, n_train: int, n_test: int) -> None:
+    # Runs in its own process so the peak RSS belongs to one prediction path only
+    model, test_features = create_model_and_test_features(algorithm=algorithm, n_train=n_train, n_test=n_test)
+    baseline_rss = getrusage(RUSAGE_SELF).ru_maxrss
+
+    started_at = perf_counter()
+    predictions = model.predict(test_features) if engine == "sklearn" else BatchedKNeighbors(model).predict(test_features)
+    seconds = perf_counter() - started_at
+
+    peak_rss = getrusage(RUSAGE_SELF).ru_maxrss
+    digest = sha256("\n".join(predictions).encode()).hexdigest()[:12]
+    print(f"{algorithm:<8} {engine:<8} | {seconds * 1000:9.1f} ms | {n_test / seconds:10.0f} rows/s | peak RSS {peak_rss / 1024:8.1f} MiB (+{(peak_rss - baseline_rss) / 1024:.1f}) | predictions {digest}")
+
+def main(n_train: int, n_test: int) -> None:
+    print(f"train rows {n_train}, test rows {n_test}")
+    for algorithm in ["kd_tree", "brute"]:
+        for engine in ["sklearn", "batched"]:
+            run([sys.executable, "-m", "benchmarks.knn_predict", "--measure", engine, algorithm, str(n_train), str(n_test)], check=True)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--measure":
+        measure(engine=sys.argv[2], algorithm=sys.argv[3], n_train=int(sys.argv[4]), n_test=int(sys.argv[5]))
+    else:
+        main(n_train=int(sys.argv[1]) if len(sys.argv) > 1 else 200_000, n_test=int(sys.argv[2]) if len(sys.argv) > 2 else 50_000)
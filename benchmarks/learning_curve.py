@@ -0,0 +1,52 @@
+from src.config.main import FEATURE_COLUMNS, RESULTS_FOLDER, SPLIT_COLUMN, SPLIT_VALUES, TARGET_COLUMN
+from src.model.learning_curve import summarize_learning_curve
+from argparse import ArgumentParser, Namespace
+from tempfile import TemporaryDirectory
+from src.utils.file import create_folder
+from src.menu.dataset import DatasetMenu
+from src.model.main import Model
+from time import perf_counter
+from datetime import datetime
+from pandas import DataFrame
+import numpy as np
+
+def write_synthetic_dataset(file_path: str, n_train: int, n_test: int) -> None:
+    random = np.random.default_rng(42)
+    labels = np.array(["High", "Low", "Middle", "very_low"])
+    centres = random.random((len(labels), len(FEATURE_COLUMNS)))
+
+    target = random.integers(0, len(labels), n_train + n_test)
+    dataframe = DataFrame((centres[target] + random.normal(0, 0.25, (target.size, len(FEATURE_COLUMNS)))).astype(np.float32), columns=FEATURE_COLUMNS)
+    dataframe[TARGET_COLUMN] = labels[target]
+    dataframe[SPLIT_COLUMN] = np.where(np.arange(target.size) < n_train, SPLIT_VALUES["train"], SPLIT_VALUES["test"])
+    dataframe.to_csv(file_path, index=False)
+
+def main(arguments: Namespace) -> None:
+    model = Model()
+    create_folder(folder_path=RESULTS_FOLDER)
+    output_path = f"{RESULTS_FOLDER}/learning_curve_{datetime.now().timestamp()}.csv"
+
+    with TemporaryDirectory() as folder:
+        dataset_path = arguments.dataset
+        if arguments.rows:
+            dataset_path = f"{folder}/synthetic.csv"
+            write_synthetic_dataset(file_path=dataset_path, n_train=arguments.rows, n_test=arguments.test_rows)
+
+        model.load_dataset(file_path=dataset_path)
+        started_at = perf_counter()
+        points = model.run_learning_curve(output_path=output_path, n_repeats=arguments.repeats)
+        seconds = perf_counter() - started_at
+
+    DatasetMenu(dataset=model.get_dataset()).render_learning_curve(summary=summarize_learning_curve(points))
+    print(f"\n{len(points)} points in {seconds:.2f} s, written to {output_path}")
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(description="Fit every classifier on growing fractions of the training set and report how time, memory and accuracy scale")
+    parser.add_argument("--dataset", default="datasets/Data_User_Modeling_Dataset_Hamdi Tolga KAHRAMAN.xls")
+    parser.add_argument("--rows", type=int, help="Use a synthetic dataset with this many training rows instead of --dataset")
+    parser.add_argument("--test-rows", type=int, default=10_000, help="Test rows of the synthetic dataset")
+    parser.add_argument("--repeats", type=int, default=3)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    main(parse_arguments())
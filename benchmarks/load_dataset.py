@@ -0,0 +1,61 @@
+from tracemalloc import get_traced_memory, start, stop
+from src.config.main import DATASETS_FOLDER, TARGET_COLUMN
+from src.types.dataclass import Dataset
+from time import perf_counter
+from src.model.main import Model
+from typing import Callable
+from os import listdir
+import sys
+
+def load_dataset_eager(model: Model, file_path: str, load_rows: int) -> Dataset:
+    # The Dataset before the lazy rewrite: frames, splits, preview rows and statistics built up front
+    dataset = model.load_dataset(file_path=file_path, load_rows=load_rows)
+    train_dataframe, test_dataframe = dataset.dataframes
+    for dataframe in [train_dataframe, test_dataframe]:
+        dataframe.drop(columns=TARGET_COLUMN).copy(), dataframe[TARGET_COLUMN].copy()
+        dataframe.head(load_rows).to_dict(orient="records")
+        model.get_basic_statistics(dataframe)
+
+    return dataset
+
+def measure(load: Callable[[Model, str, int], Dataset], file_path: str) -> tuple[Model, Dataset, float, int]:
+    model = Model()
+    # Warm the parsed dataset cache so only the Dataset construction is measured
+    if not file_path.endswith((".csv", ".parquet")):
+        model.read_file(file_path)
+
+    start()
+    started_at = perf_counter()
+    dataset = load(model, file_path, 10)
+    seconds = perf_counter() - started_at
+    _, peak = get_traced_memory()
+    stop()
+
+    return model, dataset, seconds, peak
+
+def load_dataset_lazy(model: Model, file_path: str, load_rows: int) -> Dataset:
+    return model.load_dataset(file_path=file_path, load_rows=load_rows)
+
+def main(file_path: str) -> None:
+    # An untimed run pays for the lazy imports of both paths
+    measure(load=load_dataset_eager, file_path=file_path)
+
+    _, _, eager_seconds, eager_peak = measure(load=load_dataset_eager, file_path=file_path)
+    model, dataset, load_seconds, load_peak = measure(load=load_dataset_lazy, file_path=file_path)
+
+    start()
+    started_at = perf_counter()
+    model.train_model(classifier="Decision Tree", random_state=42, n_neighbors=None)
+    train_seconds = perf_counter() - started_at
+    current, train_peak = get_traced_memory()
+    stop()
+
+    print(file_path)
+    print(f"{'eager load (baseline)':<30} | {eager_seconds * 1000:9.2f} ms | peak {eager_peak / 1024 ** 2:8.2f} MiB")
+    print(f"{'load_dataset':<30} | {load_seconds * 1000:9.2f} ms | peak {load_peak / 1024 ** 2:8.2f} MiB")
+    print(f"{'first train (Decision Tree)':<30} | {train_seconds * 1000:9.2f} ms | peak {train_peak / 1024 ** 2:8.2f} MiB")
+    print(f"{'retained after training':<30} | {'':>12} | {current / 1024 ** 2:13.2f} MiB")
+    print(f"{'train rows':<30} | {len(dataset.train_target)}")
+
+if __name__ == "__main__":
+    main(file_path=sys.argv[1] if len(sys.argv) > 1 else f"{DATASETS_FOLDER}/{sorted(listdir(DATASETS_FOLDER))[0]}")
@@ -0,0 +1,71 @@
+from asyncio import StreamReader, StreamWriter, gather, open_connection, open_unix_connection, run
+from src.config.main import FEATURE_COLUMNS, PREDICTION_SERVER_HOST, PREDICTION_SERVER_PORT
+from argparse import ArgumentParser, Namespace
+from time import perf_counter
+from json import dumps, loads
+import numpy as np
+
+async def connect(arguments: Namespace) -> tuple[StreamReader, StreamWriter]:
+    if arguments.unix_socket:
+        return await open_unix_connection(arguments.unix_socket)
+
+    return await open_connection(arguments.host, arguments.port)
+
+async def send(reader: StreamReader, writer: StreamWriter, method: str, path: str, payload: dict | None = None) -> dict:
+    body = dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+
+    status_line = await reader.readline()
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode().partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    response = loads(await reader.readexactly(int(headers["content-length"])))
+    if b" 200 " not in status_line:
+        raise RuntimeError(f"{status_line.decode().strip()}: {response}")
+
+    return response
+
+async def client(arguments: Namespace, n_requests: int, random: np.random.Generator, latencies: list[float]) -> None:
+    reader, writer = await connect(arguments)
+    for _ in range(n_requests):
+        samples = random.random((arguments.samples_per_request, len(FEATURE_COLUMNS))).round(4).tolist()
+
+        started_at = perf_counter()
+        await send(reader=reader, writer=writer, method="POST", path="/predict", payload={"samples": samples})
+        latencies.append(perf_counter() - started_at)
+
+    writer.close()
+
+async def main(arguments: Namespace) -> None:
+    random = np.random.default_rng(42)
+    requests_per_client = [len(part) for part in np.array_split(np.arange(arguments.requests), arguments.concurrency)]
+    latencies: list[float] = []
+
+    started_at = perf_counter()
+    await gather(*[client(arguments=arguments, n_requests=n_requests, random=random, latencies=latencies) for n_requests in requests_per_client])
+    seconds = perf_counter() - started_at
+
+    reader, writer = await connect(arguments)
+    stats = await send(reader=reader, writer=writer, method="GET", path="/stats")
+    writer.close()
+
+    latencies_ms = np.asarray(latencies) * 1000
+    print(f"{arguments.requests} requests x {arguments.samples_per_request} samples from {arguments.concurrency} connections in {seconds:.2f} s")
+    print(f"client | {arguments.requests / seconds:9,.0f} requests/s | p50 {np.percentile(latencies_ms, 50):7.2f} ms | p99 {np.percentile(latencies_ms, 99):7.2f} ms")
+    print(f"server | {stats['batches']:9,} batches, {stats['mean_batch_size']:.1f} samples each | p50 {stats['p50_latency'] * 1000:7.2f} ms | p99 {stats['p99_latency'] * 1000:7.2f} ms (queueing + prediction)")
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(description="Send concurrent POST /predict requests to a running prediction server (python main.py --serve)")
+    parser.add_argument("--host", default=PREDICTION_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=PREDICTION_SERVER_PORT)
+    parser.add_argument("--unix-socket", metavar="PATH")
+    parser.add_argument("--concurrency", type=int, default=64, help="Simultaneous connections")
+    parser.add_argument("--requests", type=int, default=20_000, help="Requests over all connections")
+    parser.add_argument("--samples-per-request", type=int, default=1)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    run(main(parse_arguments()))
@@ -0,0 +1,45 @@
+from src.config.main import DATASETS_FOLDER, FEATURE_COLUMNS, TARGET_COLUMN
+from pandas import DataFrame, read_excel
+from time import perf_counter
+from src.model.main import Model
+from typing import Callable
+from os import listdir
+import sys
+
+def read_file_legacy(file_path: str) -> tuple[DataFrame, DataFrame]:
+    # The reader before the single-open rewrite: one full parse per sheet, pruned afterwards
+    train_dataframe = read_excel(file_path, sheet_name=1)
+    test_dataframe = read_excel(file_path, sheet_name=2)
+
+    train_dataframe.columns = train_dataframe.columns.str.strip().str.upper()
+    test_dataframe.columns = test_dataframe.columns.str.strip().str.upper()
+
+    relevant_columns = FEATURE_COLUMNS + [TARGET_COLUMN]
+    return train_dataframe[relevant_columns], test_dataframe[relevant_columns]
+
+def measure(read: Callable[[str], tuple[DataFrame, DataFrame]], file_path: str, repeats: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeats):
+        start = perf_counter()
+        dataframes = read(file_path)
+        timings.append(perf_counter() - start)
+
+    resident_size = sum(int(dataframe.memory_usage(deep=True).sum()) for dataframe in dataframes)
+    return min(timings), resident_size
+
+def main(file_path: str, repeats: int) -> None:
+    model = Model()
+    model.dataset_cache.enabled = False
+
+    results = {
+        "legacy (2 opens, all columns, float64/object)": measure(read_file_legacy, file_path, repeats),
+        "single open, pruned, float32/category": measure(model.read_file, file_path, repeats),
+    }
+
+    print(f"{file_path} (best of {repeats})")
+    for name, (seconds, resident_size) in results.items():
+        print(f"{name:<50} | {seconds * 1000:8.2f} ms | {resident_size / 1024:8.1f} KiB")
+
+if __name__ == "__main__":
+    default_file = f"{DATASETS_FOLDER}/{sorted(listdir(DATASETS_FOLDER))[0]}"
+    main(file_path=sys.argv[1] if len(sys.argv) > 1 else default_file, repeats=int(sys.argv[2]) if len(sys.argv) > 2 else 20)
@@ -1,11 +1,99 @@
+from src.config.main import DATASET_CHUNK_SIZE, PREDICTION_SERVER_HOST, PREDICTION_SERVER_MAX_BATCH_SIZE, PREDICTION_SERVER_MAX_WAIT, PREDICTION_SERVER_PORT, RESULTS_FOLDER
+from src.utils.file import create_folder, get_latest_session
+from argparse import ArgumentParser, Namespace
+from src.server.main import run_prediction_server
+from src.model.stream import FILE_READ_ERRORS
 from src.model.main import Model
+from src.menu.dataset import DatasetMenu
 from src.menu.main import Menu
+from os import path
+import sys
+
+def parse_arguments():
+    parser = ArgumentParser(description="Train and evaluate models on the datasets folder")
+    parser.add_argument("--session", help="Restore a saved session file (dataset, trained models and evaluations) on startup")
+    parser.add_argument("--latest", action="store_true", help="Restore the most recently saved session on startup")
+    parser.add_argument("--predict", metavar="FILE", help="Predict the STG/SCG/STR/LPR/PEG rows of a CSV, Parquet or Excel file without the menu and exit")
+    parser.add_argument("--output", metavar="FILE", help="CSV or Parquet file for the --predict results (default: results/<input name>_predictions.csv)")
+    parser.add_argument("--evaluate", metavar="FILE", help="Evaluate every trained model on a labelled CSV, Parquet or Excel file (STG/SCG/STR/LPR/PEG and UNS columns) without the menu and exit")
+    parser.add_argument("--chunk-size", type=int, default=DATASET_CHUNK_SIZE, help="Rows read and predicted at a time by --predict and --evaluate")
+    parser.add_argument("--serve", action="store_true", help="Serve POST /predict and GET /stats over HTTP on localhost without the menu")
+    parser.add_argument("--host", default=PREDICTION_SERVER_HOST, help=f"With --serve: address to listen on (default: {PREDICTION_SERVER_HOST})")
+    parser.add_argument("--port", type=int, default=PREDICTION_SERVER_PORT, help=f"With --serve: port to listen on (default: {PREDICTION_SERVER_PORT})")
+    parser.add_argument("--unix-socket", metavar="PATH", help="With --serve: listen on this Unix socket instead of TCP")
+    parser.add_argument("--max-batch-size", type=int, default=PREDICTION_SERVER_MAX_BATCH_SIZE, help="With --serve: most samples gathered into one estimator call")
+    parser.add_argument("--max-wait-ms", type=float, default=PREDICTION_SERVER_MAX_WAIT * 1000, help="With --serve: longest a request waits for its batch to fill")
+    parser.add_argument("--dataset", metavar="FILE", help="With --predict/--evaluate/--serve: train on this dataset instead of using the model of a restored session")
+    parser.add_argument("--classifier", choices=["K Nearest Neighbors", "Decision Tree"], default="K Nearest Neighbors", help="With --dataset: the model to train (default: K Nearest Neighbors)")
+    return parser.parse_args()
+
+def train_from_arguments(model: Model, arguments: Namespace) -> None:
+    if arguments.dataset:
+        model.load_dataset(file_path=arguments.dataset)
+        model.train_model(classifier=arguments.classifier, random_state=42, n_neighbors=5)
+
+def has_trained_model(model: Model) -> bool:
+    dataset = model.get_dataset()
+    if dataset and (dataset.k_nearest_neighbors or dataset.decision_tree):
+        return True
+
+    print("No trained model. Pass --session/--latest with a saved model or --dataset to train one.", file=sys.stderr)
+    return False
+
+def predict_file(model: Model, arguments: Namespace) -> int:
+    output_path = arguments.output
+    if not output_path:
+        create_folder(folder_path=RESULTS_FOLDER)
+        output_path = f"{RESULTS_FOLDER}/{path.splitext(path.basename(arguments.predict))[0]}_predictions.csv"
+
+    try:
+        summary = model.predict_file(input_path=arguments.predict, output_path=output_path, chunk_size=arguments.chunk_size)
+    except FILE_READ_ERRORS as error:
+        print(f"\n{error.__class__.__name__}: {error}", file=sys.stderr)
+        return 1
+
+    print(f"\n{summary.rows:,} predictions written to {summary.output_path} in {summary.seconds:.2f} s ({summary.rows / max(summary.seconds, 1e-9):,.0f} rows/s)")
+    return 0
+
+def evaluate_file(model: Model, arguments: Namespace) -> int:
+    try:
+        evaluations = model.evaluate_file(input_path=arguments.evaluate, chunk_size=arguments.chunk_size)
+    except FILE_READ_ERRORS as error:
+        print(f"\n{error.__class__.__name__}: {error}", file=sys.stderr)
+        return 1
+
+    print()
+    DatasetMenu(dataset=model.get_dataset()).render_model_evaluation()
+    for evaluation in evaluations:
+        print(f"{evaluation.name}: accuracy {evaluation.accuracy:.4f} on {int(evaluation.confusion_matrix.counts.sum()):,} rows, predicted in {evaluation.predict_seconds:.2f} s")
+
+    return 0
 
 def main():
+    arguments = parse_arguments()
     model = Model()
 
+    session_path = get_latest_session() if arguments.latest else arguments.session
+    if session_path:
+        model.load_progress(file_path=session_path)
+
+    if arguments.predict or arguments.evaluate or arguments.serve:
+        train_from_arguments(model=model, arguments=arguments)
+        if not has_trained_model(model):
+            sys.exit(1)
+
+    if arguments.predict:
+        sys.exit(predict_file(model=model, arguments=arguments))
+
+    if arguments.evaluate:
+        sys.exit(evaluate_file(model=model, arguments=arguments))
+
+    if arguments.serve:
+        run_prediction_server(model=model, host=arguments.host, port=arguments.port, unix_socket=arguments.unix_socket, max_batch_size=arguments.max_batch_size, max_wait=arguments.max_wait_ms / 1000)
+        return
+
     menu = Menu(model=model)
     menu.start()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -2,8 +2,13 @@ options = [
     "Load dataset",
     "Train model",
     "Evaluate model",
+    "Evaluate models on a labelled file",
+    "Learning curve benchmark",
+    "Evaluation settings",
     "Predict a target by new features sample",
-    "Save progress to a file"
+    "Predict targets from a file",
+    "Save progress to a file",
+    "Load progress from a file",
 ]
 
 title = "Train a model"
@@ -16,9 +21,86 @@ menu_config = {
 train_model_options = [
     "K Nearest Neighbors",
     "Decision Tree",
+    "Decision Tree (pruned)",
+    "K Nearest Neighbors (approximate)",
+    "K Nearest Neighbors (search)",
+    "Decision Tree (search)",
 ]
 
-SUPPORTED_DATASET_EXTENSIONS: list[str] = ["xls", "xlsx"]
+HYPERPARAMETER_SEARCH_SPACES: dict[str, dict[str, list]] = {
+    "K Nearest Neighbors": {
+        "n_neighbors": [1, 3, 5, 7, 9, 11, 15, 21, 31],
+        "weights": ["uniform", "distance"],
+        "metric": ["euclidean", "manhattan", "chebyshev"],
+    },
+    "Decision Tree": {
+        "max_depth": [None, 2, 3, 4, 5, 6, 8, 10, 12],
+        "min_samples_leaf": [1, 2, 4, 8, 16],
+        "criterion": ["gini", "entropy", "log_loss"],
+    },
+}
+CROSS_VALIDATION_FOLDS = 5
+CROSS_VALIDATION_REPEATS = 1
+
+EVALUATION_CROSS_VALIDATE = False
+EVALUATION_BOOTSTRAP = False
+
+EVALUATION_LATENCY_SAMPLES = 200
+
+EVALUATION_PREDICTION_SAMPLE_SIZE = 1_000
+
+BOOTSTRAP_REPLICATES = 2_000
+BOOTSTRAP_CONFIDENCE = 0.95
+BOOTSTRAP_MEMORY_BUDGET = 64 * 1024 ** 2
+
+LEARNING_CURVE_CLASSIFIERS: dict[str, dict] = {
+    "K Nearest Neighbors": {"n_neighbors": 5},
+    "Decision Tree": {"random_state": 42},
+}
+LEARNING_CURVE_FRACTIONS: list[float] = [0.1, 0.2, 0.4, 0.6, 0.8, 1.0]
+LEARNING_CURVE_REPEATS = 3
+
+DECISION_TREE_PRUNING_VALIDATION_FRACTION = 0.2
+DECISION_TREE_PRUNING_TOLERANCE = 0.01
+
+FEATURE_COLUMNS: list[str] = ["STG", "SCG", "STR", "LPR", "PEG"]
+TARGET_COLUMN = "UNS"
+PREDICTION_COLUMN = f"PREDICTED_{TARGET_COLUMN}"
+
+SUPPORTED_DATASET_EXTENSIONS: list[str] = ["xls", "xlsx", "csv", "parquet"]
+STREAMING_DATASET_EXTENSIONS: list[str] = ["csv", "parquet"]
+
+SPLIT_COLUMN = "SPLIT"
+SPLIT_VALUES: dict[str, str] = {"train": "train", "test": "test"}
+DATASET_CHUNK_SIZE = 100_000
+
+DATASET_REGISTRY_MEMORY_BUDGET = 512 * 1024 ** 2
+
+KNN_PREDICTION_MEMORY_BUDGET = 64 * 1024 ** 2
+
+# None keeps every appended sample
+KNN_ONLINE_MAX_SAMPLES: int | None = None
+KNN_ONLINE_REBUILD_FRACTION = 0.25
+
+APPROXIMATE_KNN_TREES = 8
+APPROXIMATE_KNN_LEAF_SIZE = 16
+
+TRAINING_CACHE_MEMORY_BUDGET = 256 * 1024 ** 2
+TRAINING_CACHE_DISK_BUDGET = 1024 ** 3
+
+PREDICTION_CACHE_SIZE = 10_000
+# Decimal places feature vectors are rounded to before the lookup, None matches them exactly
+PREDICTION_CACHE_PRECISION: int | None = None
+
+PREDICTION_SERVER_HOST = "127.0.0.1"
+PREDICTION_SERVER_PORT = 8765
+PREDICTION_SERVER_MAX_BATCH_SIZE = 256
+PREDICTION_SERVER_MAX_WAIT = 0.002
 
 DATASETS_FOLDER = "datasets"
-RESULTS_FOLDER = "results"
\ No newline at end of file
+RESULTS_FOLDER = "results"
+SESSION_FILE_EXTENSION = "npz"
+DATASETS_CACHE_FOLDER = ".datasets_cache"
+APPROXIMATE_KNN_INDEX_FOLDER = f"{DATASETS_CACHE_FOLDER}/approximate_knn"
+# None keeps fitted models in memory only
+TRAINING_CACHE_FOLDER: str | None = f"{DATASETS_CACHE_FOLDER}/models"
\ No newline at end of file
@@ -1,4 +1,6 @@
-from src.types.dataclass import Dataset
+from src.types.dataclass import BootstrapResult, Dataset, ModelEvaluation, PairedBootstrap, PruningCandidate, SearchResult
+from src.model.metrics import get_prediction_distribution
+from pandas import DataFrame
 
 class DatasetMenu:
     def __init__(self, dataset: Dataset) -> None:
@@ -105,9 +107,47 @@ class DatasetMenu:
         self.render_accuracy(evaluation)
         self.render_predictions(evaluation)
         self.render_classification_report(evaluation)
+        if evaluation.approximation_drift:
+            self.render_approximation_drift(evaluation.approximation_drift)
+        if evaluation.cross_validation:
+            self.render_cross_validation(evaluation.cross_validation)
+        if evaluation.bootstrap:
+            self.render_bootstrap(evaluation.bootstrap)
         
         print("-" * 120)
 
+    def render_approximation_drift(self, drift) -> None:
+        print(f"\nApproximate vs exact K Nearest Neighbors ({drift.n_trees} trees, leaf size {drift.leaf_size}):")
+        print(f"  Neighbour recall: {drift.neighbour_recall:.3f} | Same prediction: {drift.prediction_agreement * 100:.2f}%")
+        print(f"  Accuracy: {drift.approximate_accuracy:.4f} vs {drift.exact_accuracy:.4f} exact ({drift.approximate_accuracy - drift.exact_accuracy:+.4f})")
+        print(f"  Prediction time: {drift.approximate_seconds * 1000:.2f} ms vs {drift.exact_seconds * 1000:.2f} ms exact ({drift.exact_seconds / max(drift.approximate_seconds, 1e-9):.2f}x)")
+
+    def render_cross_validation(self, cross_validation) -> None:
+        kind = "Stratified k-fold" if cross_validation.stratified else "k-fold"
+        print(f"\nCross-Validation ({kind}, {cross_validation.n_splits} folds x {cross_validation.n_repeats} repeats):")
+
+        for fold in cross_validation.folds:
+            print(f"  Repeat {fold.repeat + 1} Fold {fold.fold + 1:>2} | Accuracy: {fold.accuracy:.3f} | Precision: {fold.precision:.3f} | Recall: {fold.recall:.3f} | F1: {fold.f1_score:.3f}")
+
+        mean, std = cross_validation.mean, cross_validation.std
+        print(f"  {'Mean ± std':<17} | Accuracy: {mean['accuracy']:.3f} ± {std['accuracy']:.3f} | F1: {mean['f1_score']:.3f} ± {std['f1_score']:.3f} | Fit: {mean['fit_time'] * 1000:.2f} ms")
+
+    def render_bootstrap(self, bootstrap: BootstrapResult) -> None:
+        accuracy = bootstrap.accuracy
+        print(f"\nBootstrap {bootstrap.confidence:.0%} confidence intervals ({bootstrap.n_replicates:,} replicates):")
+        print(f"  {'Accuracy':<15} | {accuracy.estimate:.4f} [{accuracy.lower:.4f}, {accuracy.upper:.4f}]")
+
+        for label, f1_score in bootstrap.f1_scores.items():
+            print(f"  {'F1 ' + label:<15} | {f1_score.estimate:.4f} [{f1_score.lower:.4f}, {f1_score.upper:.4f}]")
+
+    def render_paired_bootstrap(self, paired_bootstrap: PairedBootstrap) -> None:
+        accuracy, macro_f1 = paired_bootstrap.accuracy_difference, paired_bootstrap.macro_f1_difference
+        print(f"\nPaired bootstrap, {paired_bootstrap.first_name} - {paired_bootstrap.second_name} ({paired_bootstrap.n_replicates:,} replicates, {paired_bootstrap.confidence:.0%} intervals):")
+        print(f"  Accuracy: {accuracy.estimate:+.4f} [{accuracy.lower:+.4f}, {accuracy.upper:+.4f}] | Macro F1: {macro_f1.estimate:+.4f} [{macro_f1.lower:+.4f}, {macro_f1.upper:+.4f}]")
+
+        verdict = "differ" if accuracy.lower > 0 or accuracy.upper < 0 else "do not clearly differ"
+        print(f"  {paired_bootstrap.first_name} more accurate in {paired_bootstrap.probability_first_better * 100:.1f}% of replicates, the accuracies {verdict}")
+
     def render_accuracy(self, evaluation) -> None:
         accuracy_header = "Accuracy:"
         accuracy_value = f"{evaluation.accuracy:.4f} ({evaluation.accuracy * 100:.2f}%)"
@@ -119,8 +159,10 @@ class DatasetMenu:
     def render_predictions(self, evaluation) -> None:
         predictions = evaluation.precisions
         
-        unique_predictions = predictions.value_counts()
-        total_predictions = len(predictions)
+        # Evaluations restored from older sessions have no confusion matrix to read the counts from
+        unique_predictions = get_prediction_distribution(evaluation.confusion_matrix) if evaluation.confusion_matrix else predictions.value_counts()
+        # Streamed evaluations only keep the first predictions, the confusion matrix counts all of them
+        total_predictions = int(evaluation.confusion_matrix.counts.sum()) if evaluation.confusion_matrix else len(predictions)
         
         print(f"\nPredictions Summary:")
         print(f"Total predictions: {total_predictions}")
@@ -134,8 +176,8 @@ class DatasetMenu:
         for i, pred in enumerate(predictions.head(10)):
             print(f"  {i+1:2d}. {pred}")
         
-        if len(predictions) > 10:
-            print(f"  ... and {len(predictions) - 10} more")
+        if total_predictions > 10:
+            print(f"  ... and {total_predictions - 10} more")
 
     def render_classification_report(self, evaluation) -> None:
         report = evaluation.classification_report
@@ -169,6 +211,96 @@ class DatasetMenu:
             left_padding = " " * (self.width - len(metrics_line))
             print(f"{metrics_line}{left_padding} |")
 
+    def render_search_results(self, results: list[SearchResult], top: int = 10) -> None:
+        print(f"\n{' ' * 20}Hyperparameter Search: {results[0].classifier} ({len(results)} candidates)")
+        print("-" * 120)
+
+        for result in results[:top]:
+            parameters = ", ".join(f"{name}={value}" for name, value in result.parameters.items())
+            print(f"{result.rank:>3}. Accuracy: {result.mean_score:.4f} ± {result.std_score:.4f} | Fit: {result.fit_time * 1000:7.2f} ms | {parameters}")
+
+        print("-" * 120)
+
+    def render_pruning_results(self, candidates: list[PruningCandidate]) -> None:
+        print(f"\n{' ' * 20}Cost-Complexity Pruning: Decision Tree ({len(candidates)} alphas)")
+        print("-" * 120)
+
+        for candidate in candidates:
+            marker = "*" if candidate.selected else " "
+            print(f"{marker} ccp_alpha: {candidate.ccp_alpha:.6f} | Accuracy: {candidate.accuracy:.4f} | Nodes: {candidate.node_count:>5} | Depth: {candidate.depth:>3} | Latency: {candidate.sample_latency * 1e6:6.2f} us | Fit: {candidate.fit_time * 1000:7.2f} ms")
+
+        print("-" * 120)
+
+    def render_model_comparison(self, evaluations: list[ModelEvaluation], paired_bootstraps: list[PairedBootstrap] | None = None) -> None:
+        print(f"\n{' ' * 20}Model Comparison ({len(evaluations)} models, {len(evaluations[0].precisions)} test rows)")
+        print("-" * 120)
+
+        for evaluation in evaluations:
+            macro, weighted = evaluation.classification_report["macro avg"], evaluation.classification_report["weighted avg"]
+            # Models restored from disk were fitted in an earlier session
+            fit_time = f"{evaluation.fit_time * 1000:7.2f} ms" if evaluation.fit_time is not None else "    n/a"
+            sample_latency = f"{evaluation.sample_latency * 1e6:8.2f} us" if evaluation.sample_latency is not None else "     n/a"
+            print(f"{evaluation.name:<20} | Accuracy: {evaluation.accuracy:.4f} | Macro F1: {macro['f1-score']:.3f} | Weighted F1: {weighted['f1-score']:.3f} | Fit: {fit_time} | Predict: {evaluation.predict_seconds * 1000:7.2f} ms | Latency: {sample_latency}")
+
+        labels = sorted({f"{label}" for evaluation in evaluations for label in evaluation.confusion_matrix.labels})
+        print(f"\n{'Class (P / R / F1)':<20} | " + " | ".join(f"{evaluation.name:>20}" for evaluation in evaluations) + " | Support")
+        for label in labels:
+            scores = [evaluation.classification_report.get(label, {}) for evaluation in evaluations]
+            support = max(score.get("support", 0) for score in scores)
+            cells = [f"{score.get('precision', 0):.2f} / {score.get('recall', 0):.2f} / {score.get('f1-score', 0):.2f}" for score in scores]
+            print(f"{label:<20} | " + " | ".join(f"{cell:>20}" for cell in cells) + f" | {support:g}")
+
+        for evaluation in evaluations:
+            if evaluation.cross_validation:
+                print(f"\n{evaluation.name}:", end="")
+                self.render_cross_validation(evaluation.cross_validation)
+
+        for evaluation in evaluations:
+            if evaluation.bootstrap:
+                accuracy = evaluation.bootstrap.accuracy
+                print(f"\n{evaluation.name}: accuracy {accuracy.estimate:.4f}, {evaluation.bootstrap.confidence:.0%} CI [{accuracy.lower:.4f}, {accuracy.upper:.4f}] | F1 per class: " + ", ".join(f"{label} [{f1_score.lower:.2f}, {f1_score.upper:.2f}]" for label, f1_score in evaluation.bootstrap.f1_scores.items()))
+
+        for paired_bootstrap in paired_bootstraps or []:
+            self.render_paired_bootstrap(paired_bootstrap)
+
+        print("-" * 120)
+
+    def render_learning_curve(self, summary: DataFrame) -> None:
+        print(f"\n{' ' * 20}Learning Curve ({summary['classifier'].nunique()} classifiers, mean ± std over the repeats)")
+        print("-" * 120)
+
+        for row in summary.itertuples():
+            print(f"{row.classifier:<20} | Rows: {row.train_rows:>9,.0f} ({row.fraction:>4.0%}) | Accuracy: {row.accuracy:.4f} ± {row.accuracy_std:.4f} | Fit: {row.fit_time * 1000:8.2f} ms | Predict: {row.predict_time * 1000:8.2f} ms | Peak: {row.peak_memory / 1024 ** 2:7.2f} MiB")
+
+        curves = {classifier: curve for classifier, curve in summary.groupby("classifier", sort=False)}
+        self.render_ascii_plot(title="Accuracy", series={classifier: list(zip(curve["train_rows"], curve["accuracy"])) for classifier, curve in curves.items()}, value_format="{:.3f}")
+        self.render_ascii_plot(title="Fit + predict time (ms)", series={classifier: list(zip(curve["train_rows"], (curve["fit_time"] + curve["predict_time"]) * 1000)) for classifier, curve in curves.items()}, value_format="{:.2f}")
+        self.render_ascii_plot(title="Peak memory (MiB)", series={classifier: list(zip(curve["train_rows"], curve["peak_memory"] / 1024 ** 2)) for classifier, curve in curves.items()}, value_format="{:.2f}")
+
+        print("-" * 120)
+
+    def render_ascii_plot(self, title: str, series: dict[str, list[tuple[float, float]]], value_format: str, width: int = 60, height: int = 10) -> None:
+        points = [point for values in series.values() for point in values]
+        x_min, x_max = min(x for x, _ in points), max(x for x, _ in points)
+        y_min, y_max = min(y for _, y in points), max(y for _, y in points)
+        x_span, y_span = max(x_max - x_min, 1e-12), max(y_max - y_min, 1e-12)
+
+        grid = [[" "] * width for _ in range(height)]
+        markers: dict[str, str] = {}
+        for i, (name, values) in enumerate(series.items()):
+            markers[name] = name[0] if name[0] not in markers.values() else f"{i + 1}"
+            for x, y in values:
+                row, column = height - 1 - round((y - y_min) / y_span * (height - 1)), round((x - x_min) / x_span * (width - 1))
+                grid[row][column] = markers[name] if grid[row][column] in (" ", markers[name]) else "*"
+
+        print(f"\n{title}: " + ", ".join(f"{marker} = {name}" for name, marker in markers.items()))
+        for row, cells in enumerate(grid):
+            print(f"{value_format.format(y_max - row * (y_max - y_min) / (height - 1)):>10} | {''.join(cells)}")
+
+        x_min_label = f"{x_min:,.0f}"
+        print(f"{'':>10} +{'-' * width}")
+        print(f"{'':>10}  {x_min_label}{f'{x_max:,.0f}':>{width - len(x_min_label)}}  training rows")
+
     def render_two_column_layout(self, left_content: str, right_content: str, left_header: str = "", right_header: str = "") -> None:
         if left_header and right_header:
             left_padding = " " * (self.width - len(left_header))
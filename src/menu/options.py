@@ -1,12 +1,16 @@
-from src.utils.file import create_folder, render_available_datasets_and_get_file_name_and_load_dataset, write_to_file_json
+from src.utils.file import create_folder, get_file_name, render_available_datasets_and_get_file_name_and_load_dataset, render_available_sessions, write_to_file_json
+from src.config.main import APPROXIMATE_KNN_TREES, BOOTSTRAP_CONFIDENCE, BOOTSTRAP_REPLICATES, CROSS_VALIDATION_FOLDS, DECISION_TREE_PRUNING_TOLERANCE, FEATURE_COLUMNS, RESULTS_FOLDER, SESSION_FILE_EXTENSION, SUPPORTED_DATASET_EXTENSIONS, TARGET_COLUMN
 from src.utils.sys import clear_screen, flush_input, quit
 from src.types.dataclass import ModelClassifier
 from src.utils.conversion import Conversion
-from src.config.main import RESULTS_FOLDER
+from src.utils.session import write_session
+from src.model.stream import FILE_READ_ERRORS, get_file_extension
+from src.model.learning_curve import summarize_learning_curve
 from src.menu.dataset import DatasetMenu
 from src.model.main import Model
 from datetime import datetime
 from typing import Callable
+from os import path
 
 class OptionsMenu:
     def __init__(
@@ -19,6 +23,7 @@ class OptionsMenu:
         self.set_show_train_model_options = set_show_train_model_options
         self.set_trained_models_options = set_trained_models_options
         self.set_exiting = set_exiting
+        self.valid_bool_inputs = ["y", "yes", "Y", "Yes", "YES", "n", "no", "N", "No", "NO"]
         self.conversion = Conversion()
         self.random_state = 42
         self.n_neighbors = 5
@@ -29,7 +34,12 @@ class OptionsMenu:
 
         match option:
             case "Load dataset":
-                dataset = render_available_datasets_and_get_file_name_and_load_dataset(load_dataset=self.model.load_dataset, conversion=self.conversion, load_rows=10)
+                try:
+                    dataset = render_available_datasets_and_get_file_name_and_load_dataset(load_dataset=self.model.load_dataset, conversion=self.conversion, load_rows=10)
+                except ValueError as error:
+                    print(f"\n{error}")
+                    return
+
                 self.dataset_menu = DatasetMenu(dataset=dataset)
 
                 clear_screen()
@@ -46,16 +56,57 @@ class OptionsMenu:
                 if not is_evaluating:
                     self.model.train_model(classifier="K Nearest Neighbors", n_neighbors=self.n_neighbors, random_state=None)
                     print("K Nearest Neighbors trained successfully")
+                    self.render_training_cache_stats()
                 else:
-                    self.handle_model_evaluation()
+                    self.handle_model_evaluation(name=option)
 
                 self.set_show_train_model_options(False)
             case "Decision Tree":
                 if not is_evaluating:
                     self.model.train_model(classifier="Decision Tree", random_state=self.random_state, n_neighbors=None)
                     print("Decision Tree trained successfully")
+                    self.render_training_cache_stats()
                 else:
-                    self.handle_model_evaluation()
+                    self.handle_model_evaluation(name=option)
+
+                self.set_show_train_model_options(False)
+            case "Decision Tree (pruned)":
+                tolerance = self.conversion.to_float(
+                    prompt=f"Accepted validation accuracy loss for a smaller tree, e.g. 0.01 = 1 point (recommended {DECISION_TREE_PRUNING_TOLERANCE}): ",
+                    additional_checks=lambda inp: 0 <= inp < 1,
+                    err_msg="Please enter a decimal number between 0 and 1.",
+                )
+                print("Sweeping the Decision Tree cost-complexity pruning path...")
+
+                candidates = self.model.prune_decision_tree(random_state=self.random_state, tolerance=tolerance)
+                if candidates:
+                    DatasetMenu(dataset=self.model.get_dataset()).render_pruning_results(candidates=candidates)
+                    selected = next(candidate for candidate in candidates if candidate.selected)
+                    print(f"Decision Tree trained successfully with ccp_alpha={selected.ccp_alpha:.6f} ({selected.node_count} nodes, depth {selected.depth})")
+                    self.render_training_cache_stats()
+
+                self.set_show_train_model_options(False)
+            case "K Nearest Neighbors (approximate)":
+                n_trees = self.conversion.to_int(
+                    prompt=f"Number of random projection trees, more trees = higher recall and slower queries (recommended {APPROXIMATE_KNN_TREES}): ",
+                    additional_checks=lambda inp: inp > 0,
+                    err_msg="Please enter a positive whole number.",
+                )
+
+                self.model.train_model(classifier="K Nearest Neighbors (approximate)", n_neighbors=self.n_neighbors, random_state=None, n_trees=n_trees)
+                print(f"K Nearest Neighbors (approximate, {n_trees} trees) trained successfully")
+                self.render_training_cache_stats()
+
+                self.set_show_train_model_options(False)
+            case "K Nearest Neighbors (search)" | "Decision Tree (search)":
+                classifier = option.removesuffix(" (search)")
+                print(f"Searching {classifier} hyperparameters with cross-validation...")
+
+                results = self.model.search_hyperparameters(classifier=classifier, random_state=self.random_state)
+                if results:
+                    DatasetMenu(dataset=self.model.get_dataset()).render_search_results(results=results)
+                    print(f"{classifier} trained successfully with {results[0].parameters}")
+                    self.render_training_cache_stats()
 
                 self.set_show_train_model_options(False)
             case "Evaluate model":
@@ -77,7 +128,61 @@ class OptionsMenu:
                     return
                 
                 self.set_show_train_model_options(False)
-                self.set_trained_models_options(list(models.keys()))
+                self.set_trained_models_options(list(models.keys()) + (["All trained models"] if len(models) > 1 else []))
+            case "All trained models":
+                self.handle_all_models_evaluation()
+            case "Evaluate models on a labelled file":
+                dataset = self.model.get_dataset()
+                if not dataset or not (dataset.k_nearest_neighbors or dataset.decision_tree):
+                    print("No trained models found. Please load a dataset and train a model before evaluating on a file.\n")
+                    return
+
+                input_path = self.conversion.to_str(
+                    prompt=f"Path of the file with {', '.join(FEATURE_COLUMNS + [TARGET_COLUMN])} columns ({', '.join(SUPPORTED_DATASET_EXTENSIONS)}): ",
+                    additional_checks=lambda inp: path.isfile(inp) and get_file_extension(inp) in SUPPORTED_DATASET_EXTENSIONS,
+                    err_msg="Please enter the path of an existing, supported file.",
+                )
+
+                try:
+                    self.model.evaluate_file(input_path=input_path)
+                except FILE_READ_ERRORS as error:
+                    print(f"\n{error.__class__.__name__}: {error}")
+                    return
+
+                self.dataset_menu = DatasetMenu(dataset=self.model.get_dataset())
+                self.dataset_menu.render_model_evaluation()
+                self.set_show_train_model_options(False)
+            case "Learning curve benchmark":
+                if not self.model.get_dataset():
+                    print("No dataset loaded. Please load a dataset before running the learning curve benchmark.\n")
+                    return
+
+                create_folder(folder_path=RESULTS_FOLDER)
+                output_path = f"{RESULTS_FOLDER}/learning_curve_{datetime.now().timestamp()}.csv"
+                print("Fitting every classifier on growing fractions of the training set...")
+
+                points = self.model.run_learning_curve(output_path=output_path)
+                DatasetMenu(dataset=self.model.get_dataset()).render_learning_curve(summary=summarize_learning_curve(points))
+                print(f"\n{len(points)} points written to {output_path}")
+                self.set_show_train_model_options(False)
+            case "Evaluation settings":
+                settings = self.model.evaluation_settings
+                print(f"Cross-validation: {'on' if settings.cross_validate else 'off'} | Bootstrap confidence intervals: {'on' if settings.bootstrap else 'off'}\n")
+
+                should_cross_validate = self.conversion.to_str(
+                    prompt=f"Run {CROSS_VALIDATION_FOLDS}-fold cross-validation on the training set when evaluating? (y/n): ",
+                    additional_checks=lambda inp: inp in self.valid_bool_inputs,
+                    err_msg="Please enter a valid response (y/n/yes/no)",
+                )
+                should_bootstrap = self.conversion.to_str(
+                    prompt=f"Add {BOOTSTRAP_CONFIDENCE:.0%} bootstrap confidence intervals ({BOOTSTRAP_REPLICATES:,} replicates) for accuracy and F1 when evaluating? (y/n): ",
+                    additional_checks=lambda inp: inp in self.valid_bool_inputs,
+                    err_msg="Please enter a valid response (y/n/yes/no)",
+                )
+
+                settings.cross_validate = should_cross_validate.lower().startswith("y")
+                settings.bootstrap = should_bootstrap.lower().startswith("y")
+                print("Evaluation settings saved")
             case "Predict a target by new features sample":
                 dataset = self.model.get_dataset()
                 if not dataset:
@@ -94,20 +199,59 @@ class OptionsMenu:
 
                 stg = self.conversion.to_float(prompt="STG (The degree of study time for goal object materails): ", err_msg=err_msg)
                 scg = self.conversion.to_float(prompt="SCG (The degree of repetition number of user for goal object materails): ", err_msg=err_msg)
-                str = self.conversion.to_float(prompt="STR (The degree of study time of user for related objects with goal object): ", err_msg=err_msg)
+                str_value = self.conversion.to_float(prompt="STR (The degree of study time of user for related objects with goal object): ", err_msg=err_msg)
                 lpr = self.conversion.to_float(prompt="LPR (The exam performance of user for related objects with goal object): ", err_msg=err_msg)
                 peg = self.conversion.to_float(prompt="PEG (The exam performance of user for goal objects): ", err_msg=err_msg)
 
-                new_features_sample = self.model.create_new_features_sample(features=[stg, scg, str, lpr, peg])
-                prediction = self.model.predict(features=new_features_sample)
+                prediction = self.model.predict_sample(features=[stg, scg, str_value, lpr, peg])
 
                 if prediction is None:
                     print("Failed to get prediction. Please try again.")
                 else:
-                    print(f"The predicted target is {prediction[0]}")
+                    print(f"The predicted target is {prediction}")
+                    prediction_cache = model_classifier.prediction_cache
+                    print(f"Prediction cache: {prediction_cache.hits} hits, {prediction_cache.misses} misses, {prediction_cache.evictions} evictions")
+
+                if dataset.k_nearest_neighbors:
+                    known_targets = [str(target) for target in dataset.train_target.unique()]
+                    target = self.conversion.to_str(
+                        prompt=f"If you know the true target ({', '.join(known_targets)}), enter it to add the sample to the K Nearest Neighbors training set, or press Enter to skip: ",
+                        additional_checks=lambda inp: inp == "" or inp in known_targets,
+                        err_msg="Please enter one of the known targets or press Enter to skip.",
+                    )
+
+                    new_features_sample = self.model.create_new_features_sample(features=[stg, scg, str_value, lpr, peg])
+                    online_model = self.model.append_training_samples(features=new_features_sample, target=[target]) if target else None
+                    if online_model:
+                        print(f"Sample added, K Nearest Neighbors now uses {online_model.n_samples_fit_} training rows")
+                    elif target:
+                        print("Only the exact K Nearest Neighbors model takes new samples, the approximate one has to be retrained.")
 
                 self.set_show_train_model_options(False)
 
+            case "Predict targets from a file":
+                dataset = self.model.get_dataset()
+                if not dataset or not (dataset.k_nearest_neighbors or dataset.decision_tree):
+                    print("No trained models found. Please load a dataset and train a model before predicting targets from a file.\n")
+                    return
+
+                input_path = self.conversion.to_str(
+                    prompt=f"Path of the file with {', '.join(FEATURE_COLUMNS)} columns ({', '.join(SUPPORTED_DATASET_EXTENSIONS)}): ",
+                    additional_checks=lambda inp: path.isfile(inp) and get_file_extension(inp) in SUPPORTED_DATASET_EXTENSIONS,
+                    err_msg="Please enter the path of an existing, supported file.",
+                )
+
+                create_folder(folder_path=RESULTS_FOLDER)
+                output_path = f"{RESULTS_FOLDER}/{path.splitext(path.basename(input_path))[0]}_predictions_{datetime.now().timestamp()}.csv"
+
+                try:
+                    summary = self.model.predict_file(input_path=input_path, output_path=output_path)
+                except FILE_READ_ERRORS as error:
+                    print(f"\n{error.__class__.__name__}: {error}")
+                    return
+
+                print(f"\n{summary.rows:,} predictions written to {summary.output_path} in {summary.seconds:.2f} s ({summary.rows / max(summary.seconds, 1e-9):,.0f} rows/s)")
+                self.set_show_train_model_options(False)
             case "Save progress to a file":
                 dataset = self.model.get_dataset()
                 if not dataset:
@@ -121,13 +265,43 @@ class OptionsMenu:
                     err_msg="Invalid input. Please enter the file name only (no extensions).",
                 )
 
+                should_export_json = self.conversion.to_str(
+                    prompt="Also export a (large, slow) JSON copy? (y/n): ",
+                    additional_checks=lambda inp: inp in self.valid_bool_inputs,
+                    err_msg="Please enter a valid response (y/n/yes/no)",
+                )
+
                 create_folder(folder_path=RESULTS_FOLDER)
-                write_to_file_json(file_path=f"{RESULTS_FOLDER}/{file_name}_{timestamp}.json", dataset=dataset, timestamp=timestamp)
+                write_session(file_path=f"{RESULTS_FOLDER}/{file_name}_{timestamp}.{SESSION_FILE_EXTENSION}", dataset=dataset, timestamp=timestamp)
+                if should_export_json.lower().startswith("y"):
+                    write_to_file_json(file_path=f"{RESULTS_FOLDER}/{file_name}_{timestamp}.json", dataset=dataset, timestamp=timestamp)
+
                 print(f"Progress saved successfully to {file_name}")
                 quit(set_exiting=self.set_exiting, force_exit=True)
+            case "Load progress from a file":
+                available_sessions = render_available_sessions()
+                if not available_sessions:
+                    print("No saved sessions found. Please save the progress to a file first.\n")
+                    return
+
+                session_name_or_number = get_file_name(prompt="Select a saved session by name or number: ", available_files=available_sessions, conversion=self.conversion)
+                session_name = available_sessions[int(session_name_or_number) - 1] if session_name_or_number.isdigit() else session_name_or_number
+
+                dataset = self.model.load_progress(file_path=f"{RESULTS_FOLDER}/{session_name}")
+                self.dataset_menu = DatasetMenu(dataset=dataset)
+
+                clear_screen()
+                flush_input()
 
-    def handle_model_evaluation(self) -> None:
-        evaluation = self.model.evaluate_model()
+                self.dataset_menu.render(first_x_rows=dataset.load_rows)
+                self.dataset_menu.render_model_evaluation()
+
+    def render_training_cache_stats(self) -> None:
+        training_cache = self.model.training_cache
+        print(f"Training cache: {training_cache.hits} hits ({training_cache.disk_hits} from disk), {training_cache.misses} misses")
+
+    def handle_model_evaluation(self, name: str) -> None:
+        evaluation = self.model.evaluate_model(name=name)
         if not evaluation:
             return
         
@@ -139,4 +313,20 @@ class OptionsMenu:
         self.dataset_menu.render_model_evaluation()
         
         input("\nPress Enter to continue...")
-        self.set_trained_models_options([])
\ No newline at end of file
+        self.set_trained_models_options([])
+
+    def handle_all_models_evaluation(self) -> None:
+        print("Evaluating every trained model on the test set...")
+        evaluations = self.model.evaluate_all_models()
+        if not evaluations:
+            return
+
+        self.dataset_menu = DatasetMenu(dataset=self.model.get_dataset())
+
+        clear_screen()
+        flush_input()
+
+        self.dataset_menu.render_model_comparison(evaluations=evaluations, paired_bootstraps=self.model.get_dataset().paired_bootstrap_results)
+
+        input("\nPress Enter to continue...")
+        self.set_trained_models_options([])
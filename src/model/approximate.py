@@ -0,0 +1,141 @@
+from src.config.main import APPROXIMATE_KNN_LEAF_SIZE, APPROXIMATE_KNN_TREES, KNN_PREDICTION_MEMORY_BUDGET
+from sklearn.base import BaseEstimator, ClassifierMixin
+from src.model.knn import count_votes
+from json import dumps, loads
+import numpy as np
+
+class ApproximateKNeighborsClassifier(ClassifierMixin, BaseEstimator):
+    def __init__(self, n_neighbors: int = 5, n_trees: int = APPROXIMATE_KNN_TREES, leaf_size: int = APPROXIMATE_KNN_LEAF_SIZE, weights: str = "uniform", random_state: int = 42) -> None:
+        self.random_state = random_state
+        self.n_neighbors = n_neighbors
+        self.leaf_size = leaf_size
+        self.n_trees = n_trees
+        self.weights = weights
+
+    def fit(self, features, target) -> "ApproximateKNeighborsClassifier":
+        if hasattr(features, "columns"):
+            self.feature_names_in_ = np.asarray(features.columns, dtype=object)
+
+        self.train_features_ = np.ascontiguousarray(features, dtype=np.float32)
+        self.classes_, self.train_target_ = np.unique(np.asarray(target), return_inverse=True)
+        self.n_features_in_ = self.train_features_.shape[1]
+
+        leaf_size = max(self.leaf_size, self.n_neighbors, 1)
+        self.depth_ = int(np.floor(np.log2(max(len(self.train_features_) / leaf_size, 1))))
+
+        random = np.random.default_rng(self.random_state)
+        trees = [self.build_tree(random) for _ in range(self.n_trees)]
+        self.directions_, self.thresholds_ = np.stack([tree[0] for tree in trees]), np.stack([tree[1] for tree in trees])
+
+        # Leaves are padded to the same width with the out of range row index n_train
+        leaf_width = max(tree[2].shape[1] for tree in trees)
+        self.leaves_ = np.stack([np.pad(tree[2], ((0, 0), (0, leaf_width - tree[2].shape[1])), constant_values=len(self.train_features_)) for tree in trees])
+        return self
+
+    def build_tree(self, random: np.random.Generator) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        n_train, n_features = self.train_features_.shape
+        directions = np.zeros((2 ** self.depth_ - 1, n_features), dtype=np.float32)
+        thresholds = np.zeros(2 ** self.depth_ - 1, dtype=np.float32)
+
+        # All nodes of a level are split at once, node_ids holds the node of every training row
+        node_ids = np.zeros(n_train, dtype=np.intp)
+        for level in range(self.depth_):
+            n_nodes, first_node = 2 ** level, 2 ** level - 1
+            level_directions = random.standard_normal((n_nodes, n_features)).astype(np.float32)
+            projections = np.einsum("ij,ij->i", self.train_features_, level_directions[node_ids])
+
+            # One float64 sort by node, then projection (scaled into [0, 1)) is much cheaper than a lexsort
+            scaled_projections = (projections - projections.min()) / (np.ptp(projections) * (1 + 1e-6) or 1)
+            order = np.argsort(2.0 * node_ids + scaled_projections)
+            counts = np.bincount(node_ids, minlength=n_nodes)
+            starts = np.cumsum(counts) - counts
+            ranks = np.empty(n_train, dtype=np.intp)
+            ranks[order] = np.arange(n_train) - np.repeat(starts, counts)
+
+            # Split between the two middle projections, rows are assigned by rank so ties stay balanced
+            middle = starts + counts // 2
+            sorted_projections = projections[order]
+            directions[first_node:first_node + n_nodes] = level_directions
+            thresholds[first_node:first_node + n_nodes] = (sorted_projections[middle - 1] + sorted_projections[middle]) / 2
+            node_ids = 2 * node_ids + (ranks >= counts[node_ids] // 2)
+
+        order = np.argsort(node_ids, kind="stable")
+        counts = np.bincount(node_ids, minlength=2 ** self.depth_)
+        leaves = np.full((2 ** self.depth_, counts.max()), n_train, dtype=np.intp)
+        leaves[node_ids[order], np.arange(n_train) - np.repeat(np.cumsum(counts) - counts, counts)] = order
+        return directions, thresholds, leaves
+
+    def get_block_size(self) -> int:
+        bytes_per_row = self.n_trees * self.leaves_.shape[2] * (8 + 8 * self.n_features_in_ + 8)
+        return max(1, KNN_PREDICTION_MEMORY_BUDGET // bytes_per_row)
+
+    def kneighbors(self, features, n_neighbors: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        n_neighbors = n_neighbors or self.n_neighbors
+        block_size = self.get_block_size()
+
+        blocks = [self.kneighbors_block(features[start:start + block_size], n_neighbors) for start in range(0, len(features), block_size)]
+        if not blocks:
+            return np.empty((0, n_neighbors)), np.empty((0, n_neighbors), dtype=np.intp)
+
+        return np.concatenate([block[0] for block in blocks]), np.concatenate([block[1] for block in blocks])
+
+    def kneighbors_block(self, block: np.ndarray, n_neighbors: int) -> tuple[np.ndarray, np.ndarray]:
+        n_train = len(self.train_features_)
+        candidates = np.concatenate([self.leaves_[tree][self.get_leaf_ids(block, tree)] for tree in range(self.n_trees)], axis=1)
+
+        # Rows found by several trees are ranked once, padding and duplicates get an infinite distance
+        candidates.sort(axis=1)
+        is_invalid = candidates == n_train
+        is_invalid[:, 1:] |= candidates[:, 1:] == candidates[:, :-1]
+
+        differences = block.astype(np.float64)[:, None, :] - self.train_features_[np.minimum(candidates, n_train - 1)]
+        squared_distances = (differences * differences).sum(axis=2)
+        squared_distances[is_invalid] = np.inf
+
+        nearest = np.argpartition(squared_distances, n_neighbors - 1, axis=1)[:, :n_neighbors]
+        nearest = np.take_along_axis(nearest, np.take_along_axis(squared_distances, nearest, axis=1).argsort(axis=1), axis=1)
+        return np.sqrt(np.take_along_axis(squared_distances, nearest, axis=1)), np.take_along_axis(candidates, nearest, axis=1)
+
+    def get_leaf_ids(self, block: np.ndarray, tree: int) -> np.ndarray:
+        node_ids = np.zeros(len(block), dtype=np.intp)
+        for level in range(self.depth_):
+            heap_ids = 2 ** level - 1 + node_ids
+            projections = np.einsum("ij,ij->i", block, self.directions_[tree][heap_ids])
+            node_ids = 2 * node_ids + (projections > self.thresholds_[tree][heap_ids])
+
+        return node_ids
+
+    def predict(self, features) -> np.ndarray:
+        distances, neighbours = self.kneighbors(features)
+        votes = count_votes(labels=self.train_target_[neighbours], n_classes=len(self.classes_), distances=distances if self.weights == "distance" else None)
+        return self.classes_.take(votes.argmax(axis=1))
+
+    def save(self, file_path: str) -> None:
+        np.savez(
+            file_path,
+            parameters=np.array(dumps({**self.get_params(), "depth": self.depth_})),
+            feature_names=np.asarray(getattr(self, "feature_names_in_", []), dtype=str),
+            classes=np.asarray(self.classes_, dtype=str) if self.classes_.dtype == object else self.classes_,
+            train_features=self.train_features_,
+            train_target=self.train_target_,
+            directions=self.directions_,
+            thresholds=self.thresholds_,
+            leaves=self.leaves_,
+        )
+
+    @classmethod
+    def load(cls, file_path: str) -> "ApproximateKNeighborsClassifier":
+        with np.load(file_path, allow_pickle=False) as index:
+            parameters = loads(index["parameters"].item())
+            model = cls(**{name: value for name, value in parameters.items() if name != "depth"})
+            model.depth_ = parameters["depth"]
+
+            if index["feature_names"].size:
+                model.feature_names_in_ = index["feature_names"].astype(object)
+            model.classes_ = index["classes"].astype(object) if index["classes"].dtype.kind == "U" else index["classes"]
+            model.train_features_, model.train_target_ = index["train_features"], index["train_target"]
+            model.directions_, model.thresholds_, model.leaves_ = index["directions"], index["thresholds"], index["leaves"]
+            model.n_features_in_ = model.train_features_.shape[1]
+
+        return model
@@ -0,0 +1,71 @@
+from src.config.main import DATASET_CHUNK_SIZE, FEATURE_COLUMNS, PREDICTION_COLUMN
+from src.model.stream import clean_column, get_file_extension, iter_file_chunks
+from src.types.dataclass import BatchPredictionSummary
+from pandas import DataFrame, Series
+from typing import BinaryIO, Callable
+from time import perf_counter
+from os import path, remove, replace
+
+def render_batch_prediction_progress(rows: int, seconds: float) -> None:
+    print(f"\rPredicted {rows:,} rows | {rows / max(seconds, 1e-9):,.0f} rows/s", end="", flush=True)
+
+class BatchPrediction:
+    def __init__(self, predict: Callable[[DataFrame], Series], chunk_size: int = DATASET_CHUNK_SIZE, on_progress: Callable[[int, float], None] | None = render_batch_prediction_progress) -> None:
+        self.on_progress = on_progress
+        self.chunk_size = chunk_size
+        self.predict = predict
+
+    def run(self, input_path: str, output_path: str) -> BatchPredictionSummary:
+        if get_file_extension(output_path) not in ["csv", "parquet"]:
+            raise ValueError(f"'{output_path}' has to be a .csv or .parquet file")
+
+        partial_path = f"{output_path}.partial"
+        started_at = perf_counter()
+        rows = 0
+
+        try:
+            with open(partial_path, "wb") as output_file:
+                writer = None
+                for chunk in iter_file_chunks(file_path=input_path, wanted_columns=FEATURE_COLUMNS, chunk_size=self.chunk_size):
+                    features = self.to_features(chunk=chunk, input_path=input_path)
+                    predictions = features.assign(**{PREDICTION_COLUMN: self.predict(features).astype(str).to_numpy()})
+
+                    writer = self.write_chunk(predictions=predictions, output_file=output_file, output_path=output_path, writer=writer)
+                    rows += len(predictions)
+                    if self.on_progress:
+                        self.on_progress(rows, perf_counter() - started_at)
+
+                if writer is None:
+                    raise ValueError(f"'{input_path}' has no rows with the feature columns {', '.join(FEATURE_COLUMNS)}")
+                if writer is not output_file:
+                    writer.close()
+
+            replace(partial_path, output_path)
+        except BaseException:
+            if path.exists(partial_path):
+                remove(partial_path)
+            raise
+
+        return BatchPredictionSummary(input_path=input_path, output_path=output_path, rows=rows, seconds=perf_counter() - started_at)
+
+    def to_features(self, chunk: DataFrame, input_path: str) -> DataFrame:
+        chunk.columns = [clean_column(column) for column in chunk.columns]
+
+        missing_columns = [column for column in FEATURE_COLUMNS if column not in chunk.columns]
+        if missing_columns:
+            raise ValueError(f"'{input_path}' is missing the feature columns {', '.join(missing_columns)}")
+
+        return chunk[FEATURE_COLUMNS].astype("float32").reset_index(drop=True)
+
+    def write_chunk(self, predictions: DataFrame, output_file: BinaryIO, output_path: str, writer=None) -> BinaryIO:
+        if get_file_extension(output_path) == "csv":
+            predictions.to_csv(output_file, mode="wb", header=writer is None, index=False)
+            return output_file
+
+        from pyarrow import Table
+        from pyarrow.parquet import ParquetWriter
+
+        table = Table.from_pandas(predictions, preserve_index=False)
+        writer = writer or ParquetWriter(output_file, table.schema)
+        writer.write_table(table)
+        return writer
@@ -0,0 +1,114 @@
+from src.config.main import BOOTSTRAP_CONFIDENCE, BOOTSTRAP_MEMORY_BUDGET, BOOTSTRAP_REPLICATES
+from src.types.dataclass import BootstrapResult, ConfidenceInterval, PairedBootstrap
+from src.utils.parallel import SharedArrays, get_shared_array, get_worker_count
+from src.model.metrics import encode_labels
+from pandas import Series
+import numpy as np
+
+def get_scores(counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    true_positives = np.diagonal(counts, axis1=-2, axis2=-1).astype(np.float64)
+    denominator = counts.sum(axis=-1) + counts.sum(axis=-2)
+    f1_scores = np.divide(2 * true_positives, denominator, out=np.zeros_like(true_positives), where=denominator > 0)
+
+    return true_positives.sum(axis=-1) / counts.sum(axis=(-2, -1)), f1_scores
+
+def resample_block(seed: np.random.SeedSequence, n_replicates: int, n_labels: int) -> tuple[np.ndarray, np.ndarray]:
+    pairs = get_shared_array("pairs")
+    n_models, n_rows = pairs.shape
+    n_cells = n_labels * n_labels
+
+    # One row of resampled indices per replicate, shared by every model so the comparison is paired
+    indices = np.random.default_rng(seed).integers(0, n_rows, size=(n_replicates, n_rows))
+    offsets = (np.arange(n_replicates) * n_cells)[:, None]
+
+    accuracies, f1_scores = np.empty((n_replicates, n_models)), np.empty((n_replicates, n_models, n_labels))
+    for model in range(n_models):
+        counts = np.bincount((pairs[model][indices] + offsets).ravel(), minlength=n_replicates * n_cells)
+        accuracies[:, model], f1_scores[:, model] = get_scores(counts.reshape(n_replicates, n_labels, n_labels))
+
+    return accuracies, f1_scores
+
+class BootstrapResampling:
+    def __init__(self, target: Series, predictions: dict[str, Series], n_replicates: int = BOOTSTRAP_REPLICATES, confidence: float = BOOTSTRAP_CONFIDENCE, random_state: int = 42, memory_budget: int = BOOTSTRAP_MEMORY_BUDGET, max_workers: int | None = None) -> None:
+        self.n_replicates = n_replicates
+        self.memory_budget = memory_budget
+        self.random_state = random_state
+        self.predictions = predictions
+        self.max_workers = max_workers
+        self.confidence = confidence
+        self.target = target
+        self.estimated_accuracies: np.ndarray | None = None
+        self.estimated_f1_scores: np.ndarray | None = None
+        self.accuracies: np.ndarray | None = None
+        self.f1_scores: np.ndarray | None = None
+        self.labels: list[str] = []
+
+    def encode(self) -> np.ndarray:
+        target_codes, target_labels = encode_labels(self.target)
+        encoded_predictions = [encode_labels(predictions) for predictions in self.predictions.values()]
+
+        labels = np.unique(np.concatenate([target_labels] + [prediction_labels for _, prediction_labels in encoded_predictions]))
+        target_codes = np.searchsorted(labels, target_labels)[target_codes]
+        self.labels = [f"{label}" for label in labels]
+
+        return np.stack([target_codes * len(labels) + np.searchsorted(labels, prediction_labels)[prediction_codes] for prediction_codes, prediction_labels in encoded_predictions]).astype(np.int32)
+
+    def get_block_sizes(self, n_rows: int, n_labels: int) -> list[int]:
+        bytes_per_replicate = n_rows * 16 + n_labels * n_labels * 8
+        block_size = max(1, min(self.memory_budget // bytes_per_replicate, -(-self.n_replicates // get_worker_count(self.max_workers))))
+
+        return [min(block_size, self.n_replicates - start) for start in range(0, self.n_replicates, block_size)]
+
+    def resample(self) -> None:
+        pairs = self.encode()
+        n_labels = len(self.labels)
+        block_sizes = self.get_block_sizes(n_rows=pairs.shape[1], n_labels=n_labels)
+        seeds = np.random.SeedSequence(self.random_state).spawn(len(block_sizes))
+
+        shared_arrays = SharedArrays({"pairs": pairs})
+        with shared_arrays, shared_arrays.create_pool(max_workers=self.max_workers) as pool:
+            blocks = list(pool.map(resample_block, seeds, block_sizes, [n_labels] * len(block_sizes)))
+
+        self.accuracies = np.concatenate([accuracies for accuracies, _ in blocks])
+        self.f1_scores = np.concatenate([f1_scores for _, f1_scores in blocks])
+
+        counts = np.stack([np.bincount(model_pairs, minlength=n_labels * n_labels).reshape(n_labels, n_labels) for model_pairs in pairs])
+        self.estimated_accuracies, self.estimated_f1_scores = get_scores(counts)
+
+    def get_interval(self, estimate: float, replicates: np.ndarray) -> ConfidenceInterval:
+        alpha = (1 - self.confidence) / 2
+        lower, upper = np.quantile(replicates, [alpha, 1 - alpha])
+        return ConfidenceInterval(estimate=float(estimate), lower=float(lower), upper=float(upper))
+
+    def run(self) -> dict[str, BootstrapResult]:
+        if self.accuracies is None:
+            self.resample()
+
+        return {
+            name: BootstrapResult(
+                f1_scores={label: self.get_interval(self.estimated_f1_scores[model, i], self.f1_scores[:, model, i]) for i, label in enumerate(self.labels)},
+                accuracy=self.get_interval(self.estimated_accuracies[model], self.accuracies[:, model]),
+                n_replicates=self.n_replicates,
+                confidence=self.confidence,
+            )
+            for model, name in enumerate(self.predictions)
+        }
+
+    def compare(self, first_name: str, second_name: str) -> PairedBootstrap:
+        if self.accuracies is None:
+            self.resample()
+
+        names = list(self.predictions)
+        first, second = names.index(first_name), names.index(second_name)
+        accuracy_differences = self.accuracies[:, first] - self.accuracies[:, second]
+        macro_f1_differences = self.f1_scores[:, first].mean(axis=1) - self.f1_scores[:, second].mean(axis=1)
+
+        return PairedBootstrap(
+            accuracy_difference=self.get_interval(self.estimated_accuracies[first] - self.estimated_accuracies[second], accuracy_differences),
+            macro_f1_difference=self.get_interval(self.estimated_f1_scores[first].mean() - self.estimated_f1_scores[second].mean(), macro_f1_differences),
+            probability_first_better=float((accuracy_differences > 0).mean()),
+            n_replicates=self.n_replicates,
+            confidence=self.confidence,
+            second_name=second_name,
+            first_name=first_name,
+        )
@@ -0,0 +1,116 @@
+from typing import Any, Callable, Sequence
+import numpy as np
+
+class CompiledDecisionTree:
+    # Python's parser refuses deeper nesting, deeper trees walk the flat arrays instead
+    max_source_depth = 90
+
+    def __init__(self, features: list[int], thresholds: list[float], left_children: list[int], right_children: list[int], leaf_labels: list[Any], n_features: int) -> None:
+        self.right_children = right_children
+        self.left_children = left_children
+        self.leaf_labels = leaf_labels
+        self.n_features = n_features
+        self.thresholds = thresholds
+        self.features = features
+        self.max_depth = self.get_max_depth()
+        self.predict_sample = self.compile_source() if self.max_depth <= self.max_source_depth else self.walk
+
+    @classmethod
+    def from_model(cls, model) -> "CompiledDecisionTree":
+        tree = model.tree_
+        is_leaf = tree.children_left == -1
+
+        # Same rule as predict: the first class with the highest leaf value wins
+        leaf_labels = np.where(is_leaf, model.classes_.take(tree.value[:, 0].argmax(axis=1)), None)
+
+        return cls(
+            features=np.where(is_leaf, 0, tree.feature).tolist(),
+            thresholds=np.where(is_leaf, np.inf, get_float32_thresholds(tree.threshold)).tolist(),
+            left_children=tree.children_left.tolist(),
+            right_children=tree.children_right.tolist(),
+            leaf_labels=leaf_labels.tolist(),
+            n_features=model.n_features_in_,
+        )
+
+    @staticmethod
+    def is_supported(model) -> bool:
+        return getattr(model, "n_outputs_", None) == 1 and hasattr(model, "tree_")
+
+    def get_max_depth(self) -> int:
+        depths = [0] * len(self.features)
+        for node, left_child in enumerate(self.left_children):
+            if left_child != -1:
+                depths[left_child] = depths[self.right_children[node]] = depths[node] + 1
+
+        return max(depths)
+
+    def walk(self, sample: Sequence[float]) -> Any:
+        left_children, right_children, features, thresholds = self.left_children, self.right_children, self.features, self.thresholds
+
+        node = 0
+        while left_children[node] != -1:
+            node = left_children[node] if sample[features[node]] <= thresholds[node] else right_children[node]
+
+        return self.leaf_labels[node]
+
+    def to_source(self, function_name: str = "predict_sample") -> str:
+        lines = [f"def {function_name}(sample):"]
+
+        pending = [(0, 1, False)]
+        while pending:
+            node, depth, is_else = pending.pop()
+            indentation = "    " * depth
+            if is_else:
+                lines.append(f"{'    ' * (depth - 1)}else:")
+
+            if self.left_children[node] == -1:
+                lines.append(f"{indentation}return {self.leaf_labels[node]!r}")
+                continue
+
+            lines.append(f"{indentation}if sample[{self.features[node]}] <= {self.thresholds[node]!r}:")
+            pending.append((self.right_children[node], depth + 1, True))
+            pending.append((self.left_children[node], depth + 1, False))
+
+        return "\n".join(lines) + "\n"
+
+    def compile_source(self) -> Callable[[Sequence[float]], Any]:
+        namespace = {}
+        exec(compile(self.to_source(), "<compiled decision tree>", "exec"), namespace)
+        return namespace["predict_sample"]
+
+    def predict_one(self, sample: Sequence[float]) -> Any:
+        # NumPy scalars would compare in float32 against the float64 thresholds
+        if hasattr(sample, "tolist"):
+            sample = sample.tolist()
+
+        return self.predict_sample(sample)
+
+    def predict(self, samples) -> np.ndarray:
+        samples = np.asarray(samples, dtype=np.float64).reshape(-1, self.n_features)
+        features, thresholds = np.asarray(self.features), np.asarray(self.thresholds)
+        left_children, right_children = np.asarray(self.left_children), np.asarray(self.right_children)
+
+        nodes = np.zeros(len(samples), dtype=np.intp)
+        rows = np.arange(len(samples)) if left_children[0] != -1 else np.empty(0, dtype=np.intp)
+        while rows.size:
+            active_nodes = nodes[rows]
+            goes_left = samples[rows, features[active_nodes]] <= thresholds[active_nodes]
+            active_nodes = np.where(goes_left, left_children[active_nodes], right_children[active_nodes])
+            nodes[rows] = active_nodes
+
+            is_internal = left_children[active_nodes] != -1
+            rows = rows[is_internal]
+
+        return np.asarray(self.leaf_labels, dtype=object)[nodes]
+
+def get_float32_thresholds(thresholds: np.ndarray) -> np.ndarray:
+    # scikit-learn compares float32-cast samples, so each threshold becomes the largest float64 whose float32 rounding still goes left
+    # Largest float32 at or below the threshold and the float32 right above it
+    lower = thresholds.astype(np.float32)
+    lower = np.where(lower.astype(np.float64) > thresholds, np.nextafter(lower, np.float32(-np.inf)), lower)
+    upper = np.nextafter(lower, np.float32(np.inf))
+
+    # Samples round to the nearer float32, the exact midpoint rounds to the even mantissa
+    midpoints = (lower.astype(np.float64) + upper.astype(np.float64)) / 2
+    is_lower_even = (lower.view(np.uint32) & 1) == 0
+    return np.where(is_lower_even, midpoints, np.nextafter(midpoints, -np.inf))
@@ -0,0 +1,8 @@
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+def create_estimator(classifier: str, parameters: dict) -> KNeighborsClassifier | DecisionTreeClassifier:
+    if classifier == "K Nearest Neighbors":
+        return KNeighborsClassifier(**parameters)
+
+    return DecisionTreeClassifier(**parameters)
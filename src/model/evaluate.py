@@ -1,16 +1,84 @@
+from src.types.dataclass import ApproximationDrift, ConfusionMatrix, CrossValidation, CrossValidationFold, Dataset, EvaluationSettings, ModelClassifier, ModelEvaluation, PairedBootstrap
+from src.model.approximate import ApproximateKNeighborsClassifier
 from src.utils.file import render_available_datasets_and_get_file_name_and_load_dataset
-from src.types.dataclass import Dataset, ModelClassifier, ModelEvaluation
-from sklearn.metrics import accuracy_score, classification_report
+from src.config.main import BOOTSTRAP_REPLICATES, CROSS_VALIDATION_FOLDS, CROSS_VALIDATION_REPEATS, EVALUATION_LATENCY_SAMPLES, FEATURE_COLUMNS
+from src.utils.parallel import SharedArrays, get_shared_array
+from pandas import Categorical, DataFrame, Series
 from sklearn.neighbors import KNeighborsClassifier
+from src.model.folds import get_repeated_fold_ids
+from src.model.compiled_tree import CompiledDecisionTree
+from src.model.bootstrap import BootstrapResampling
+from itertools import combinations
+from src.model import metrics
+from src.model.knn import BatchedKNeighbors
 from sklearn.tree import DecisionTreeClassifier
 from src.utils.conversion import Conversion
-from pandas import DataFrame, Series
+from sklearn.base import clone
+from time import perf_counter
 from typing import Callable
+import numpy as np
+
+def score_fold(estimator: KNeighborsClassifier | DecisionTreeClassifier, repeat: int, fold: int) -> CrossValidationFold:
+    features, target, fold_ids = get_shared_array("features"), get_shared_array("target"), get_shared_array("fold_ids")
+    is_test = fold_ids[repeat] == fold
+
+    started_at = perf_counter()
+    estimator.fit(features[~is_test], target[~is_test])
+    fit_time = perf_counter() - started_at
+
+    confusion_matrix = metrics.get_confusion_matrix(target=target[is_test], predictions=estimator.predict(features[is_test]))
+    precision, recall, f1_score = metrics.get_macro_scores(confusion_matrix)
+
+    return CrossValidationFold(
+        accuracy=metrics.get_accuracy(confusion_matrix),
+        precision=precision,
+        f1_score=f1_score,
+        recall=recall,
+        fit_time=fit_time,
+        repeat=repeat,
+        fold=fold,
+    )
+
+def score_model(model: KNeighborsClassifier | ApproximateKNeighborsClassifier | DecisionTreeClassifier, name: str, target_labels: np.ndarray, n_latency_samples: int) -> ModelEvaluation:
+    features, target_codes = get_shared_array("features"), get_shared_array("target")
+    model_classifier = ModelClassifier(model=model, name=name)
+    evaluate_model = EvaluateModel(dataset=None, load_dataset=None)
+
+    started_at = perf_counter()
+    predictions = evaluate_model.predict(model_classifier=model_classifier, features=DataFrame(features, columns=FEATURE_COLUMNS))
+    predict_seconds = perf_counter() - started_at
+
+    prediction_codes, prediction_labels = metrics.encode_labels(predictions)
+    confusion_matrix = metrics.get_confusion_matrix_from_codes(target_codes=target_codes, target_labels=target_labels, prediction_codes=prediction_codes, prediction_labels=prediction_labels)
+
+    sample_latency = None
+    samples = features[:n_latency_samples].tolist()
+    if samples:
+        evaluate_model.predict_sample(model_classifier=model_classifier, features=samples[0])
+        started_at = perf_counter()
+        for sample in samples:
+            evaluate_model.predict_sample(model_classifier=model_classifier, features=sample)
+        sample_latency = (perf_counter() - started_at) / len(samples)
+
+    return ModelEvaluation(
+        classification_report=metrics.get_classification_report(confusion_matrix),
+        accuracy=metrics.get_accuracy(confusion_matrix),
+        confusion_matrix=confusion_matrix,
+        predict_seconds=predict_seconds,
+        sample_latency=sample_latency,
+        precisions=predictions,
+        name=name,
+        model=None,
+    )
 
 class EvaluateModel:
-    def __init__(self, dataset: Dataset, load_dataset: Callable[[str, int], Dataset]) -> None:
+    def __init__(self, dataset: Dataset, load_dataset: Callable[[str, int], Dataset], settings: EvaluationSettings | None = None) -> None:
+        self.settings = settings if settings else EvaluationSettings()
         self.valid_bool_inputs = ["y", "yes", "Y", "Yes", "YES", "n", "no", "N", "No", "NO"]
         self.load_dataset = load_dataset
+        self.fold_ids: dict[tuple[int, int, bool], np.ndarray] = {}
+        self.compiled_trees: dict[int, tuple[DecisionTreeClassifier, CompiledDecisionTree]] = {}
+        self.knn_engines: dict[int, BatchedKNeighbors] = {}
         self.conversion = Conversion()
         self.dataset = dataset
 
@@ -18,28 +86,157 @@ class EvaluateModel:
         new_dataset = self.load_additional_dataset_for_evaluation()
         dataset_for_evaluation = new_dataset if new_dataset else self.dataset
         
+        started_at = perf_counter()
         predictions = self.predict(model_classifier=model_classifier, features=dataset_for_evaluation.test_features)
-        accuracy_score = self.get_accuracy_score(predictions=predictions, dataset=dataset_for_evaluation)
-        classification_report = self.get_classification_report(predictions=predictions, dataset=dataset_for_evaluation)
+        prediction_seconds = perf_counter() - started_at
+
+        confusion_matrix = self.get_confusion_matrix(predictions=predictions, dataset=dataset_for_evaluation)
 
         evaluation = ModelEvaluation(
-            classification_report=classification_report,
+            classification_report=metrics.get_classification_report(confusion_matrix),
+            accuracy=metrics.get_accuracy(confusion_matrix),
+            predict_seconds=prediction_seconds,
+            confusion_matrix=confusion_matrix,
             model=model_classifier.model,
             name=model_classifier.name,
-            accuracy=accuracy_score,
             precisions=predictions,
         )
+
+        if isinstance(model_classifier.model, ApproximateKNeighborsClassifier):
+            evaluation.approximation_drift = self.get_approximation_drift(model=model_classifier.model, dataset=dataset_for_evaluation, predictions=predictions, approximate_seconds=prediction_seconds)
+
+        if self.settings.cross_validate:
+            evaluation.cross_validation = self.cross_validate(model_classifier=model_classifier)
+
+        if self.settings.bootstrap:
+            bootstrap = BootstrapResampling(target=dataset_for_evaluation.test_target, predictions={model_classifier.name: predictions})
+            evaluation.bootstrap = bootstrap.run()[model_classifier.name]
+
         return evaluation
 
+    def evaluate_all(self, model_classifiers: list[ModelClassifier], max_workers: int | None = None, n_latency_samples: int = EVALUATION_LATENCY_SAMPLES, n_replicates: int = BOOTSTRAP_REPLICATES) -> tuple[list[ModelEvaluation], list[PairedBootstrap]]:
+        new_dataset = self.load_additional_dataset_for_evaluation()
+        dataset_for_evaluation = new_dataset if new_dataset else self.dataset
+        target_codes, target_labels = metrics.encode_labels(dataset_for_evaluation.test_target)
+
+        shared_arrays = SharedArrays({
+            "features": dataset_for_evaluation.test_features.to_numpy(dtype=np.float32),
+            "target": target_codes,
+        })
+
+        with shared_arrays, shared_arrays.create_pool(max_workers=max_workers or len(model_classifiers)) as pool:
+            futures = [pool.submit(score_model, model_classifier.model, model_classifier.name, target_labels, n_latency_samples) for model_classifier in model_classifiers]
+            evaluations = [future.result() for future in futures]
+
+        for evaluation, model_classifier in zip(evaluations, model_classifiers):
+            evaluation.precisions.index = dataset_for_evaluation.test_features.index
+            evaluation.fit_time = model_classifier.fit_time
+            evaluation.model = model_classifier.model
+            if self.settings.cross_validate:
+                evaluation.cross_validation = self.cross_validate(model_classifier=model_classifier)
+
+        if not self.settings.bootstrap:
+            return evaluations, []
+
+        bootstrap = BootstrapResampling(target=dataset_for_evaluation.test_target, predictions={evaluation.name: evaluation.precisions for evaluation in evaluations}, n_replicates=n_replicates, max_workers=max_workers)
+        bootstrap_results = bootstrap.run()
+        for evaluation in evaluations:
+            evaluation.bootstrap = bootstrap_results[evaluation.name]
+
+        paired_bootstraps = [bootstrap.compare(first_name=first.name, second_name=second.name) for first, second in combinations(evaluations, 2)]
+        return evaluations, paired_bootstraps
+
+    def get_approximation_drift(self, model: ApproximateKNeighborsClassifier, dataset: Dataset, predictions: Series, approximate_seconds: float) -> ApproximationDrift:
+        # Exact KNN on the rows the forest was built from, so the neighbour indices are comparable
+        train_features = DataFrame(model.train_features_, columns=model.feature_names_in_) if hasattr(model, "feature_names_in_") else model.train_features_
+        exact_model = KNeighborsClassifier(n_neighbors=model.n_neighbors, weights=model.weights).fit(train_features, model.classes_[model.train_target_])
+
+        started_at = perf_counter()
+        exact_predictions = self.predict(model_classifier=ModelClassifier(model=exact_model, name="K Nearest Neighbors"), features=dataset.test_features)
+        exact_seconds = perf_counter() - started_at
+
+        _, exact_neighbours = exact_model.kneighbors(dataset.test_features)
+        _, approximate_neighbours = model.kneighbors(dataset.test_features)
+        is_found = (approximate_neighbours[:, :, None] == exact_neighbours[:, None, :]).any(axis=2)
+
+        return ApproximationDrift(
+            prediction_agreement=float((predictions.to_numpy() == exact_predictions.to_numpy()).mean()),
+            exact_accuracy=self.get_accuracy_score(predictions=exact_predictions, dataset=dataset),
+            approximate_accuracy=self.get_accuracy_score(predictions=predictions, dataset=dataset),
+            neighbour_recall=float(is_found.mean()),
+            approximate_seconds=approximate_seconds,
+            exact_seconds=exact_seconds,
+            leaf_size=model.leaf_size,
+            n_trees=model.n_trees,
+        )
+
+    def cross_validate(self, model_classifier: ModelClassifier, n_splits: int = CROSS_VALIDATION_FOLDS, n_repeats: int = CROSS_VALIDATION_REPEATS, stratified: bool = True, max_workers: int | None = None) -> CrossValidation:
+        target = Categorical(self.dataset.train_target).codes
+
+        key = (n_splits, n_repeats, stratified)
+        if key not in self.fold_ids:
+            self.fold_ids[key] = get_repeated_fold_ids(target_codes=target, n_splits=n_splits, n_repeats=n_repeats, stratified=stratified)
+
+        shared_arrays = SharedArrays({
+            "features": self.dataset.train_features.to_numpy(dtype=np.float32),
+            "fold_ids": self.fold_ids[key],
+            "target": target,
+        })
+
+        with shared_arrays, shared_arrays.create_pool(max_workers=max_workers) as pool:
+            futures = [pool.submit(score_fold, clone(model_classifier.model), repeat, fold) for repeat in range(n_repeats) for fold in range(n_splits)]
+            folds = [future.result() for future in futures]
+
+        metric_names = ["accuracy", "precision", "recall", "f1_score", "fit_time"]
+        return CrossValidation(
+            mean={metric: float(np.mean([getattr(fold, metric) for fold in folds])) for metric in metric_names},
+            std={metric: float(np.std([getattr(fold, metric) for fold in folds])) for metric in metric_names},
+            stratified=stratified,
+            n_repeats=n_repeats,
+            n_splits=n_splits,
+            folds=folds,
+        )
+
     def predict(self, model_classifier: ModelClassifier, features: DataFrame) -> Series:
-        predictions = model_classifier.model.predict(features)
+        # scikit-learn refuses to predict zero rows
+        if features.empty:
+            return Series([], index=features.index, dtype=object, name=f"{model_classifier.name} predictions")
+
+        predictions = self.get_knn_engine(model_classifier.model).predict(features) if self.has_knn_engine(model_classifier.model) else model_classifier.model.predict(features)
         return Series(predictions, index=features.index, name=f"{model_classifier.name} predictions")
 
+    def predict_sample(self, model_classifier: ModelClassifier, features: list[float]) -> str:
+        # A single sample skips the DataFrame and scikit-learn's validation for decision trees
+        if isinstance(model_classifier.model, DecisionTreeClassifier) and CompiledDecisionTree.is_supported(model_classifier.model):
+            return self.get_compiled_tree(model_classifier.model).predict_one(features)
+
+        sample = DataFrame([features], columns=FEATURE_COLUMNS, dtype="float32")
+        return self.predict(model_classifier=model_classifier, features=sample).iloc[0]
+
+    def get_compiled_tree(self, model: DecisionTreeClassifier) -> CompiledDecisionTree:
+        # The model is kept next to its compiled tree so a reused id never returns a stale tree
+        if id(model) not in self.compiled_trees or self.compiled_trees[id(model)][0] is not model:
+            self.compiled_trees[id(model)] = (model, CompiledDecisionTree.from_model(model))
+
+        return self.compiled_trees[id(model)][1]
+
+    def has_knn_engine(self, model: KNeighborsClassifier | DecisionTreeClassifier) -> bool:
+        return isinstance(model, KNeighborsClassifier) and BatchedKNeighbors.is_supported(model)
+
+    def get_knn_engine(self, model: KNeighborsClassifier) -> BatchedKNeighbors:
+        if id(model) not in self.knn_engines or self.knn_engines[id(model)].model is not model:
+            self.knn_engines[id(model)] = BatchedKNeighbors(model)
+
+        return self.knn_engines[id(model)]
+
+    def get_confusion_matrix(self, predictions: Series, dataset: Dataset) -> ConfusionMatrix:
+        return metrics.get_confusion_matrix(target=dataset.test_target, predictions=predictions)
+
     def get_accuracy_score(self, predictions: Series, dataset: Dataset) -> float:
-        return accuracy_score(dataset.test_target, predictions)
+        return metrics.get_accuracy(self.get_confusion_matrix(predictions=predictions, dataset=dataset))
 
     def get_classification_report(self, predictions: Series, dataset: Dataset) -> dict:
-        return classification_report(dataset.test_target, predictions, output_dict=True, zero_division=0)
+        return metrics.get_classification_report(self.get_confusion_matrix(predictions=predictions, dataset=dataset))
 
     def load_additional_dataset_for_evaluation(self) -> Dataset | None:
         should_use_custom_dataset = self.conversion.to_str(
@@ -51,6 +248,5 @@ class EvaluateModel:
         if should_use_custom_dataset.lower().startswith("n"):
             return None
 
-        print('n')
         dataset = render_available_datasets_and_get_file_name_and_load_dataset(load_dataset=self.load_dataset, conversion=self.conversion, load_rows=10)
         return dataset
@@ -0,0 +1,14 @@
+import numpy as np
+
+def get_fold_ids(target_codes: np.ndarray, n_splits: int, stratified: bool = True, random_state: int = 42) -> np.ndarray:
+    random = np.random.default_rng(random_state)
+    order = random.permutation(target_codes.size)
+    if stratified:
+        order = order[np.argsort(target_codes[order], kind="stable")]
+
+    fold_ids = np.empty(target_codes.size, dtype=np.int32)
+    fold_ids[order] = np.arange(target_codes.size) % n_splits
+    return fold_ids
+
+def get_repeated_fold_ids(target_codes: np.ndarray, n_splits: int, n_repeats: int = 1, stratified: bool = True, random_state: int = 42) -> np.ndarray:
+    return np.stack([get_fold_ids(target_codes=target_codes, n_splits=n_splits, stratified=stratified, random_state=random_state + repeat) for repeat in range(n_repeats)])
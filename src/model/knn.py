@@ -0,0 +1,165 @@
+from src.config.main import KNN_PREDICTION_MEMORY_BUDGET
+from concurrent.futures import ThreadPoolExecutor
+from sklearn.neighbors import KNeighborsClassifier
+from src.utils.parallel import get_worker_count
+from pandas import DataFrame
+import numpy as np
+
+class BatchedKNeighbors:
+    # Every n-th training row is used to find the distance threshold of the brute force filter
+    sample_stride = 8
+
+    def __init__(self, model: KNeighborsClassifier, memory_budget: int = KNN_PREDICTION_MEMORY_BUDGET, max_workers: int | None = None) -> None:
+        self.max_workers = get_worker_count(max_workers)
+        self.memory_budget = memory_budget
+        self.model = model
+
+        self.is_fallback = not self.is_supported(model)
+        if self.is_fallback:
+            return
+
+        self.train_target = np.asarray(model._y, dtype=np.intp)
+        self.uses_tree = model._fit_method != "brute"
+        self.n_neighbors = model.n_neighbors
+        self.classes = model.classes_
+        self.weights = model.weights
+
+        if not self.uses_tree:
+            # The float32 copy only filters candidates, survivors are ranked on the fitted values
+            self.fit_features = model._fit_X
+            self.train_features = np.ascontiguousarray(model._fit_X, dtype=np.float32)
+            self.train_squared_norms = (self.train_features.astype(np.float64) ** 2).sum(axis=1)
+            self.train_squared_norms_32 = self.train_squared_norms.astype(np.float32)
+
+            n_train = self.train_features.shape[0]
+            self.sample_stride = max(1, min(self.sample_stride, n_train // (4 * (self.n_neighbors + 1))))
+            self.sample_features = np.ascontiguousarray(self.train_features[::self.sample_stride])
+            self.sample_squared_norms_32 = self.train_squared_norms_32[::self.sample_stride]
+
+    @staticmethod
+    def is_supported(model: KNeighborsClassifier) -> bool:
+        # The engine reads scikit-learn's private fitted attributes
+        fit_method = getattr(model, "_fit_method", None)
+        if fit_method is None or not hasattr(model, "_fit_X") or not hasattr(model, "_y") or (fit_method != "brute" and not hasattr(model, "_tree")):
+            return False
+
+        return (
+            getattr(model, "effective_metric_", None) == "euclidean"
+            and model.weights in ["uniform", "distance"]
+            and not model.outputs_2d_
+            and not hasattr(model._fit_X, "tocsr")
+        )
+
+    def get_block_size(self) -> int:
+        if self.uses_tree:
+            bytes_per_row = 8 * self.model.n_features_in_ + 16 * self.n_neighbors
+        else:
+            bytes_per_row = self.train_features.shape[0] * (4 + 1)
+
+        return max(1, self.memory_budget // (bytes_per_row * self.max_workers))
+
+    def predict(self, features) -> np.ndarray:
+        if self.is_fallback:
+            return self.model.predict(features)
+
+        features = np.ascontiguousarray(features, dtype=np.float64)
+        block_size = self.get_block_size()
+        blocks = [features[start:start + block_size] for start in range(0, features.shape[0], block_size)]
+
+        if len(blocks) <= 1 or self.max_workers == 1:
+            codes = [self.predict_block(block) for block in blocks]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                codes = list(pool.map(self.predict_block, blocks))
+
+        return self.classes.take(np.concatenate(codes) if codes else np.empty(0, dtype=np.intp))
+
+    def predict_block(self, block: np.ndarray) -> np.ndarray:
+        if self.uses_tree:
+            distances, neighbours = self.model._tree.query(block, k=self.n_neighbors)
+            return self.vote(neighbours=neighbours, distances=distances).argmax(axis=1)
+
+        neighbours, squared_distances, is_tied = self.kneighbors_block(block)
+        votes = self.vote(neighbours=neighbours, distances=np.sqrt(squared_distances))
+        codes = votes.argmax(axis=1)
+
+        if self.weights == "distance" and votes.shape[1] > 1:
+            # scikit-learn's brute force distances differ in the last bits, which can flip a class weight tie
+            top_votes = np.partition(votes, -2, axis=1)
+            is_tied |= top_votes[:, -1] - top_votes[:, -2] <= 1e-6 * top_votes[:, -1]
+
+        # Near ties at the k-th neighbour depend on which tied point the model's own search keeps
+        if is_tied.any():
+            codes[is_tied] = np.searchsorted(self.classes, self.model.predict(self.to_model_input(block[is_tied])))
+
+        return codes
+
+    def kneighbors_block(self, block_64: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        n_rows, n_train = block_64.shape[0], self.train_features.shape[0]
+        block = block_64.astype(np.float32)
+        block_squared_norms = (block_64 ** 2).sum(axis=1)
+
+        # Bound on the float32 error of |t|^2 - 2x.t and of the rounded inputs, the per row |x|^2 does not change the order
+        rounding_bound = 8 * np.finfo(np.float32).eps * (block_squared_norms + self.train_squared_norms.max()) * block.shape[1]
+
+        # The (k + 1)-th smallest distance of a sample is an upper bound for the whole training set
+        sample_distances = block @ self.sample_features.T
+        sample_distances *= -2
+        sample_distances += self.sample_squared_norms_32
+        n_kept = min(self.n_neighbors, sample_distances.shape[1] - 1)
+        threshold = np.partition(sample_distances, n_kept, axis=1)[:, n_kept] + 2 * rounding_bound
+        del sample_distances
+
+        distances = block @ self.train_features.T
+        distances *= -2
+        distances += self.train_squared_norms_32
+        rows, candidates = np.nonzero(distances <= threshold.astype(np.float32)[:, None])
+        del distances
+
+        differences = block_64[rows] - self.fit_features[candidates].astype(np.float64)
+        survivor_distances = (differences * differences).sum(axis=1)
+
+        # Survivors sorted by exact distance, ties by training row index
+        counts = np.bincount(rows, minlength=n_rows)
+        columns = np.arange(rows.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        padded_candidates = np.full((n_rows, counts.max()), n_train, dtype=np.intp)
+        squared_distances = np.full((n_rows, counts.max()), np.inf)
+        padded_candidates[rows, columns] = candidates
+        squared_distances[rows, columns] = survivor_distances
+
+        n_columns = min(self.n_neighbors + 1, n_train)
+        order = np.lexsort((padded_candidates, squared_distances), axis=-1)[:, :n_columns]
+        neighbours = np.take_along_axis(padded_candidates, order, axis=1)
+        squared_distances = np.take_along_axis(squared_distances, order, axis=1)
+
+        is_tied = np.zeros(n_rows, dtype=bool)
+        if n_columns > self.n_neighbors:
+            is_tied = squared_distances[:, -1] - squared_distances[:, -2] <= rounding_bound
+
+        return neighbours[:, :self.n_neighbors], squared_distances[:, :self.n_neighbors], is_tied
+
+    def to_model_input(self, features: np.ndarray) -> np.ndarray | DataFrame:
+        if hasattr(self.model, "feature_names_in_"):
+            return DataFrame(features, columns=self.model.feature_names_in_)
+
+        return features
+
+    def vote(self, neighbours: np.ndarray, distances: np.ndarray) -> np.ndarray:
+        return count_votes(labels=self.train_target[neighbours], n_classes=self.classes.size, distances=distances if self.weights == "distance" else None)
+
+def count_votes(labels: np.ndarray, n_classes: int, distances: np.ndarray | None = None) -> np.ndarray:
+    # The argmax returns the lowest class index on ties, like scikit-learn's mode
+    n_rows = labels.shape[0]
+
+    weights = None
+    if distances is not None:
+        # Same rule as scikit-learn: exact matches get all the weight
+        with np.errstate(divide="ignore"):
+            weights = 1.0 / distances
+        is_exact_match = np.isinf(weights)
+        has_exact_match = is_exact_match.any(axis=1)
+        weights[has_exact_match] = is_exact_match[has_exact_match]
+
+    offsets = (np.arange(n_rows)[:, None] * n_classes + labels).ravel()
+    votes = np.bincount(offsets, weights=None if weights is None else weights.ravel(), minlength=n_rows * n_classes)
+    return votes.reshape(n_rows, n_classes)
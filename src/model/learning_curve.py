@@ -0,0 +1,106 @@
+from src.config.main import FEATURE_COLUMNS, LEARNING_CURVE_CLASSIFIERS, LEARNING_CURVE_FRACTIONS, LEARNING_CURVE_REPEATS
+from src.utils.parallel import SharedArrays, get_shared_array
+from src.types.dataclass import Dataset, LearningCurvePoint, ModelClassifier
+from src.model.estimator import create_estimator
+from src.model.evaluate import EvaluateModel
+from pandas import Categorical, DataFrame, concat
+from dataclasses import asdict
+from time import perf_counter
+import tracemalloc
+import numpy as np
+
+# The first fit of a worker pays for lazy imports and is left untimed
+is_warmed_up = False
+
+def get_subset(target: np.ndarray, fraction: float, random_state: int) -> np.ndarray:
+    # Every 1 / fraction-th row of the class-sorted shuffle keeps the class proportions
+    order = np.random.default_rng(random_state).permutation(target.size)
+    order = order[np.argsort(target[order], kind="stable")]
+
+    positions = np.arange(target.size)
+    return np.sort(order[np.floor((positions + 1) * fraction) > np.floor(positions * fraction)])
+
+def score_subset(classifier: str, parameters: dict, fraction: float, repeat: int, random_state: int) -> LearningCurvePoint:
+    features, target = get_shared_array("features"), get_shared_array("target")
+    subset = get_subset(target=target, fraction=fraction, random_state=random_state + repeat)
+    train_features, train_target = DataFrame(features[subset], columns=FEATURE_COLUMNS), target[subset]
+    test_features = DataFrame(get_shared_array("test_features"), columns=FEATURE_COLUMNS)
+
+    evaluate_model = EvaluateModel(dataset=None, load_dataset=None)
+
+    global is_warmed_up
+    if not is_warmed_up:
+        model = create_estimator(classifier=classifier, parameters=parameters).fit(train_features, train_target)
+        evaluate_model.predict(model_classifier=ModelClassifier(model=model, name=classifier), features=test_features)
+        is_warmed_up = True
+
+    # Allocation tracing slows Python down, so the peak is taken on a separate, untimed fit and predict
+    tracemalloc.start()
+    model = create_estimator(classifier=classifier, parameters=parameters).fit(train_features, train_target)
+    evaluate_model.predict(model_classifier=ModelClassifier(model=model, name=classifier), features=test_features)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started_at = perf_counter()
+    model = create_estimator(classifier=classifier, parameters=parameters).fit(train_features, train_target)
+    fit_time = perf_counter() - started_at
+
+    started_at = perf_counter()
+    predictions = evaluate_model.predict(model_classifier=ModelClassifier(model=model, name=classifier), features=test_features)
+    predict_time = perf_counter() - started_at
+
+    return LearningCurvePoint(
+        accuracy=float((predictions.to_numpy() == get_shared_array("test_target")).mean()),
+        train_rows=int(subset.size),
+        predict_time=predict_time,
+        peak_memory=peak_memory,
+        classifier=classifier,
+        fit_time=fit_time,
+        fraction=fraction,
+        repeat=repeat,
+    )
+
+def summarize_learning_curve(points: list[LearningCurvePoint]) -> DataFrame:
+    grouped = DataFrame([asdict(point) for point in points]).groupby(["classifier", "fraction"], sort=False)
+
+    means = grouped[["train_rows", "accuracy", "fit_time", "predict_time", "peak_memory"]].mean()
+    stds = grouped[["accuracy", "fit_time", "predict_time"]].std(ddof=0).add_suffix("_std")
+    return concat([means, stds], axis=1).reset_index()
+
+def write_learning_curve_csv(points: list[LearningCurvePoint], file_path: str) -> None:
+    DataFrame([asdict(point) for point in points]).to_csv(file_path, index=False)
+
+class LearningCurve:
+    def __init__(self, dataset: Dataset, classifiers: dict[str, dict] = LEARNING_CURVE_CLASSIFIERS, fractions: list[float] = LEARNING_CURVE_FRACTIONS, n_repeats: int = LEARNING_CURVE_REPEATS, random_state: int = 42, max_workers: int | None = None) -> None:
+        self.random_state = random_state
+        self.max_workers = max_workers
+        self.classifiers = classifiers
+        self.n_repeats = n_repeats
+        self.fractions = fractions
+        self.dataset = dataset
+
+    def run(self) -> list[LearningCurvePoint]:
+        categories = sorted(set(self.dataset.train_target.astype(str)) | set(self.dataset.test_target.astype(str)))
+        target = Categorical(self.dataset.train_target.astype(str), categories=categories).codes
+        n_rows = target.size
+
+        # Fractions too small to fit K Nearest Neighbors are left out of the curve
+        tasks = [
+            (classifier, parameters, fraction, repeat)
+            for classifier, parameters in self.classifiers.items()
+            for fraction in self.fractions
+            if int(n_rows * fraction) >= parameters.get("n_neighbors", 1)
+            for repeat in range(self.n_repeats)
+        ]
+
+        shared_arrays = SharedArrays({
+            "test_target": Categorical(self.dataset.test_target.astype(str), categories=categories).codes,
+            "test_features": self.dataset.test_features.to_numpy(dtype=np.float32),
+            "features": self.dataset.train_features.to_numpy(dtype=np.float32),
+            "target": target,
+        })
+
+        # The largest subsets are submitted first so no worker is left with one of them at the end
+        with shared_arrays, shared_arrays.create_pool(max_workers=self.max_workers) as pool:
+            futures = {index: pool.submit(score_subset, *tasks[index], self.random_state) for index in sorted(range(len(tasks)), key=lambda index: -tasks[index][2])}
+            return [futures[index].result() for index in range(len(tasks))]
@@ -1,140 +1,356 @@
-from src.types.dataclass import BasicStatistics, Dataset, ModelClassifier, ModelEvaluation
-from src.config.main import SUPPORTED_DATASET_EXTENSIONS
+from src.types.dataclass import BasicStatistics, BatchPredictionSummary, Dataset, EvaluationSettings, LearningCurvePoint, ModelClassifier, ModelEvaluation, PruningCandidate, SearchResult
+from src.config.main import APPROXIMATE_KNN_TREES, DATASET_CHUNK_SIZE, DECISION_TREE_PRUNING_TOLERANCE, FEATURE_COLUMNS, KNN_ONLINE_MAX_SAMPLES, LEARNING_CURVE_REPEATS, STREAMING_DATASET_EXTENSIONS, SUPPORTED_DATASET_EXTENSIONS, TARGET_COLUMN
+from src.model.stream import StreamingDatasetReader, clean_column, get_file_extension
 from sklearn.neighbors import KNeighborsClassifier
-from pandas import Series, read_excel, DataFrame
+from pandas import ExcelFile, Series, DataFrame
 from sklearn.tree import DecisionTreeClassifier
+from src.model.online import OnlineKNeighborsClassifier
 from src.model.evaluate import EvaluateModel
+from src.model.batch_predict import BatchPrediction, render_batch_prediction_progress
+from src.model.streaming_evaluation import StreamingEvaluation
+from src.model.learning_curve import LearningCurve, write_learning_curve_csv
 from src.model.train import TrainModel
+from src.utils.session import read_paired_bootstraps, read_pruning_results, read_search_results, read_session
+from src.model.statistics import StatisticsAccumulator
+from src.model.training_cache import TrainingCache
+from src.model.registry import DatasetRegistry
+from src.utils.cache import DatasetCache
+from typing import Callable
+from os import path
 
 class Model:
     def __init__(self) -> None:
         self.evaluate_model_class: EvaluateModel | None = None
         self.train_model_class: TrainModel | None = None
+        self.evaluation_settings = EvaluationSettings()
+        self.dataset_registry = DatasetRegistry()
+        self.training_cache = TrainingCache()
+        self.dataset_cache = DatasetCache()
         self.dataset: Dataset | None = None
 
     def load_dataset(self, file_path: str, load_rows: int = 10) -> Dataset:
-        train_dataframe, test_dataframe = self.read_file(file_path)
-        
-        loaded_successfully_msg = self.dataframes_exist(dataframes=[train_dataframe, test_dataframe])
+        dataset_key = self.dataset_registry.get_key(file_path)
+        dataset = self.get_or_load_dataset(file_path=file_path, load_rows=load_rows)
+
+        self.set_active_dataset(dataset=dataset, dataset_key=dataset_key)
+        return dataset
+
+    def get_or_load_dataset(self, file_path: str, load_rows: int = 10) -> Dataset:
+        dataset_key = self.dataset_registry.get_key(file_path)
+        dataset = self.dataset_registry.get(dataset_key)
+        if dataset:
+            return dataset
 
-        train_first_x_rows, test_first_x_rows = self.get_first_x_rows(load_rows, [train_dataframe, test_dataframe])
+        dataset = self.read_dataset(file_path=file_path, load_rows=load_rows)
+        self.dataset_registry.add(key=dataset_key, dataset=dataset)
+        return dataset
 
-        train_dataframe_basic_statistics = self.get_basic_statistics(train_dataframe)
-        test_dataframe_basic_statistics = self.get_basic_statistics(test_dataframe)
+    def set_active_dataset(self, dataset: Dataset, dataset_key: tuple[str, str] | None = None) -> None:
+        if dataset is not self.dataset:
+            # Both helpers hold a reference to the dataset they were created for
+            self.evaluate_model_class = None
+            self.train_model_class = None
 
-        train_features, train_target = self.split_dataset(train_dataframe)
-        test_features, test_target = self.split_dataset(test_dataframe)
+        if self.dataset and dataset is not self.dataset:
+            for model_classifier in [self.dataset.k_nearest_neighbors, self.dataset.decision_tree]:
+                if model_classifier:
+                    model_classifier.prediction_cache.clear()
 
-        self.dataset = Dataset(
-            train_dataframe_basic_statistics=train_dataframe_basic_statistics,
-            test_dataframe_basic_statistics=test_dataframe_basic_statistics,
+        self.dataset_registry.pin(dataset_key)
+        self.dataset = dataset
+
+    def read_dataset(self, file_path: str, load_rows: int = 10) -> Dataset:
+        if get_file_extension(file_path) in STREAMING_DATASET_EXTENSIONS:
+            # Frames are only materialized once training or evaluation needs them
+            reader = self.create_streaming_reader(file_path)
+            loaded_successfully_msg = self.sources_exist(sources=reader.sources)
+            read_basic_statistics = reader.read_basic_statistics
+            read_first_x_rows = reader.read_first_x_rows
+            read_dataframes = reader.read_dataframes
+        else:
+            train_dataframe, test_dataframe = self.read_file(file_path)
+            return self.create_dataset(file_path=file_path, dataframes=(train_dataframe, test_dataframe), load_rows=load_rows)
+
+        return Dataset(
             loaded="successfully" in loaded_successfully_msg.lower(),
-            train_dataframe_first_x_rows=train_first_x_rows,
-            test_dataframe_first_x_rows=test_first_x_rows,
-            k_nearest_neighbors_evaluation=None,
+            read_basic_statistics=read_basic_statistics,
             loaded_msg=loaded_successfully_msg,
-            train_dataframe=train_dataframe,
-            test_dataframe=test_dataframe,
-            train_features=train_features,
-            decision_tree_evaluation=None,
-            test_features=test_features,
-            train_target=train_target,
-            k_nearest_neighbors=None,
-            test_target=test_target,
-            decision_tree=None,
+            read_first_x_rows=read_first_x_rows,
+            read_dataframes=read_dataframes,
+            load_rows=load_rows,
             path=file_path,
         )
 
-        return self.dataset
+    def load_progress(self, file_path: str) -> Dataset:
+        metadata, train_dataframe, test_dataframe, evaluations, model_classifiers = read_session(file_path)
+
+        dataset = self.create_dataset(file_path=metadata["path"], dataframes=(train_dataframe, test_dataframe), load_rows=metadata["load_rows"])
+        for name, model_classifier in model_classifiers.items():
+            setattr(dataset, name, model_classifier)
+
+        for name, evaluation in evaluations.items():
+            model_classifier = model_classifiers.get(name)
+            evaluation.model = model_classifier.model if model_classifier else None
+            setattr(dataset, f"{name}_evaluation", evaluation)
+
+        dataset.hyperparameter_search_results = read_search_results(metadata)
+        dataset.paired_bootstrap_results = read_paired_bootstraps(metadata)
+        dataset.pruning_results = read_pruning_results(metadata)
+
+        self.set_active_dataset(dataset=dataset)
+        return dataset
+
+    def create_dataset(self, file_path: str, dataframes: tuple[DataFrame, DataFrame], load_rows: int) -> Dataset:
+        splits = {"train": dataframes[0], "test": dataframes[1]}
+        loaded_successfully_msg = self.dataframes_exist(dataframes=list(dataframes))
+
+        return Dataset(
+            read_basic_statistics=lambda split: self.get_basic_statistics(splits[split]),
+            loaded="successfully" in loaded_successfully_msg.lower(),
+            read_first_x_rows=lambda split, x: splits[split].head(x),
+            loaded_msg=loaded_successfully_msg,
+            read_dataframes=lambda: dataframes,
+            load_rows=load_rows,
+            path=file_path,
+        )
+
+    def profile_dataset(self, file_path: str) -> tuple[BasicStatistics, BasicStatistics]:
+        if get_file_extension(file_path) not in STREAMING_DATASET_EXTENSIONS:
+            train_dataframe, test_dataframe = self.read_file(file_path)
+            return self.get_basic_statistics(train_dataframe), self.get_basic_statistics(test_dataframe)
+
+        reader = self.create_streaming_reader(file_path)
+        return reader.read_basic_statistics("train"), reader.read_basic_statistics("test")
+
+    def create_streaming_reader(self, file_path: str) -> StreamingDatasetReader:
+        return StreamingDatasetReader(file_path=file_path, compact_dataframe=self.compact_dataframe)
 
     def dataframes_exist(self, dataframes: list[DataFrame]) -> str:
-        if all(dataframe is not None for dataframe in dataframes):
+        return self.get_loaded_msg(loaded=all(dataframe is not None for dataframe in dataframes))
+
+    def sources_exist(self, sources: dict[str, tuple[str, str | None]]) -> str:
+        return self.get_loaded_msg(loaded=all(path.isfile(file_path) for file_path, _ in sources.values()))
+
+    def get_loaded_msg(self, loaded: bool) -> str:
+        if loaded:
             return "Dataset loaded successfully"
         
         return f"Failed to load dataset. Please check if the file exists and is in a supported format ({', '.join(SUPPORTED_DATASET_EXTENSIONS)})"
         
-    def get_first_x_rows(self, x: int, dataframes: list[DataFrame]) -> list[list[dict[str, str]]]:
-        return [dataframe.head(x).to_dict(orient="records") for dataframe in dataframes]
-
     def get_dataset(self) -> Dataset | None:
         return self.dataset
 
     def get_basic_statistics(self, dataframe: DataFrame) -> BasicStatistics:
-        missing_values: Series = dataframe.isnull().sum()
-        data_types: Series = dataframe.dtypes
-        summary = dataframe.describe()
-
-        return BasicStatistics(
-            missing_values=missing_values,
-            data_types=data_types,
-            summary=summary,
-        )
+        accumulator = StatisticsAccumulator()
+        accumulator.update(dataframe)
+
+        return accumulator.to_basic_statistics()
 
     def read_file(self, file_path) -> tuple[DataFrame, DataFrame]:
-        train_dataframe = read_excel(file_path, sheet_name=1)
-        test_dataframe = read_excel(file_path, sheet_name=2)
+        cached_dataframes = self.dataset_cache.get(file_path)
+        if cached_dataframes:
+            return cached_dataframes
+
+        relevant_columns = FEATURE_COLUMNS + [TARGET_COLUMN]
 
-        train_dataframe.columns = self.clean_columns(train_dataframe)
-        test_dataframe.columns = self.clean_columns(test_dataframe)
+        with ExcelFile(file_path) as excel_file:
+            sheets = excel_file.parse(
+                usecols=lambda column: clean_column(column) in relevant_columns,
+                sheet_name=[1, 2],
+            )
 
-        relevant_columns = ["STG", "SCG", "STR", "LPR", "PEG", "UNS"]
-        train_dataframe = self.get_relevant_columns(dataframe=train_dataframe, columns=relevant_columns)
-        test_dataframe = self.get_relevant_columns(dataframe=test_dataframe, columns=relevant_columns)
+        train_dataframe, test_dataframe = [self.compact_dataframe(dataframe=sheets[sheet_name], columns=relevant_columns) for sheet_name in [1, 2]]
 
+        self.dataset_cache.set(file_path=file_path, dataframes=(train_dataframe, test_dataframe))
         return train_dataframe, test_dataframe
 
+    def compact_dataframe(self, dataframe: DataFrame, columns: list[str]) -> DataFrame:
+        dataframe.columns = self.clean_columns(dataframe)
+        dataframe = self.get_relevant_columns(dataframe=dataframe, columns=columns)
+
+        return dataframe.astype({**{feature: "float32" for feature in FEATURE_COLUMNS}, TARGET_COLUMN: "category"})
+
     def get_relevant_columns(self, dataframe: DataFrame, columns: list[str]) -> DataFrame:
         return dataframe[columns]
 
     def clean_columns(self, dataframe: DataFrame) -> DataFrame:
         return dataframe.columns.str.strip().str.upper()
 
-    def split_dataset(self, dataframe: DataFrame) -> tuple[DataFrame, Series]:
-        features = dataframe.drop("UNS", axis=1)
-        target = dataframe["UNS"]
+    def get_train_model(self) -> TrainModel:
+        if not self.train_model_class:
+            self.train_model_class = TrainModel(dataset=self.dataset, training_cache=self.training_cache)
+
+        return self.train_model_class
 
-        return features, target
+    def get_evaluate_model(self) -> EvaluateModel:
+        if not self.evaluate_model_class:
+            self.evaluate_model_class = EvaluateModel(dataset=self.dataset, load_dataset=self.get_or_load_dataset, settings=self.evaluation_settings)
+
+        return self.evaluate_model_class
 
-    def train_model(self, classifier: str, random_state: int | None, n_neighbors: int | None) -> KNeighborsClassifier | DecisionTreeClassifier | None:
+    def train_model(self, classifier: str, random_state: int | None, n_neighbors: int | None, n_trees: int = APPROXIMATE_KNN_TREES) -> KNeighborsClassifier | DecisionTreeClassifier | None:
         if not self.dataset:
             return None
 
-        if not self.train_model_class:
-            self.train_model_class = TrainModel(dataset=self.dataset)
-            
-        trained_model = self.train_model_class.train(classifier=classifier, random_state=random_state, n_neighbors=n_neighbors)
+        trained_model = self.get_train_model().train(classifier=classifier, random_state=random_state, n_neighbors=n_neighbors, n_trees=n_trees)
 
-        setattr(self.dataset, classifier.lower().replace(" ", "_"), ModelClassifier(name=classifier, model=trained_model))
+        # The approximate forest takes the place of the exact K Nearest Neighbors model
+        classifier = classifier.removesuffix(" (approximate)")
+        setattr(self.dataset, classifier.lower().replace(" ", "_"), ModelClassifier(name=classifier, model=trained_model, fit_time=self.get_train_model().fit_time))
 
-    def evaluate_model(self) -> ModelEvaluation | None:
+    def search_hyperparameters(self, classifier: str, random_state: int, mode: str = "grid", n_iter: int = 20) -> list[SearchResult] | None:
         if not self.dataset:
             return None
 
-        if not self.evaluate_model_class:
-            self.evaluate_model_class = EvaluateModel(dataset=self.dataset, load_dataset=self.load_dataset)
+        best_model, results = self.get_train_model().search(classifier=classifier, random_state=random_state, mode=mode, n_iter=n_iter)
 
-        model_classifier = self.dataset.k_nearest_neighbors if self.dataset.k_nearest_neighbors else self.dataset.decision_tree
+        self.dataset.hyperparameter_search_results[classifier] = results
+        setattr(self.dataset, classifier.lower().replace(" ", "_"), ModelClassifier(name=classifier, model=best_model, fit_time=self.get_train_model().fit_time))
+        return results
+
+    def prune_decision_tree(self, random_state: int, tolerance: float = DECISION_TREE_PRUNING_TOLERANCE) -> list[PruningCandidate] | None:
+        if not self.dataset:
+            return None
+
+        pruned_tree, candidates = self.get_train_model().prune(random_state=random_state, tolerance=tolerance)
+
+        self.dataset.pruning_results = candidates
+        self.dataset.decision_tree = ModelClassifier(name="Decision Tree", model=pruned_tree, fit_time=self.get_train_model().fit_time)
+        return candidates
+
+    def evaluate_model(self, name: str | None = None) -> ModelEvaluation | None:
+        if not self.dataset:
+            return None
+
+        model_classifiers = self.get_trained_model_classifiers()
+        model_classifier = next((model_classifier for model_classifier in model_classifiers if name in (None, model_classifier.name)), None)
         if not model_classifier:
             return None
 
-        evaluation = self.evaluate_model_class.evaluate(model_classifier=model_classifier)
+        evaluation = self.get_evaluate_model().evaluate(model_classifier=model_classifier)
         
         setattr(self.dataset, f"{model_classifier.name.lower().replace(' ', '_')}_evaluation", evaluation)
         return evaluation
 
+    def evaluate_all_models(self) -> list[ModelEvaluation] | None:
+        if not self.dataset:
+            return None
+
+        model_classifiers = self.get_trained_model_classifiers()
+        if not model_classifiers:
+            return None
+
+        evaluations, paired_bootstraps = self.get_evaluate_model().evaluate_all(model_classifiers=model_classifiers)
+        for evaluation in evaluations:
+            setattr(self.dataset, f"{evaluation.name.lower().replace(' ', '_')}_evaluation", evaluation)
+
+        self.dataset.paired_bootstrap_results = paired_bootstraps
+
+        return evaluations
+
+    def get_trained_model_classifiers(self) -> list[ModelClassifier]:
+        return [model_classifier for model_classifier in [self.dataset.k_nearest_neighbors, self.dataset.decision_tree] if model_classifier]
+
     def predict(self, features: DataFrame) -> Series | None:
         if not self.dataset:
             return None
 
-        if not self.evaluate_model_class:
-            self.evaluate_model_class = EvaluateModel(dataset=self.dataset, load_dataset=self.load_dataset)
+        model_classifier = self.dataset.k_nearest_neighbors if self.dataset.k_nearest_neighbors else self.dataset.decision_tree
+        if not model_classifier:
+            return None
+
+        return self.predict_cached(features=features, model_classifier=model_classifier)
+
+    def predict_cached(self, features: DataFrame, model_classifier: ModelClassifier) -> Series:
+        prediction_cache = model_classifier.prediction_cache
+        keys = prediction_cache.get_keys(features)
+        predictions = [prediction_cache.get(key) for key in keys]
+
+        missed_rows = [row for row, prediction in enumerate(predictions) if prediction is None]
+        if missed_rows:
+            missed_predictions = self.get_evaluate_model().predict(features=features.iloc[missed_rows], model_classifier=model_classifier)
+            for row, prediction in zip(missed_rows, missed_predictions):
+                prediction_cache.set(keys[row], prediction)
+                predictions[row] = prediction
+
+        return Series(predictions, index=features.index, name=f"{model_classifier.name} predictions")
+
+    def predict_sample(self, features: list[float]) -> str | None:
+        if not self.dataset:
+            return None
+
+        model_classifier = self.dataset.k_nearest_neighbors if self.dataset.k_nearest_neighbors else self.dataset.decision_tree
+        if not model_classifier:
+            return None
+
+        key = model_classifier.prediction_cache.get_keys([features])[0]
+        prediction = model_classifier.prediction_cache.get(key)
+        if prediction is None:
+            prediction = self.get_evaluate_model().predict_sample(features=features, model_classifier=model_classifier)
+            model_classifier.prediction_cache.set(key, prediction)
+
+        return prediction
+
+    def predict_file(self, input_path: str, output_path: str, chunk_size: int = DATASET_CHUNK_SIZE, on_progress: Callable[[int, float], None] | None = render_batch_prediction_progress) -> BatchPredictionSummary | None:
+        if not self.dataset:
+            return None
 
         model_classifier = self.dataset.k_nearest_neighbors if self.dataset.k_nearest_neighbors else self.dataset.decision_tree
         if not model_classifier:
             return None
 
-        return self.evaluate_model_class.predict(features=features, model_classifier=model_classifier)
+        batch_prediction = BatchPrediction(predict=lambda features: self.get_evaluate_model().predict(features=features, model_classifier=model_classifier), chunk_size=chunk_size, on_progress=on_progress)
+        return batch_prediction.run(input_path=input_path, output_path=output_path)
+
+    def evaluate_file(self, input_path: str, chunk_size: int = DATASET_CHUNK_SIZE, on_progress: Callable[[int, float], None] | None = render_batch_prediction_progress) -> list[ModelEvaluation] | None:
+        if not self.dataset:
+            return None
+
+        model_classifiers = self.get_trained_model_classifiers()
+        if not model_classifiers:
+            return None
+
+        predictors = {model_classifier.name: lambda features, model_classifier=model_classifier: self.get_evaluate_model().predict(features=features, model_classifier=model_classifier) for model_classifier in model_classifiers}
+        evaluations = StreamingEvaluation(predictors=predictors, chunk_size=chunk_size, on_progress=on_progress).run(input_path=input_path)
+
+        for evaluation, model_classifier in zip(evaluations, model_classifiers):
+            evaluation.model = model_classifier.model
+            setattr(self.dataset, f"{evaluation.name.lower().replace(' ', '_')}_evaluation", evaluation)
+
+        return evaluations
+
+    def run_learning_curve(self, output_path: str | None = None, n_repeats: int = LEARNING_CURVE_REPEATS) -> list[LearningCurvePoint] | None:
+        if not self.dataset:
+            return None
+
+        points = LearningCurve(dataset=self.dataset, n_repeats=n_repeats).run()
+        if output_path:
+            write_learning_curve_csv(points=points, file_path=output_path)
+
+        return points
+
+    def append_training_samples(self, features: DataFrame, target: list[str]) -> OnlineKNeighborsClassifier | None:
+        if not self.dataset or not self.dataset.k_nearest_neighbors:
+            return None
+
+        # The first append swaps the fitted model for an online one over the same rows
+        model_classifier = self.dataset.k_nearest_neighbors
+        if isinstance(model_classifier.model, KNeighborsClassifier):
+            model_classifier.model = OnlineKNeighborsClassifier.from_model(model_classifier.model, max_samples=KNN_ONLINE_MAX_SAMPLES)
+        elif not isinstance(model_classifier.model, OnlineKNeighborsClassifier):
+            return None
+
+        model_classifier.model.append(features, target)
+        model_classifier.prediction_cache.clear()
+        rows = features.assign(**{TARGET_COLUMN: target})
+        self.dataset.append_train_rows(rows=self.compact_dataframe(rows, FEATURE_COLUMNS + [TARGET_COLUMN]), max_train_rows=model_classifier.model.max_samples)
+
+        # Fold assignments were drawn for the previous training rows
+        if self.evaluate_model_class:
+            self.evaluate_model_class.fold_ids.clear()
+
+        return model_classifier.model
 
     def create_new_features_sample(self, features: list[float]) -> DataFrame:
-        new_feature_sample = DataFrame([features], columns=["STG", "SCG", "STR", "LPR", "PEG"])
+        new_feature_sample = DataFrame([features], columns=FEATURE_COLUMNS, dtype="float32")
         return new_feature_sample
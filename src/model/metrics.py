@@ -0,0 +1,96 @@
+from src.types.dataclass import ConfusionMatrix
+from pandas import Series, factorize
+import numpy as np
+
+def encode_labels(values) -> tuple[np.ndarray, np.ndarray]:
+    codes, labels = factorize(np.asarray(values))
+    if (codes < 0).any():
+        raise ValueError("Targets and predictions must not contain missing values")
+
+    return codes, np.asarray(labels)
+
+def get_confusion_matrix(target, predictions) -> ConfusionMatrix:
+    target_codes, target_labels = encode_labels(target)
+    prediction_codes, prediction_labels = encode_labels(predictions)
+    return get_confusion_matrix_from_codes(target_codes=target_codes, target_labels=target_labels, prediction_codes=prediction_codes, prediction_labels=prediction_labels)
+
+def get_confusion_matrix_from_codes(target_codes: np.ndarray, target_labels: np.ndarray, prediction_codes: np.ndarray, prediction_labels: np.ndarray) -> ConfusionMatrix:
+    if len(target_codes) != len(prediction_codes):
+        raise ValueError(f"Found {len(target_codes)} targets but {len(prediction_codes)} predictions")
+
+    labels = np.unique(np.concatenate([target_labels, prediction_labels]))
+    target_codes = np.searchsorted(labels, target_labels)[target_codes]
+    prediction_codes = np.searchsorted(labels, prediction_labels)[prediction_codes]
+
+    n_labels = len(labels)
+    counts = np.bincount(target_codes * n_labels + prediction_codes, minlength=n_labels * n_labels).reshape(n_labels, n_labels)
+    return ConfusionMatrix(labels=labels.tolist(), counts=counts)
+
+def get_accuracy(confusion_matrix: ConfusionMatrix) -> float:
+    return float(np.trace(confusion_matrix.counts) / max(confusion_matrix.counts.sum(), 1))
+
+def get_classification_report(confusion_matrix: ConfusionMatrix) -> dict:
+    # Same keys, formulas and float types as classification_report(output_dict=True, zero_division=0)
+    counts = confusion_matrix.counts
+    true_positives = np.diagonal(counts).astype(np.float64)
+    support, predicted = counts.sum(axis=1), counts.sum(axis=0)
+
+    precision = np.divide(true_positives, predicted, out=np.zeros_like(true_positives), where=predicted > 0)
+    recall = np.divide(true_positives, support, out=np.zeros_like(true_positives), where=support > 0)
+    f1_score = np.divide(2 * true_positives, support + predicted, out=np.zeros_like(true_positives), where=support + predicted > 0)
+
+    report = {
+        f"{label}": {"precision": float(precision[i]), "recall": float(recall[i]), "f1-score": float(f1_score[i]), "support": float(support[i])}
+        for i, label in enumerate(confusion_matrix.labels)
+    }
+
+    report["accuracy"] = get_accuracy(confusion_matrix)
+    for name, weights in [("macro avg", None), ("weighted avg", support if support.sum() > 0 else None)]:
+        # Without any rows there are no labels to average
+        report[name] = {
+            "precision": float(np.average(precision, weights=weights)) if len(precision) else 0.0,
+            "recall": float(np.average(recall, weights=weights)) if len(recall) else 0.0,
+            "f1-score": float(np.average(f1_score, weights=weights)) if len(f1_score) else 0.0,
+            "support": float(support.sum()),
+        }
+
+    return report
+
+def get_macro_scores(confusion_matrix: ConfusionMatrix) -> tuple[float, float, float]:
+    macro = get_classification_report(confusion_matrix)["macro avg"]
+    return macro["precision"], macro["recall"], macro["f1-score"]
+
+def get_prediction_distribution(confusion_matrix: ConfusionMatrix) -> Series:
+    # Column sums are the prediction counts, ordered like value_counts (most frequent first)
+    counts = Series(confusion_matrix.counts.sum(axis=0), index=confusion_matrix.labels, name="count")
+    return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+class ConfusionMatrixAccumulator:
+    def __init__(self) -> None:
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.indices: dict = {}
+
+    def get_indices(self, values) -> np.ndarray:
+        codes, labels = encode_labels(values)
+        for label in labels:
+            self.indices.setdefault(label, len(self.indices))
+
+        return np.array([self.indices[label] for label in labels], dtype=np.int64)[codes]
+
+    def update(self, target, predictions) -> None:
+        target_indices, prediction_indices = self.get_indices(target), self.get_indices(predictions)
+        if len(target_indices) != len(prediction_indices):
+            raise ValueError(f"Found {len(target_indices)} targets but {len(prediction_indices)} predictions")
+
+        n_labels = len(self.indices)
+        if n_labels > len(self.counts):
+            counts = np.zeros((n_labels, n_labels), dtype=np.int64)
+            counts[:len(self.counts), :len(self.counts)] = self.counts
+            self.counts = counts
+
+        self.counts += np.bincount(target_indices * n_labels + prediction_indices, minlength=n_labels * n_labels).reshape(n_labels, n_labels)
+
+    def to_confusion_matrix(self) -> ConfusionMatrix:
+        labels = np.asarray(list(self.indices))
+        order = np.argsort(labels, kind="stable")
+        return ConfusionMatrix(labels=labels[order].tolist(), counts=self.counts[np.ix_(order, order)])
@@ -0,0 +1,139 @@
+from src.config.main import KNN_ONLINE_MAX_SAMPLES, KNN_ONLINE_REBUILD_FRACTION, KNN_PREDICTION_MEMORY_BUDGET
+from sklearn.neighbors import KDTree, KNeighborsClassifier
+from sklearn.metrics import DistanceMetric
+from sklearn.base import BaseEstimator, ClassifierMixin
+from src.model.knn import count_votes
+import numpy as np
+
+class OnlineKNeighborsClassifier(ClassifierMixin, BaseEstimator):
+    def __init__(self, n_neighbors: int = 5, weights: str = "uniform", metric: str = "euclidean", max_samples: int | None = KNN_ONLINE_MAX_SAMPLES, rebuild_fraction: float = KNN_ONLINE_REBUILD_FRACTION) -> None:
+        self.rebuild_fraction = rebuild_fraction
+        self.n_neighbors = n_neighbors
+        self.max_samples = max_samples
+        self.weights = weights
+        self.metric = metric
+
+    @classmethod
+    def from_model(cls, model: KNeighborsClassifier, max_samples: int | None = KNN_ONLINE_MAX_SAMPLES) -> "OnlineKNeighborsClassifier":
+        online_model = cls(n_neighbors=model.n_neighbors, weights=model.weights, metric=model.effective_metric_, max_samples=max_samples)
+        return online_model.fit(model._fit_X, model.classes_[model._y], feature_names=getattr(model, "feature_names_in_", None))
+
+    def fit(self, features, target, feature_names: np.ndarray | None = None) -> "OnlineKNeighborsClassifier":
+        if hasattr(features, "columns"):
+            feature_names = features.columns
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+        self.features_ = np.array(features, dtype=np.float32, order="C")
+        self.classes_, self.target_codes_ = np.unique(np.asarray(target), return_inverse=True)
+        self.n_features_in_ = self.features_.shape[1]
+        self.distance_metric_ = DistanceMetric.get_metric(self.metric)
+
+        # Live rows are features_[start_:stop_], the tree covers features_[tree_start_:tree_stop_]
+        self.start_, self.stop_ = 0, len(self.features_)
+        self.apply_window()
+        self.rebuild()
+        return self
+
+    @property
+    def n_samples_fit_(self) -> int:
+        return self.stop_ - self.start_
+
+    @property
+    def train_features_(self) -> np.ndarray:
+        return self.features_[self.start_:self.stop_]
+
+    @property
+    def train_target_(self) -> np.ndarray:
+        return self.classes_.take(self.target_codes_[self.start_:self.stop_])
+
+    def append(self, features, target) -> "OnlineKNeighborsClassifier":
+        features = np.atleast_2d(np.asarray(features, dtype=np.float32))
+        codes = self.get_codes(np.atleast_1d(np.asarray(target)))
+
+        if self.stop_ + len(features) > len(self.features_):
+            self.reserve(len(features))
+
+        self.features_[self.stop_:self.stop_ + len(features)] = features
+        self.target_codes_[self.stop_:self.stop_ + len(features)] = codes
+        self.stop_ += len(features)
+        self.apply_window()
+
+        tree_size = self.tree_stop_ - self.tree_start_
+        changed_rows = (self.stop_ - self.tree_stop_) + (self.start_ - self.tree_start_)
+        if changed_rows > self.rebuild_fraction * max(tree_size, 1):
+            self.rebuild()
+
+        return self
+
+    def reserve(self, n_rows: int) -> None:
+        n_live = self.stop_ - self.start_
+        capacity = max(2 * (n_live + n_rows), 16)
+
+        features = np.empty((capacity, self.n_features_in_), dtype=np.float32)
+        target_codes = np.empty(capacity, dtype=self.target_codes_.dtype)
+        features[:n_live] = self.features_[self.start_:self.stop_]
+        target_codes[:n_live] = self.target_codes_[self.start_:self.stop_]
+
+        self.tree_start_ -= self.start_
+        self.tree_stop_ -= self.start_
+        self.features_, self.target_codes_ = features, target_codes
+        self.start_, self.stop_ = 0, n_live
+
+    def apply_window(self) -> None:
+        if self.max_samples is not None:
+            self.start_ = max(self.start_, self.stop_ - self.max_samples)
+
+    def rebuild(self) -> None:
+        self.tree_ = KDTree(self.features_[self.start_:self.stop_], metric=self.metric)
+        self.tree_start_, self.tree_stop_ = self.start_, self.stop_
+
+    def get_codes(self, labels: np.ndarray) -> np.ndarray:
+        new_labels = np.setdiff1d(labels, self.classes_)
+        if new_labels.size:
+            # Keep classes_ sorted like scikit-learn, existing codes move with their class
+            classes = np.union1d(self.classes_, new_labels).astype(self.classes_.dtype)
+            self.target_codes_[:self.stop_] = np.searchsorted(classes, self.classes_)[self.target_codes_[:self.stop_]]
+            self.classes_ = classes
+
+        return np.searchsorted(self.classes_, labels)
+
+    def kneighbors(self, features, n_neighbors: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        features = np.ascontiguousarray(features, dtype=np.float32).astype(np.float64)
+        n_neighbors = n_neighbors or self.n_neighbors
+
+        # Rows appended after the last rebuild are searched by brute force
+        n_recent = self.stop_ - max(self.tree_stop_, self.start_)
+        block_size = max(1, KNN_PREDICTION_MEMORY_BUDGET // (16 * (n_recent + n_neighbors + self.start_ - self.tree_start_)))
+
+        blocks = [self.kneighbors_block(features[start:start + block_size], n_neighbors) for start in range(0, len(features), block_size)]
+        if not blocks:
+            return np.empty((0, n_neighbors)), np.empty((0, n_neighbors), dtype=np.intp)
+
+        return np.concatenate([block[0] for block in blocks]), np.concatenate([block[1] for block in blocks])
+
+    def kneighbors_block(self, block: np.ndarray, n_neighbors: int) -> tuple[np.ndarray, np.ndarray]:
+        # Ask the tree for extra neighbours to make up for its rows that left the window
+        n_evicted = max(0, self.start_ - self.tree_start_)
+        tree_distances, tree_rows = self.tree_.query(block, k=min(n_neighbors + n_evicted, self.tree_stop_ - self.tree_start_))
+        tree_rows = tree_rows + self.tree_start_
+        tree_distances[tree_rows < self.start_] = np.inf
+
+        recent_start = max(self.tree_stop_, self.start_)
+        recent_distances = np.empty((len(block), 0))
+        if recent_start < self.stop_:
+            recent_distances = self.distance_metric_.pairwise(block, self.features_[recent_start:self.stop_].astype(np.float64))
+        recent_rows = np.broadcast_to(np.arange(recent_start, self.stop_), recent_distances.shape)
+
+        # Stable sort keeps the tree's order on ties and puts older rows first
+        distances = np.concatenate([tree_distances, recent_distances], axis=1)
+        rows = np.concatenate([tree_rows, recent_rows], axis=1)
+        order = np.argsort(distances, axis=1, kind="stable")[:, :n_neighbors]
+
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(rows, order, axis=1) - self.start_
+
+    def predict(self, features) -> np.ndarray:
+        distances, neighbours = self.kneighbors(features)
+        labels = self.target_codes_[self.start_:self.stop_][neighbours]
+        votes = count_votes(labels=labels, n_classes=len(self.classes_), distances=distances if self.weights == "distance" else None)
+        return self.classes_.take(votes.argmax(axis=1))
@@ -0,0 +1,41 @@
+from src.config.main import PREDICTION_CACHE_PRECISION, PREDICTION_CACHE_SIZE
+from collections import OrderedDict
+from typing import Any
+import numpy as np
+
+class PredictionCache:
+    def __init__(self, max_entries: int = PREDICTION_CACHE_SIZE, precision: int | None = PREDICTION_CACHE_PRECISION) -> None:
+        self.predictions: OrderedDict[bytes, Any] = OrderedDict()
+        self.max_entries = max_entries
+        self.precision = precision
+        self.evictions = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_keys(self, features) -> list[bytes]:
+        features = np.asarray(features, dtype=np.float32).reshape(-1, np.shape(features)[-1])
+        if self.precision is not None:
+            features = np.round(features, self.precision)
+
+        # Adding 0.0 turns -0.0 into 0.0, both compare equal but have different bytes
+        return [row.tobytes() for row in features + np.float32(0.0)]
+
+    def get(self, key: bytes) -> Any | None:
+        if key not in self.predictions:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.predictions.move_to_end(key)
+        return self.predictions[key]
+
+    def set(self, key: bytes, prediction: Any) -> None:
+        self.predictions[key] = prediction
+        self.predictions.move_to_end(key)
+
+        if len(self.predictions) > self.max_entries:
+            self.predictions.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self.predictions.clear()
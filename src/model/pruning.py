@@ -0,0 +1,71 @@
+from src.config.main import DECISION_TREE_PRUNING_TOLERANCE, DECISION_TREE_PRUNING_VALIDATION_FRACTION
+from src.utils.parallel import SharedArrays, get_shared_array, get_worker_count
+from src.model.compiled_tree import CompiledDecisionTree
+from src.types.dataclass import Dataset, PruningCandidate
+from sklearn.tree import DecisionTreeClassifier
+from src.model.folds import get_fold_ids
+from time import perf_counter
+from pandas import Categorical
+import numpy as np
+
+def score_alpha(ccp_alpha: float, random_state: int) -> PruningCandidate:
+    features, target, is_validation = get_shared_array("features"), get_shared_array("target"), get_shared_array("is_validation")
+    estimator = DecisionTreeClassifier(random_state=random_state, ccp_alpha=ccp_alpha)
+
+    started_at = perf_counter()
+    estimator.fit(features[~is_validation], target[~is_validation])
+    fit_time = perf_counter() - started_at
+
+    compiled_tree = CompiledDecisionTree.from_model(estimator)
+    samples = features[is_validation].tolist()
+    started_at = perf_counter()
+    predictions = [compiled_tree.predict_one(sample) for sample in samples]
+    sample_latency = (perf_counter() - started_at) / max(len(samples), 1)
+
+    return PruningCandidate(
+        accuracy=float((np.asarray(predictions) == target[is_validation]).mean()),
+        node_count=int(estimator.tree_.node_count),
+        depth=int(estimator.get_depth()),
+        sample_latency=sample_latency,
+        ccp_alpha=float(ccp_alpha),
+        fit_time=fit_time,
+    )
+
+class CostComplexityPruning:
+    def __init__(self, dataset: Dataset, random_state: int = 42, validation_fraction: float = DECISION_TREE_PRUNING_VALIDATION_FRACTION, tolerance: float = DECISION_TREE_PRUNING_TOLERANCE, max_workers: int | None = None) -> None:
+        self.validation_fraction = validation_fraction
+        self.random_state = random_state
+        self.max_workers = max_workers
+        self.tolerance = tolerance
+        self.dataset = dataset
+
+    def get_validation_mask(self, target_codes: np.ndarray) -> np.ndarray:
+        # The first of round(1 / fraction) stratified folds is held out
+        n_splits = max(2, round(1 / self.validation_fraction))
+        return get_fold_ids(target_codes=target_codes, n_splits=n_splits, random_state=self.random_state) == 0
+
+    def run(self) -> list[PruningCandidate]:
+        features = self.dataset.train_features.to_numpy(dtype=np.float32)
+        target = Categorical(self.dataset.train_target).codes
+        is_validation = self.get_validation_mask(target)
+
+        pruning_path = DecisionTreeClassifier(random_state=self.random_state).cost_complexity_pruning_path(features[~is_validation], target[~is_validation])
+        ccp_alphas = np.unique(np.maximum(pruning_path.ccp_alphas, 0.0))
+
+        shared_arrays = SharedArrays({"features": features, "target": target, "is_validation": is_validation})
+        with shared_arrays, shared_arrays.create_pool(max_workers=self.max_workers) as pool:
+            # Long paths are sent in chunks, a single fit is far cheaper than a task round trip
+            chunksize = max(1, len(ccp_alphas) // (4 * get_worker_count(self.max_workers)))
+            candidates = list(pool.map(score_alpha, ccp_alphas.tolist(), [self.random_state] * len(ccp_alphas), chunksize=chunksize))
+
+        self.select(candidates)
+        return candidates
+
+    def select(self, candidates: list[PruningCandidate]) -> PruningCandidate:
+        best_accuracy = max(candidate.accuracy for candidate in candidates)
+        eligible = [candidate for candidate in candidates if candidate.accuracy >= best_accuracy - self.tolerance]
+
+        # Fewest nodes first, the stronger pruning wins when two alphas give the same size
+        selected = min(eligible, key=lambda candidate: (candidate.node_count, -candidate.ccp_alpha))
+        selected.selected = True
+        return selected
@@ -0,0 +1,66 @@
+from src.config.main import DATASET_REGISTRY_MEMORY_BUDGET
+from src.types.dataclass import Dataset
+from src.utils.hash import hash_file
+from collections import OrderedDict
+from os import path, stat
+
+class DatasetRegistry:
+    def __init__(self, memory_budget: int = DATASET_REGISTRY_MEMORY_BUDGET) -> None:
+        self.datasets: OrderedDict[tuple[str, str], Dataset] = OrderedDict()
+        self.file_hashes: dict[str, tuple[int, int, str]] = {}
+        self.pinned_key: tuple[str, str] | None = None
+        self.memory_budget = memory_budget
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(self, file_path: str) -> tuple[str, str]:
+        absolute_path = path.abspath(file_path)
+        file_stat = stat(absolute_path)
+
+        size, mtime_ns, content_hash = self.file_hashes.get(absolute_path, (None, None, None))
+        if size != file_stat.st_size or mtime_ns != file_stat.st_mtime_ns:
+            content_hash = hash_file(absolute_path)
+            self.file_hashes[absolute_path] = (file_stat.st_size, file_stat.st_mtime_ns, content_hash)
+
+        return absolute_path, content_hash
+
+    def get(self, key: tuple[str, str]) -> Dataset | None:
+        dataset = self.datasets.get(key)
+        if not dataset:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.datasets.move_to_end(key)
+        return dataset
+
+    def add(self, key: tuple[str, str], dataset: Dataset) -> None:
+        # A new content hash for the same path makes the previous entry unreachable
+        for stale_key in [stale_key for stale_key in self.datasets if stale_key[0] == key[0] and stale_key != key]:
+            del self.datasets[stale_key]
+
+        self.datasets[key] = dataset
+        self.datasets.move_to_end(key)
+        self.evict()
+
+    def pin(self, key: tuple[str, str] | None) -> None:
+        self.pinned_key = key
+        self.evict()
+
+    def evict(self) -> None:
+        for key in list(self.datasets.keys()):
+            if self.get_memory_usage() <= self.memory_budget:
+                return
+
+            if key != self.pinned_key:
+                del self.datasets[key]
+
+    def get_memory_usage(self) -> int:
+        return sum(self.get_dataset_memory_usage(dataset) for dataset in self.datasets.values())
+
+    def get_dataset_memory_usage(self, dataset: Dataset) -> int:
+        # Lazy datasets that have not read their frames yet do not hold any data
+        if "dataframes" not in dataset.__dict__:
+            return 0
+
+        return sum(int(dataframe.memory_usage(deep=True).sum()) for dataframe in dataset.dataframes)
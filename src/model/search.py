@@ -0,0 +1,75 @@
+from src.config.main import CROSS_VALIDATION_FOLDS, HYPERPARAMETER_SEARCH_SPACES
+from src.utils.parallel import SharedArrays, get_shared_array
+from src.types.dataclass import Dataset, SearchResult
+from src.model.estimator import create_estimator
+from src.model.folds import get_fold_ids
+from itertools import product
+from time import perf_counter
+from pandas import Categorical
+import numpy as np
+
+def score_candidate(classifier: str, parameters: dict, n_splits: int) -> tuple[float, float, float]:
+    features, target, fold_ids = get_shared_array("features"), get_shared_array("target"), get_shared_array("fold_ids")
+
+    scores = []
+    fit_time = 0.0
+    for fold in range(n_splits):
+        is_test = fold_ids == fold
+        estimator = create_estimator(classifier=classifier, parameters=parameters)
+
+        started_at = perf_counter()
+        estimator.fit(features[~is_test], target[~is_test])
+        fit_time += perf_counter() - started_at
+
+        scores.append(float((estimator.predict(features[is_test]) == target[is_test]).mean()))
+
+    return float(np.mean(scores)), float(np.std(scores)), fit_time / n_splits
+
+class HyperparameterSearch:
+    def __init__(self, dataset: Dataset, n_splits: int = CROSS_VALIDATION_FOLDS, random_state: int = 42, max_workers: int | None = None) -> None:
+        self.random_state = random_state
+        self.max_workers = max_workers
+        self.n_splits = n_splits
+        self.dataset = dataset
+
+    def get_candidates(self, classifier: str, mode: str, n_iter: int, fixed_parameters: dict) -> list[dict]:
+        search_space = HYPERPARAMETER_SEARCH_SPACES[classifier]
+        candidates = [dict(zip(search_space.keys(), values)) for values in product(*search_space.values())]
+
+        if classifier == "K Nearest Neighbors":
+            # Every training fold has to hold at least n_neighbors rows
+            smallest_training_fold = len(self.dataset.train_target) - int(np.ceil(len(self.dataset.train_target) / self.n_splits))
+            candidates = [candidate for candidate in candidates if candidate["n_neighbors"] <= smallest_training_fold]
+
+        if mode == "random" and n_iter < len(candidates):
+            random = np.random.default_rng(self.random_state)
+            candidates = [candidates[i] for i in sorted(random.choice(len(candidates), size=n_iter, replace=False))]
+
+        return [{**candidate, **fixed_parameters} for candidate in candidates]
+
+    def run(self, classifier: str, mode: str = "grid", n_iter: int = 20, fixed_parameters: dict | None = None) -> list[SearchResult]:
+        candidates = self.get_candidates(classifier=classifier, mode=mode, n_iter=n_iter, fixed_parameters=fixed_parameters or {})
+
+        target = Categorical(self.dataset.train_target).codes
+        shared_arrays = SharedArrays({
+            "fold_ids": get_fold_ids(target_codes=target, n_splits=self.n_splits, random_state=self.random_state),
+            "features": self.dataset.train_features.to_numpy(dtype=np.float32),
+            "target": target,
+        })
+
+        with shared_arrays, shared_arrays.create_pool(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(score_candidate, classifier, candidate, self.n_splits) for candidate in candidates]
+            scores = [future.result() for future in futures]
+
+        ranked = sorted(zip(candidates, scores), key=lambda result: (-result[1][0], result[1][1]))
+        return [
+            SearchResult(
+                parameters=candidate,
+                classifier=classifier,
+                mean_score=mean_score,
+                std_score=std_score,
+                fit_time=fit_time,
+                rank=rank,
+            )
+            for rank, (candidate, (mean_score, std_score, fit_time)) in enumerate(ranked, start=1)
+        ]
@@ -0,0 +1,152 @@
+from src.types.dataclass import BasicStatistics
+from pandas import DataFrame, Series
+import numpy as np
+
+class QuantileSketch:
+    def __init__(self, capacity: int = 2048) -> None:
+        self.levels: list[np.ndarray] = [np.empty(0)]
+        self.capacity = capacity
+        self.compactions = 0
+
+    def update(self, values: np.ndarray) -> None:
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.compact()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for level, values in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], values])
+
+        self.compactions += other.compactions
+        self.compact()
+
+    def compact(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            while self.levels[level].size > self.capacity:
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+
+                values = np.sort(self.levels[level])
+                keep = values.size - values.size % 2
+                # Alternate the offset so promoted values are not biased towards one side
+                promoted = values[self.compactions % 2:keep:2]
+                self.levels[level] = values[keep:]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.compactions += 1
+            level += 1
+
+    def quantiles(self, percentiles: list[float]) -> list[float]:
+        if all(values.size == 0 for values in self.levels):
+            return [np.nan] * len(percentiles)
+
+        if len(self.levels) == 1:
+            return list(np.quantile(self.levels[0], percentiles))
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level_values.size, 2.0 ** level) for level, level_values in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+
+        # Rank of each stored value at the centre of the weight it represents
+        ranks = np.cumsum(weights) - (weights + 1) / 2
+        return list(np.interp([percentile * (weights.sum() - 1) for percentile in percentiles], ranks, values))
+
+class ColumnAccumulator:
+    def __init__(self, sketch_capacity: int = 2048) -> None:
+        self.sketch = QuantileSketch(capacity=sketch_capacity)
+        self.missing = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        present = values[~np.isnan(values)]
+        self.missing += values.size - present.size
+        if present.size == 0:
+            return
+
+        mean = present.mean()
+        self.merge_moments(count=present.size, mean=mean, m2=((present - mean) ** 2).sum(), minimum=present.min(), maximum=present.max())
+        self.sketch.update(present)
+
+    def merge(self, other: "ColumnAccumulator") -> None:
+        self.missing += other.missing
+        self.merge_moments(count=other.count, mean=other.mean, m2=other.m2, minimum=other.min, maximum=other.max)
+        self.sketch.merge(other.sketch)
+
+    def merge_moments(self, count: int, mean: float, m2: float, minimum: float, maximum: float) -> None:
+        # Chan et al. pairwise update of the Welford mean and sum of squared deviations
+        total = self.count + count
+        if total == 0:
+            return
+
+        delta = mean - self.mean
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.mean += delta * count / total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+        self.count = total
+
+    def summarize(self, percentiles: list[float]) -> Series:
+        has_values = self.count > 0
+
+        return Series({
+            "count": float(self.count),
+            "mean": self.mean if has_values else np.nan,
+            "std": np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan,
+            "min": self.min if has_values else np.nan,
+            **{f"{percentile * 100:g}%": quantile for percentile, quantile in zip(percentiles, self.sketch.quantiles(percentiles))},
+            "max": self.max if has_values else np.nan,
+        })
+
+class StatisticsAccumulator:
+    percentiles = [0.25, 0.5, 0.75]
+
+    def __init__(self, sketch_capacity: int = 2048) -> None:
+        self.columns: dict[str, ColumnAccumulator] = {}
+        self.missing_values: Series | None = None
+        self.data_types: Series | None = None
+        self.sketch_capacity = sketch_capacity
+
+    def update(self, dataframe: DataFrame) -> None:
+        missing_values = dataframe.isnull().sum()
+        self.missing_values = missing_values if self.missing_values is None else self.missing_values.add(missing_values, fill_value=0).astype("int64")
+        if self.data_types is None:
+            self.data_types = dataframe.dtypes
+
+        for column in dataframe.select_dtypes(include="number").columns:
+            accumulator = self.columns.setdefault(column, ColumnAccumulator(sketch_capacity=self.sketch_capacity))
+            accumulator.update(dataframe[column].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    def merge(self, other: "StatisticsAccumulator") -> None:
+        if other.missing_values is not None:
+            self.missing_values = other.missing_values.copy() if self.missing_values is None else self.missing_values.add(other.missing_values, fill_value=0).astype("int64")
+        if self.data_types is None:
+            self.data_types = other.data_types
+
+        for column, other_accumulator in other.columns.items():
+            self.columns.setdefault(column, ColumnAccumulator(sketch_capacity=self.sketch_capacity)).merge(other_accumulator)
+
+    def to_basic_statistics(self) -> BasicStatistics:
+        summary = DataFrame({name: accumulator.summarize(self.percentiles) for name, accumulator in self.columns.items()})
+
+        return BasicStatistics(
+            missing_values=self.missing_values if self.missing_values is not None else Series(dtype="int64"),
+            data_types=self.data_types if self.data_types is not None else Series(dtype=object),
+            accumulator=self,
+            summary=summary,
+        )
+
+def append_basic_statistics(basic_statistics: BasicStatistics, dataframe: DataFrame) -> BasicStatistics:
+    basic_statistics.accumulator.update(dataframe)
+    return basic_statistics.accumulator.to_basic_statistics()
+
+def merge_basic_statistics(basic_statistics: BasicStatistics, other: BasicStatistics) -> BasicStatistics:
+    accumulator = StatisticsAccumulator(sketch_capacity=basic_statistics.accumulator.sketch_capacity)
+    accumulator.merge(basic_statistics.accumulator)
+    accumulator.merge(other.accumulator)
+    return accumulator.to_basic_statistics()
@@ -0,0 +1,125 @@
+from src.config.main import DATASET_CHUNK_SIZE, FEATURE_COLUMNS, SPLIT_COLUMN, SPLIT_VALUES, TARGET_COLUMN
+from pandas import DataFrame, ExcelFile, concat, read_csv
+from src.model.statistics import StatisticsAccumulator
+from src.types.dataclass import BasicStatistics
+from typing import Callable, Iterator
+from zipfile import BadZipFile
+from itertools import islice
+from os import path
+
+# ArrowInvalid and pandas parser errors are ValueErrors, a corrupt xlsx raises BadZipFile
+FILE_READ_ERRORS = (ValueError, KeyError, OSError, BadZipFile)
+
+def get_file_extension(file_path: str) -> str:
+    return path.splitext(file_path)[1].lstrip(".").lower()
+
+def clean_column(column: str) -> str:
+    return str(column).strip().upper()
+
+def iter_file_chunks(file_path: str, wanted_columns: list[str], chunk_size: int = DATASET_CHUNK_SIZE) -> Iterator[DataFrame]:
+    extension = get_file_extension(file_path)
+    if extension == "parquet":
+        from pyarrow.parquet import ParquetFile
+
+        parquet_file = ParquetFile(file_path)
+        columns = [name for name in parquet_file.schema_arrow.names if clean_column(name) in wanted_columns]
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    elif extension == "xlsx":
+        yield from iter_xlsx_chunks(file_path=file_path, wanted_columns=wanted_columns, chunk_size=chunk_size)
+    elif extension == "xls":
+        # The legacy format holds at most 65536 rows per sheet, its reader always loads the whole workbook
+        with ExcelFile(file_path) as excel_file:
+            for sheet_name in excel_file.sheet_names:
+                sheet = excel_file.parse(sheet_name, usecols=lambda column: clean_column(column) in wanted_columns)
+                if set(wanted_columns) <= {clean_column(column) for column in sheet.columns}:
+                    for start in range(0, len(sheet), chunk_size):
+                        yield sheet.iloc[start:start + chunk_size]
+                    return
+    else:
+        yield from read_csv(file_path, usecols=lambda column: clean_column(column) in wanted_columns, chunksize=chunk_size)
+
+def iter_xlsx_chunks(file_path: str, wanted_columns: list[str], chunk_size: int) -> Iterator[DataFrame]:
+    from openpyxl import load_workbook
+
+    # Read-only mode parses the sheet row by row instead of building the whole workbook
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            header = [clean_column(column) for column in next(rows, ())]
+            if not set(wanted_columns) <= set(header):
+                continue
+
+            positions = [header.index(column) for column in wanted_columns]
+            while chunk := [[row[position] for position in positions] for row in islice(rows, chunk_size)]:
+                yield DataFrame(chunk, columns=wanted_columns)
+            return
+    finally:
+        workbook.close()
+
+class StreamingDatasetReader:
+    def __init__(self, file_path: str, compact_dataframe: Callable[[DataFrame, list[str]], DataFrame], chunk_size: int = DATASET_CHUNK_SIZE) -> None:
+        self.relevant_columns = FEATURE_COLUMNS + [TARGET_COLUMN]
+        self.compact_dataframe = compact_dataframe
+        self.extension = get_file_extension(file_path)
+        self.chunk_size = chunk_size
+        self.file_path = file_path
+        self.sources = self.resolve_sources()
+
+    def resolve_sources(self) -> dict[str, tuple[str, str | None]]:
+        root, extension = path.splitext(self.file_path)
+        if root.lower().endswith("_train"):
+            test_file_path = f"{root[:-len('_train')]}_test{extension}"
+            if path.isfile(test_file_path):
+                return {"train": (self.file_path, None), "test": (test_file_path, None)}
+
+        if SPLIT_COLUMN not in self.read_columns(self.file_path):
+            raise ValueError(f"'{self.file_path}' needs a '{SPLIT_COLUMN}' column or a matching '_train'/'_test' file pair")
+
+        return {split: (self.file_path, value) for split, value in SPLIT_VALUES.items()}
+
+    def read_columns(self, file_path: str) -> list[str]:
+        if self.extension == "parquet":
+            from pyarrow.parquet import ParquetFile
+
+            return [clean_column(name) for name in ParquetFile(file_path).schema_arrow.names]
+
+        return [clean_column(name) for name in read_csv(file_path, nrows=0).columns]
+
+    def iter_chunks(self, split: str) -> Iterator[DataFrame]:
+        file_path, split_value = self.sources[split]
+        wanted_columns = self.relevant_columns + ([SPLIT_COLUMN] if split_value else [])
+
+        for chunk in iter_file_chunks(file_path=file_path, wanted_columns=wanted_columns, chunk_size=self.chunk_size):
+            chunk.columns = [clean_column(column) for column in chunk.columns]
+            if split_value:
+                chunk = chunk[chunk[SPLIT_COLUMN].astype(str).str.strip().str.lower() == split_value]
+
+            yield self.compact_dataframe(chunk, self.relevant_columns)
+
+    def read_dataframes(self) -> tuple[DataFrame, DataFrame]:
+        return self.read_dataframe("train"), self.read_dataframe("test")
+
+    def read_dataframe(self, split: str) -> DataFrame:
+        chunks = list(self.iter_chunks(split))
+        dataframe = concat(chunks, ignore_index=True) if chunks else DataFrame(columns=self.relevant_columns)
+
+        # Chunks carry their own categories, so re-derive the categorical target once after concatenating
+        return self.compact_dataframe(dataframe, self.relevant_columns)
+
+    def read_basic_statistics(self, split: str) -> BasicStatistics:
+        statistics = StatisticsAccumulator()
+        for chunk in self.iter_chunks(split):
+            statistics.update(chunk)
+
+        return statistics.to_basic_statistics()
+
+    def read_first_x_rows(self, split: str, x: int) -> DataFrame:
+        rows = []
+        for chunk in self.iter_chunks(split):
+            rows.append(chunk.head(x - sum(len(row) for row in rows)))
+            if sum(len(row) for row in rows) >= x:
+                break
+
+        return concat(rows, ignore_index=True) if rows else DataFrame(columns=self.relevant_columns)
@@ -0,0 +1,64 @@
+from src.config.main import DATASET_CHUNK_SIZE, EVALUATION_PREDICTION_SAMPLE_SIZE, FEATURE_COLUMNS, TARGET_COLUMN
+from src.model.metrics import ConfusionMatrixAccumulator, get_accuracy, get_classification_report
+from src.model.stream import clean_column, iter_file_chunks
+from src.types.dataclass import ModelEvaluation
+from pandas import DataFrame, Series, concat
+from typing import Callable
+from time import perf_counter
+
+class StreamingEvaluation:
+    def __init__(self, predictors: dict[str, Callable[[DataFrame], Series]], chunk_size: int = DATASET_CHUNK_SIZE, sample_size: int = EVALUATION_PREDICTION_SAMPLE_SIZE, on_progress: Callable[[int, float], None] | None = None) -> None:
+        self.on_progress = on_progress
+        self.sample_size = sample_size
+        self.chunk_size = chunk_size
+        self.predictors = predictors
+
+    def run(self, input_path: str) -> list[ModelEvaluation]:
+        accumulators = {name: ConfusionMatrixAccumulator() for name in self.predictors}
+        samples: dict[str, list[Series]] = {name: [] for name in self.predictors}
+        predict_seconds = dict.fromkeys(self.predictors, 0.0)
+        started_at = perf_counter()
+        rows = 0
+
+        for chunk in iter_file_chunks(file_path=input_path, wanted_columns=FEATURE_COLUMNS + [TARGET_COLUMN], chunk_size=self.chunk_size):
+            features, target = self.split_chunk(chunk=chunk, input_path=input_path)
+
+            for name, predict in self.predictors.items():
+                predicted_at = perf_counter()
+                predictions = predict(features)
+                predict_seconds[name] += perf_counter() - predicted_at
+
+                accumulators[name].update(target=target, predictions=predictions)
+                if rows < self.sample_size:
+                    samples[name].append(predictions.iloc[:self.sample_size - rows])
+
+            rows += len(features)
+            if self.on_progress:
+                self.on_progress(rows, perf_counter() - started_at)
+
+        if not rows:
+            raise ValueError(f"'{input_path}' has no rows with the columns {', '.join(FEATURE_COLUMNS + [TARGET_COLUMN])}")
+
+        evaluations = []
+        for name, accumulator in accumulators.items():
+            confusion_matrix = accumulator.to_confusion_matrix()
+            evaluations.append(ModelEvaluation(
+                precisions=concat(samples[name], ignore_index=True).rename(f"{name} predictions"),
+                classification_report=get_classification_report(confusion_matrix),
+                accuracy=get_accuracy(confusion_matrix),
+                predict_seconds=predict_seconds[name],
+                confusion_matrix=confusion_matrix,
+                model=None,
+                name=name,
+            ))
+
+        return evaluations
+
+    def split_chunk(self, chunk: DataFrame, input_path: str) -> tuple[DataFrame, Series]:
+        chunk.columns = [clean_column(column) for column in chunk.columns]
+
+        missing_columns = [column for column in FEATURE_COLUMNS + [TARGET_COLUMN] if column not in chunk.columns]
+        if missing_columns:
+            raise ValueError(f"'{input_path}' is missing the columns {', '.join(missing_columns)}")
+
+        return chunk[FEATURE_COLUMNS].astype("float32").reset_index(drop=True), chunk[TARGET_COLUMN].reset_index(drop=True)
@@ -1,14 +1,29 @@
+from src.config.main import APPROXIMATE_KNN_INDEX_FOLDER, APPROXIMATE_KNN_TREES, DECISION_TREE_PRUNING_TOLERANCE
+from src.model.approximate import ApproximateKNeighborsClassifier
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.tree import DecisionTreeClassifier
-from src.types.dataclass import Dataset
+from src.types.dataclass import Dataset, PruningCandidate, SearchResult
+from src.model.pruning import CostComplexityPruning
+from src.model.search import HyperparameterSearch
+from src.model.training_cache import TrainingCache
+from src.model.estimator import create_estimator
+from os import makedirs, path
+from time import perf_counter
+from typing import Callable
+from hashlib import sha256
+from json import dumps
 
 class TrainModel:
-    def __init__(self, dataset: Dataset) -> None:
+    def __init__(self, dataset: Dataset, training_cache: TrainingCache | None = None) -> None:
+        self.training_cache = training_cache if training_cache else TrainingCache(folder=None)
+        self.fit_time: float | None = None
         self.dataset = dataset
 
-    def train(self, classifier: str, random_state: int | None, n_neighbors: int | None) -> KNeighborsClassifier | DecisionTreeClassifier | None:
+    def train(self, classifier: str, random_state: int | None, n_neighbors: int | None, n_trees: int = APPROXIMATE_KNN_TREES) -> KNeighborsClassifier | ApproximateKNeighborsClassifier | DecisionTreeClassifier | None:
         if classifier == "K Nearest Neighbors" and n_neighbors is not None:
             return self.train_k_nearest_neighbors(n_neighbors)
+        elif classifier == "K Nearest Neighbors (approximate)" and n_neighbors is not None:
+            return self.train_approximate_k_nearest_neighbors(n_neighbors, n_trees)
         elif classifier == "Decision Tree" and random_state is not None:
             return self.train_decision_tree(random_state)
         else:
@@ -17,10 +32,59 @@ class TrainModel:
 
     def train_k_nearest_neighbors(self, n_neighbors: int) -> KNeighborsClassifier:
         k_nearest_neighbors = KNeighborsClassifier(n_neighbors=n_neighbors)
-        k_nearest_neighbors.fit(self.dataset.train_features, self.dataset.train_target)
-        return k_nearest_neighbors
+        return self.fit_cached(classifier="K Nearest Neighbors", estimator=k_nearest_neighbors)
+
+    def train_approximate_k_nearest_neighbors(self, n_neighbors: int, n_trees: int) -> ApproximateKNeighborsClassifier:
+        approximate_k_nearest_neighbors = ApproximateKNeighborsClassifier(n_neighbors=n_neighbors, n_trees=n_trees)
+        return self.fit_cached(classifier="K Nearest Neighbors (approximate)", estimator=approximate_k_nearest_neighbors, fit=lambda: self.fit_approximate_index(approximate_k_nearest_neighbors))
+
+    def fit_approximate_index(self, model: ApproximateKNeighborsClassifier) -> ApproximateKNeighborsClassifier:
+        index_path = self.get_approximate_index_path(model)
+        if path.isfile(index_path):
+            return ApproximateKNeighborsClassifier.load(index_path)
+
+        model.fit(self.dataset.train_features, self.dataset.train_target)
+        makedirs(APPROXIMATE_KNN_INDEX_FOLDER, exist_ok=True)
+        model.save(index_path)
+        return model
+
+    def get_approximate_index_path(self, model: ApproximateKNeighborsClassifier) -> str:
+        index_hash = sha256(dumps([self.dataset.train_fingerprint, model.get_params()], sort_keys=True).encode())
+        return f"{APPROXIMATE_KNN_INDEX_FOLDER}/{index_hash.hexdigest()}.npz"
 
     def train_decision_tree(self, random_state: int) -> DecisionTreeClassifier:
         decision_tree = DecisionTreeClassifier(random_state=random_state)
-        decision_tree.fit(self.dataset.train_features, self.dataset.train_target)
-        return decision_tree
+        return self.fit_cached(classifier="Decision Tree", estimator=decision_tree)
+
+    def fit_cached(self, classifier: str, estimator: KNeighborsClassifier | ApproximateKNeighborsClassifier | DecisionTreeClassifier, fit: Callable[[], KNeighborsClassifier | ApproximateKNeighborsClassifier | DecisionTreeClassifier] | None = None) -> KNeighborsClassifier | ApproximateKNeighborsClassifier | DecisionTreeClassifier:
+        key = self.training_cache.get_key(fingerprint=self.dataset.train_fingerprint, classifier=classifier, parameters=estimator.get_params())
+        model = self.training_cache.get(key)
+        if model is not None:
+            # Models loaded from disk were fitted in an earlier session, their fit time is unknown
+            self.fit_time = self.training_cache.fit_times.get(key)
+            return model
+
+        started_at = perf_counter()
+        model = fit() if fit else estimator.fit(self.dataset.train_features, self.dataset.train_target)
+        self.fit_time = perf_counter() - started_at
+
+        self.training_cache.set(key=key, model=model, fit_time=self.fit_time)
+        return model
+
+    def search(self, classifier: str, random_state: int, mode: str = "grid", n_iter: int = 20) -> tuple[KNeighborsClassifier | DecisionTreeClassifier, list[SearchResult]]:
+        fixed_parameters = {"random_state": random_state} if classifier == "Decision Tree" else {}
+
+        search = HyperparameterSearch(dataset=self.dataset, random_state=random_state)
+        results = search.run(classifier=classifier, mode=mode, n_iter=n_iter, fixed_parameters=fixed_parameters)
+
+        best_model = self.fit_cached(classifier=classifier, estimator=create_estimator(classifier=classifier, parameters=results[0].parameters))
+        return best_model, results
+
+    def prune(self, random_state: int, tolerance: float = DECISION_TREE_PRUNING_TOLERANCE) -> tuple[DecisionTreeClassifier, list[PruningCandidate]]:
+        pruning = CostComplexityPruning(dataset=self.dataset, random_state=random_state, tolerance=tolerance)
+        candidates = pruning.run()
+
+        # Refit the selected alpha on the whole training set, validation rows included
+        selected = next(candidate for candidate in candidates if candidate.selected)
+        pruned_tree = self.fit_cached(classifier="Decision Tree", estimator=DecisionTreeClassifier(random_state=random_state, ccp_alpha=selected.ccp_alpha))
+        return pruned_tree, candidates
@@ -0,0 +1,106 @@
+from src.config.main import TRAINING_CACHE_DISK_BUDGET, TRAINING_CACHE_FOLDER, TRAINING_CACHE_MEMORY_BUDGET
+from pickle import HIGHEST_PROTOCOL, UnpicklingError, dumps as pickle_dumps, loads as pickle_loads
+from sklearn import __version__ as sklearn_version
+from os import makedirs, path, remove, replace, scandir, utime
+from collections import OrderedDict
+from hashlib import sha256
+from json import dumps
+from typing import Any
+
+class TrainingCache:
+    def __init__(self, memory_budget: int = TRAINING_CACHE_MEMORY_BUDGET, folder: str | None = TRAINING_CACHE_FOLDER, disk_budget: int = TRAINING_CACHE_DISK_BUDGET) -> None:
+        self.models: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self.fit_times: dict[str, float] = {}
+        self.memory_budget = memory_budget
+        self.disk_budget = disk_budget
+        self.folder = folder
+        self.disk_hits = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(self, fingerprint: str, classifier: str, parameters: dict) -> str:
+        # The scikit-learn version is part of the key, pickles are not portable across versions
+        return sha256(dumps([fingerprint, classifier, parameters, sklearn_version], sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        if key in self.models:
+            self.hits += 1
+            self.models.move_to_end(key)
+            return self.models[key][0]
+
+        model = self.read_entry(key)
+        if model is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.disk_hits += 1
+        return model
+
+    def set(self, key: str, model: Any, fit_time: float | None = None) -> None:
+        if fit_time is not None:
+            self.fit_times[key] = fit_time
+
+        payload = pickle_dumps(model, protocol=HIGHEST_PROTOCOL)
+        self.add(key=key, model=model, size=len(payload))
+        self.write_entry(key=key, payload=payload)
+
+    def add(self, key: str, model: Any, size: int) -> None:
+        self.models[key] = (model, size)
+        self.models.move_to_end(key)
+
+        # The entry just added always stays, even when it alone exceeds the budget
+        while len(self.models) > 1 and self.get_memory_usage() > self.memory_budget:
+            self.models.popitem(last=False)
+
+    def get_memory_usage(self) -> int:
+        return sum(size for _, size in self.models.values())
+
+    def get_entry_path(self, key: str) -> str:
+        return path.join(self.folder, f"{key}.pkl")
+
+    def read_entry(self, key: str) -> Any | None:
+        if not self.folder or not path.isfile(self.get_entry_path(key)):
+            return None
+
+        try:
+            with open(self.get_entry_path(key), "rb") as file:
+                payload = file.read()
+            # Entries are written by this cache only, never point the folder at untrusted files
+            model = pickle_loads(payload)
+        except (OSError, EOFError, UnpicklingError, AttributeError, ImportError):
+            self.remove_entry(key)
+            return None
+
+        utime(self.get_entry_path(key))
+        self.add(key=key, model=model, size=len(payload))
+        return model
+
+    def write_entry(self, key: str, payload: bytes) -> None:
+        if not self.folder:
+            return
+
+        makedirs(self.folder, exist_ok=True)
+        entry_path = self.get_entry_path(key)
+        with open(f"{entry_path}.tmp", "wb") as file:
+            file.write(payload)
+        replace(f"{entry_path}.tmp", entry_path)
+        self.trim_folder()
+
+    def remove_entry(self, key: str) -> None:
+        try:
+            remove(self.get_entry_path(key))
+        except OSError:
+            pass
+
+    def trim_folder(self) -> None:
+        with scandir(self.folder) as entries:
+            files = sorted((entry.stat().st_mtime_ns, entry.stat().st_size, entry.path) for entry in entries if entry.name.endswith(".pkl"))
+
+        total_size = sum(size for _, size, _ in files)
+        for _, size, file_path in files[:-1]:
+            if total_size <= self.disk_budget:
+                return
+
+            remove(file_path)
+            total_size -= size
@@ -0,0 +1,122 @@
+from src.config.main import PREDICTION_SERVER_MAX_BATCH_SIZE, PREDICTION_SERVER_MAX_WAIT
+from asyncio import Event, Future, Task, get_running_loop, wait_for
+from concurrent.futures import ThreadPoolExecutor
+from src.types.dataclass import PredictionServerStats
+from dataclasses import dataclass
+from collections import deque
+from typing import Callable
+from time import perf_counter
+import numpy as np
+
+@dataclass
+class PendingRequest:
+    samples: np.ndarray
+    future: Future
+    received_at: float
+
+class MicroBatcher:
+    # Latencies of the most recent requests the percentiles are taken over
+    latency_window = 10_000
+
+    def __init__(self, predict: Callable[[np.ndarray], list], max_batch_size: int = PREDICTION_SERVER_MAX_BATCH_SIZE, max_wait: float = PREDICTION_SERVER_MAX_WAIT) -> None:
+        self.latencies: deque[float] = deque(maxlen=self.latency_window)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending: deque[PendingRequest] = deque()
+        self.has_pending = Event()
+        self.is_full = Event()
+        self.pending_samples = 0
+        self.max_batch_size = max_batch_size
+        self.started_at = perf_counter()
+        self.task: Task | None = None
+        self.max_wait = max_wait
+        self.predict = predict
+        self.requests = 0
+        self.samples = 0
+        self.batches = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        self.task = get_running_loop().create_task(self.run())
+
+    def stop(self) -> None:
+        if self.task:
+            self.task.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def submit(self, samples: np.ndarray) -> list:
+        future = get_running_loop().create_future()
+        self.pending.append(PendingRequest(samples=samples, future=future, received_at=perf_counter()))
+        self.pending_samples += len(samples)
+
+        self.has_pending.set()
+        if self.pending_samples >= self.max_batch_size:
+            self.is_full.set()
+
+        return await future
+
+    async def run(self) -> None:
+        while True:
+            await self.has_pending.wait()
+
+            # Events instead of waiting on a queue item, a timed out wait can never drop a request
+            remaining_wait = self.max_wait - (perf_counter() - self.pending[0].received_at)
+            if not self.is_full.is_set() and remaining_wait > 0:
+                try:
+                    await wait_for(self.is_full.wait(), remaining_wait)
+                except TimeoutError:
+                    pass
+
+            await self.predict_batch(self.take_batch())
+
+    def take_batch(self) -> list[PendingRequest]:
+        batch, n_samples = [], 0
+        while self.pending and n_samples < self.max_batch_size:
+            batch.append(self.pending.popleft())
+            n_samples += len(batch[-1].samples)
+
+        # Requests that arrived during the previous prediction may already fill the next batch
+        self.pending_samples -= n_samples
+        if not self.pending:
+            self.has_pending.clear()
+        if self.pending_samples < self.max_batch_size:
+            self.is_full.clear()
+
+        return batch
+
+    async def predict_batch(self, batch: list[PendingRequest]) -> None:
+        try:
+            predictions = await get_running_loop().run_in_executor(self.executor, self.predict, np.concatenate([request.samples for request in batch]))
+        except Exception as error:
+            self.errors += len(batch)
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(error)
+            return
+
+        finished_at = perf_counter()
+        start = 0
+        for request in batch:
+            if not request.future.done():
+                request.future.set_result(predictions[start:start + len(request.samples)])
+            self.latencies.append(finished_at - request.received_at)
+            start += len(request.samples)
+
+        self.requests += len(batch)
+        self.samples += start
+        self.batches += 1
+
+    def get_stats(self) -> PredictionServerStats:
+        latencies = np.asarray(self.latencies) if self.latencies else np.zeros(1)
+        uptime = perf_counter() - self.started_at
+
+        return PredictionServerStats(
+            mean_batch_size=self.samples / max(self.batches, 1),
+            p50_latency=float(np.percentile(latencies, 50)),
+            p99_latency=float(np.percentile(latencies, 99)),
+            requests_per_second=self.requests / max(uptime, 1e-9),
+            requests=self.requests,
+            samples=self.samples,
+            batches=self.batches,
+            errors=self.errors,
+            uptime=uptime,
+        )
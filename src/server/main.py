@@ -0,0 +1,120 @@
+from src.config.main import FEATURE_COLUMNS, PREDICTION_SERVER_HOST, PREDICTION_SERVER_MAX_BATCH_SIZE, PREDICTION_SERVER_MAX_WAIT, PREDICTION_SERVER_PORT
+from asyncio import IncompleteReadError, StreamReader, StreamWriter, run, start_server, start_unix_server
+from src.server.batching import MicroBatcher
+from src.model.main import Model
+from dataclasses import asdict
+from json import dumps, loads
+from os import path, remove
+from pandas import DataFrame
+import numpy as np
+
+STATUS_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+class PredictionServer:
+    def __init__(self, model: Model, max_batch_size: int = PREDICTION_SERVER_MAX_BATCH_SIZE, max_wait: float = PREDICTION_SERVER_MAX_WAIT) -> None:
+        self.batcher = MicroBatcher(predict=self.predict, max_batch_size=max_batch_size, max_wait=max_wait)
+        self.model = model
+
+    def predict(self, samples: np.ndarray) -> list[str]:
+        # Runs on the batcher's worker thread, one call per micro-batch
+        predictions = self.model.predict(features=DataFrame(samples, columns=FEATURE_COLUMNS))
+        return predictions.astype(str).tolist()
+
+    async def serve(self, host: str = PREDICTION_SERVER_HOST, port: int = PREDICTION_SERVER_PORT, unix_socket: str | None = None) -> None:
+        server = await start_unix_server(self.handle_connection, path=unix_socket) if unix_socket else await start_server(self.handle_connection, host=host, port=port)
+        self.batcher.start()
+        print(f"Prediction server listening on {unix_socket or f'http://{host}:{port}'} (max batch size {self.batcher.max_batch_size}, max wait {self.batcher.max_wait * 1000:g} ms), Ctrl+C to stop")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.batcher.stop()
+            if unix_socket and path.exists(unix_socket):
+                remove(unix_socket)
+
+    async def handle_connection(self, reader: StreamReader, writer: StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+
+                    method, request_path, _ = request_line.decode("latin-1").split(" ", 2)
+                    headers = await self.read_headers(reader)
+                    content_length = int(headers.get("content-length", 0))
+                    if content_length < 0:
+                        raise ValueError
+                except ValueError:
+                    # The rest of the stream cannot be framed, answer and close
+                    self.write_response(writer=writer, status=400, payload={"error": "Malformed request line or Content-Length"}, keep_alive=False)
+                    await writer.drain()
+                    break
+
+                body = await reader.readexactly(content_length)
+
+                status, payload = await self.handle_request(method=method, request_path=request_path, body=body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self.write_response(writer=writer, status=status, payload=payload, keep_alive=keep_alive)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_headers(self, reader: StreamReader) -> dict[str, str]:
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        return headers
+
+    async def handle_request(self, method: str, request_path: str, body: bytes) -> tuple[int, dict]:
+        if request_path == "/stats":
+            return (200, asdict(self.batcher.get_stats())) if method == "GET" else (405, {"error": "Use GET"})
+        if request_path != "/predict":
+            return 404, {"error": "Unknown path, use POST /predict or GET /stats"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+
+        try:
+            samples = self.parse_samples(body)
+        except ValueError as error:
+            return 400, {"error": str(error)}
+
+        try:
+            return 200, {"predictions": await self.batcher.submit(samples)}
+        except Exception as error:
+            return 500, {"error": f"{error.__class__.__name__}: {error}"}
+
+    def parse_samples(self, body: bytes) -> np.ndarray:
+        # Checked per request, one bad sample must not fail the whole micro-batch
+        try:
+            samples = np.asarray(loads(body)["samples"], dtype=np.float32)
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('Expected a JSON body {"samples": [[' + ", ".join(FEATURE_COLUMNS) + '], ...]}')
+
+        if samples.ndim != 2 or samples.shape[1] != len(FEATURE_COLUMNS) or not np.isfinite(samples).all():
+            raise ValueError(f"Every sample needs {len(FEATURE_COLUMNS)} finite numbers ({', '.join(FEATURE_COLUMNS)})")
+
+        return samples
+
+    def write_response(self, writer: StreamWriter, status: int, payload: dict, keep_alive: bool) -> None:
+        body = dumps(payload).encode()
+        head = f"HTTP/1.1 {status} {STATUS_REASONS[status]}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        writer.write(head.encode("latin-1") + body)
+
+def run_prediction_server(model: Model, host: str = PREDICTION_SERVER_HOST, port: int = PREDICTION_SERVER_PORT, unix_socket: str | None = None, max_batch_size: int = PREDICTION_SERVER_MAX_BATCH_SIZE, max_wait: float = PREDICTION_SERVER_MAX_WAIT) -> None:
+    server = PredictionServer(model=model, max_batch_size=max_batch_size, max_wait=max_wait)
+    try:
+        run(server.serve(host=host, port=port, unix_socket=unix_socket))
+    except KeyboardInterrupt:
+        pass
+
+    stats = server.batcher.get_stats()
+    print(f"\nServed {stats.requests:,} requests ({stats.samples:,} samples) in {stats.batches:,} batches of {stats.mean_batch_size:.1f} on average | p50 {stats.p50_latency * 1000:.2f} ms | p99 {stats.p99_latency * 1000:.2f} ms | {stats.requests_per_second:,.0f} requests/s")
@@ -1,47 +1,275 @@
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.tree import DecisionTreeClassifier
-from pandas import DataFrame, Series
-from dataclasses import dataclass
+from src.model.prediction_cache import PredictionCache
+from src.config.main import EVALUATION_BOOTSTRAP, EVALUATION_CROSS_VALIDATE, TARGET_COLUMN
+from pandas import DataFrame, Series, concat
+from pandas.util import hash_pandas_object
+from dataclasses import asdict, dataclass, field
+from functools import cached_property
 from datetime import datetime
+from hashlib import sha256
+from typing import TYPE_CHECKING, Callable
+import numpy as np
+
+if TYPE_CHECKING:
+    from src.model.approximate import ApproximateKNeighborsClassifier
+    from src.model.statistics import StatisticsAccumulator
 
 @dataclass
 class BasicStatistics:
+    accumulator: "StatisticsAccumulator"
     missing_values: Series
     summary: DataFrame
     data_types: Series
 
 @dataclass
 class ModelClassifier:
-    model: KNeighborsClassifier | DecisionTreeClassifier
+    model: "KNeighborsClassifier | ApproximateKNeighborsClassifier | DecisionTreeClassifier"
     name: str
+    fit_time: float | None = None
+    prediction_cache: PredictionCache = field(default_factory=PredictionCache, repr=False, compare=False)
+
+@dataclass
+class EvaluationSettings:
+    cross_validate: bool = EVALUATION_CROSS_VALIDATE
+    bootstrap: bool = EVALUATION_BOOTSTRAP
+
+@dataclass
+class CrossValidationFold:
+    precision: float
+    f1_score: float
+    accuracy: float
+    fit_time: float
+    recall: float
+    repeat: int
+    fold: int
+
+@dataclass
+class CrossValidation:
+    folds: list[CrossValidationFold]
+    mean: dict[str, float]
+    std: dict[str, float]
+    stratified: bool
+    n_repeats: int
+    n_splits: int
+
+@dataclass
+class ApproximationDrift:
+    n_trees: int
+    leaf_size: int
+    neighbour_recall: float
+    prediction_agreement: float
+    approximate_accuracy: float
+    exact_accuracy: float
+    approximate_seconds: float
+    exact_seconds: float
+
+@dataclass
+class ConfusionMatrix:
+    labels: list
+    counts: np.ndarray
+
+@dataclass
+class ConfidenceInterval:
+    estimate: float
+    lower: float
+    upper: float
+
+@dataclass
+class BootstrapResult:
+    f1_scores: dict[str, ConfidenceInterval]
+    accuracy: ConfidenceInterval
+    n_replicates: int
+    confidence: float
+
+@dataclass
+class PairedBootstrap:
+    first_name: str
+    second_name: str
+    accuracy_difference: ConfidenceInterval
+    macro_f1_difference: ConfidenceInterval
+    probability_first_better: float
+    n_replicates: int
+    confidence: float
 
 @dataclass
 class ModelEvaluation:
-    model: KNeighborsClassifier | DecisionTreeClassifier
+    model: "KNeighborsClassifier | ApproximateKNeighborsClassifier | DecisionTreeClassifier | None"
     classification_report: dict
     precisions: Series
     accuracy: float
     name: str
+    cross_validation: CrossValidation | None = None
+    approximation_drift: ApproximationDrift | None = None
+    confusion_matrix: ConfusionMatrix | None = None
+    predict_seconds: float | None = None
+    sample_latency: float | None = None
+    fit_time: float | None = None
+    bootstrap: BootstrapResult | None = None
+
+@dataclass
+class SearchResult:
+    parameters: dict
+    mean_score: float
+    std_score: float
+    classifier: str
+    fit_time: float
+    rank: int
+
+@dataclass
+class PruningCandidate:
+    ccp_alpha: float
+    node_count: int
+    depth: int
+    accuracy: float
+    sample_latency: float
+    fit_time: float
+    selected: bool = False
+
+@dataclass
+class LearningCurvePoint:
+    classifier: str
+    fraction: float
+    train_rows: int
+    repeat: int
+    accuracy: float
+    fit_time: float
+    predict_time: float
+    peak_memory: int
+
+@dataclass
+class BatchPredictionSummary:
+    input_path: str
+    output_path: str
+    seconds: float
+    rows: int
+
+@dataclass
+class PredictionServerStats:
+    requests: int
+    samples: int
+    batches: int
+    errors: int
+    mean_batch_size: float
+    p50_latency: float
+    p99_latency: float
+    requests_per_second: float
+    uptime: float
 
 @dataclass
 class Dataset:
-    k_nearest_neighbors_evaluation: ModelEvaluation | None
-    train_dataframe_first_x_rows: list[dict[str, str]]
-    test_dataframe_first_x_rows: list[dict[str, str]]
-    train_dataframe_basic_statistics: BasicStatistics
-    decision_tree_evaluation: ModelEvaluation | None
-    test_dataframe_basic_statistics: BasicStatistics
-    k_nearest_neighbors: ModelClassifier | None
-    decision_tree: ModelClassifier | None
-    train_dataframe: DataFrame
-    test_dataframe: DataFrame
-    train_features: DataFrame
-    test_features: DataFrame
-    train_target: Series
-    test_target: Series
+    read_dataframes: Callable[[], tuple[DataFrame, DataFrame]]
+    read_basic_statistics: Callable[[str], BasicStatistics]
+    read_first_x_rows: Callable[[str, int], DataFrame]
     loaded_msg: str
     loaded: bool
     path: str
+    load_rows: int = 10
+    k_nearest_neighbors_evaluation: ModelEvaluation | None = None
+    decision_tree_evaluation: ModelEvaluation | None = None
+    k_nearest_neighbors: ModelClassifier | None = None
+    decision_tree: ModelClassifier | None = None
+    hyperparameter_search_results: dict[str, list[SearchResult]] = field(default_factory=dict)
+    pruning_results: list[PruningCandidate] = field(default_factory=list)
+    paired_bootstrap_results: list[PairedBootstrap] = field(default_factory=list)
+    appended_train_rows: list[DataFrame] = field(default_factory=list)
+    has_appended_train_rows: bool = False
+    max_train_rows: int | None = None
+
+    @cached_property
+    def dataframes(self) -> tuple[DataFrame, DataFrame]:
+        return self.read_dataframes()
+
+    @property
+    def train_dataframe(self) -> DataFrame:
+        if self.appended_train_rows:
+            self.merge_appended_train_rows()
+
+        return self.dataframes[0]
+
+    @property
+    def test_dataframe(self) -> DataFrame:
+        return self.dataframes[1]
+
+    @cached_property
+    def train_features(self) -> DataFrame:
+        return self.train_dataframe.drop(columns=TARGET_COLUMN)
+
+    @cached_property
+    def test_features(self) -> DataFrame:
+        return self.test_dataframe.drop(columns=TARGET_COLUMN)
+
+    @cached_property
+    def train_target(self) -> Series:
+        return self.train_dataframe[TARGET_COLUMN]
+
+    @cached_property
+    def test_target(self) -> Series:
+        return self.test_dataframe[TARGET_COLUMN]
+
+    @cached_property
+    def train_fingerprint(self) -> str:
+        # Content hash of the training rows, computed once and dropped when rows are appended
+        return sha256(hash_pandas_object(self.train_dataframe, index=False).to_numpy().tobytes()).hexdigest()
+
+    @cached_property
+    def train_dataframe_first_x_rows(self) -> list[dict[str, str]]:
+        return self.get_first_x_rows("train")
+
+    @cached_property
+    def test_dataframe_first_x_rows(self) -> list[dict[str, str]]:
+        return self.get_first_x_rows("test")
+
+    @cached_property
+    def train_dataframe_basic_statistics(self) -> BasicStatistics:
+        if self.has_appended_train_rows:
+            from src.model.statistics import StatisticsAccumulator
+
+            statistics = StatisticsAccumulator()
+            statistics.update(self.train_dataframe)
+            return statistics.to_basic_statistics()
+
+        return self.read_basic_statistics("train")
+
+    @cached_property
+    def test_dataframe_basic_statistics(self) -> BasicStatistics:
+        return self.read_basic_statistics("test")
+
+    def append_train_rows(self, rows: DataFrame, max_train_rows: int | None = None) -> None:
+        from src.model.statistics import append_basic_statistics
+
+        # Load the file while it still matches the dataset, appended rows are merged on top of it
+        _ = self.dataframes
+        self.appended_train_rows.append(rows)
+        self.has_appended_train_rows = True
+        self.max_train_rows = max_train_rows
+
+        for name in ["train_features", "train_target", "train_fingerprint", "train_dataframe_first_x_rows"]:
+            self.__dict__.pop(name, None)
+
+        if "train_dataframe_basic_statistics" in self.__dict__:
+            if max_train_rows is None:
+                self.train_dataframe_basic_statistics = append_basic_statistics(self.train_dataframe_basic_statistics, rows)
+            else:
+                del self.train_dataframe_basic_statistics
+
+    def merge_appended_train_rows(self) -> None:
+        train_dataframe, test_dataframe = self.dataframes
+        train_dataframe = concat([train_dataframe, *self.appended_train_rows], ignore_index=True)
+        if self.max_train_rows is not None:
+            train_dataframe = train_dataframe.iloc[-self.max_train_rows:].reset_index(drop=True)
+
+        # Appended rows can bring labels the categorical target has not seen yet
+        train_dataframe[TARGET_COLUMN] = train_dataframe[TARGET_COLUMN].astype("category")
+        self.dataframes = (train_dataframe, test_dataframe)
+        self.appended_train_rows = []
+
+    def get_first_x_rows(self, split: str) -> list[dict[str, str]]:
+        # Once rows were appended the dataset file no longer describes the training split
+        rows = self.train_dataframe.head(self.load_rows) if split == "train" and self.has_appended_train_rows else self.read_first_x_rows(split, self.load_rows)
+
+        # Stringify so float32 values render with their shortest repr (0.08 instead of 0.0799999982)
+        return rows.astype(str).to_dict(orient="records")
 
     def to_dict(self, timestamp: float | None = None) -> dict:
         return {
@@ -79,7 +307,14 @@ class Dataset:
         return {
             "classification_report": evaluation.classification_report,
             "precisions": evaluation.precisions.tolist(),
-            "model": type(evaluation.model).__name__,
+            "model": type(evaluation.model).__name__ if evaluation.model else None,
+            "cross_validation": asdict(evaluation.cross_validation) if evaluation.cross_validation else None,
+            "approximation_drift": asdict(evaluation.approximation_drift) if evaluation.approximation_drift else None,
+            "confusion_matrix": {"labels": evaluation.confusion_matrix.labels, "counts": evaluation.confusion_matrix.counts.tolist()} if evaluation.confusion_matrix else None,
+            "predict_seconds": evaluation.predict_seconds,
+            "sample_latency": evaluation.sample_latency,
+            "fit_time": evaluation.fit_time,
+            "bootstrap": asdict(evaluation.bootstrap) if evaluation.bootstrap else None,
             "accuracy": evaluation.accuracy,
             "name": evaluation.name,
         }
@@ -0,0 +1,112 @@
+from src.utils.file import create_folder
+from src.utils.hash import hash_file
+from src.config.main import DATASETS_CACHE_FOLDER
+from pandas import DataFrame, read_parquet
+from os import path, remove, replace, stat
+from json import JSONDecodeError, dump, load
+from hashlib import sha256
+
+class DatasetCache:
+    # Bump whenever the layout or dtypes of the cached dataframes change
+    version = 2
+
+    def __init__(self, folder: str = DATASETS_CACHE_FOLDER) -> None:
+        self.folder = folder
+        self.enabled = True
+
+    def get(self, file_path: str) -> tuple[DataFrame, DataFrame] | None:
+        if not self.enabled:
+            return None
+
+        manifest = self.read_manifest(file_path)
+        if not manifest or manifest.get("version") != self.version or not self.is_fresh(file_path=file_path, manifest=manifest):
+            return None
+
+        try:
+            train_dataframe = read_parquet(self.get_entry_path(file_path, "train.parquet"))
+            test_dataframe = read_parquet(self.get_entry_path(file_path, "test.parquet"))
+        except ImportError:
+            self.disable()
+            return None
+        except OSError:
+            self.invalidate(file_path)
+            return None
+
+        return train_dataframe, test_dataframe
+
+    def set(self, file_path: str, dataframes: tuple[DataFrame, DataFrame]) -> None:
+        if not self.enabled:
+            return
+
+        create_folder(folder_path=self.folder)
+        try:
+            for name, dataframe in zip(["train.parquet", "test.parquet"], dataframes):
+                entry_path = self.get_entry_path(file_path, name)
+                dataframe.to_parquet(f"{entry_path}.tmp", index=False)
+                replace(f"{entry_path}.tmp", entry_path)
+        except ImportError:
+            self.disable()
+            return
+
+        # The manifest is written last so a half-written entry is never considered fresh
+        self.write_manifest(file_path=file_path, manifest=self.fingerprint(file_path))
+
+    def fingerprint(self, file_path: str) -> dict:
+        file_stat = stat(file_path)
+        return {
+            "path": path.abspath(file_path),
+            "version": self.version,
+            "content_hash": hash_file(file_path),
+            "mtime_ns": file_stat.st_mtime_ns,
+            "size": file_stat.st_size,
+        }
+
+    def is_fresh(self, file_path: str, manifest: dict) -> bool:
+        try:
+            file_stat = stat(file_path)
+        except FileNotFoundError:
+            self.invalidate(file_path)
+            return False
+
+        if file_stat.st_size == manifest["size"] and file_stat.st_mtime_ns == manifest["mtime_ns"]:
+            return True
+
+        if file_stat.st_size == manifest["size"] and hash_file(file_path) == manifest["content_hash"]:
+            # Same content with a new mtime, refresh the manifest to keep the fast path
+            manifest["mtime_ns"] = file_stat.st_mtime_ns
+            self.write_manifest(file_path=file_path, manifest=manifest)
+            return True
+
+        self.invalidate(file_path)
+        return False
+
+    def invalidate(self, file_path: str) -> None:
+        for name in ["manifest.json", "train.parquet", "test.parquet"]:
+            entry_path = self.get_entry_path(file_path, name)
+            if path.exists(entry_path):
+                remove(entry_path)
+
+    def read_manifest(self, file_path: str) -> dict | None:
+        manifest_path = self.get_entry_path(file_path, "manifest.json")
+        if not path.exists(manifest_path):
+            return None
+
+        try:
+            with open(manifest_path, "r") as file:
+                return load(file)
+        except (JSONDecodeError, OSError):
+            return None
+
+    def write_manifest(self, file_path: str, manifest: dict) -> None:
+        manifest_path = self.get_entry_path(file_path, "manifest.json")
+        with open(f"{manifest_path}.tmp", "w") as file:
+            dump(manifest, file, indent=4)
+        replace(f"{manifest_path}.tmp", manifest_path)
+
+    def get_entry_path(self, file_path: str, name: str) -> str:
+        key = sha256(path.abspath(file_path).encode()).hexdigest()[:32]
+        return path.join(self.folder, f"{key}.{name}")
+
+    def disable(self) -> None:
+        print("Parquet support is not installed (pip install pyarrow), the dataset cache is disabled.")
+        self.enabled = False
@@ -0,0 +1,194 @@
+from src.config.main import DATASETS_CACHE_FOLDER, DATASETS_FOLDER, FEATURE_COLUMNS, SPLIT_COLUMN, SUPPORTED_DATASET_EXTENSIONS, TARGET_COLUMN
+from src.model.stream import clean_column, get_file_extension
+from os import makedirs, path, replace, scandir
+from src.utils.hash import hash_file
+from json import JSONDecodeError, dump, load
+from pandas import ExcelFile, read_csv
+
+class DatasetCatalog:
+    version = 2
+
+    def __init__(self, folder: str = DATASETS_FOLDER, cache_folder: str = DATASETS_CACHE_FOLDER) -> None:
+        self.index_path = path.join(cache_folder, "catalog.json")
+        self.cache_folder = cache_folder
+        self.folder = folder
+        self.entries: dict[str, dict] = {}
+        self.trigrams: dict[str, set[str]] = {}
+        self.names: list[str] = []
+        self.is_read = False
+
+    def refresh(self) -> None:
+        if not self.is_read:
+            self.read_index()
+
+        entries = {}
+        with scandir(self.folder) as folder_entries:
+            for folder_entry in folder_entries:
+                if not folder_entry.is_file() or get_file_extension(folder_entry.name) not in SUPPORTED_DATASET_EXTENSIONS:
+                    continue
+
+                entries[folder_entry.name] = self.get_fresh_entry(name=folder_entry.name, file_stat=folder_entry.stat())
+
+        # Only rewrite the index when a file was added, removed or re-profiled
+        if entries.keys() != self.entries.keys() or any(entry is not self.entries[name] for name, entry in entries.items()):
+            self.set_entries(entries)
+            self.write_index()
+
+    def get_fresh_entry(self, name: str, file_stat) -> dict:
+        entry = self.entries.get(name)
+        if entry and entry["size"] == file_stat.st_size and entry["mtime_ns"] == file_stat.st_mtime_ns:
+            return entry
+
+        return self.profile(name=name, file_stat=file_stat)
+
+    def profile(self, name: str, file_stat) -> dict:
+        file_path = path.join(self.folder, name)
+        entry = {
+            "content_hash": hash_file(file_path),
+            "mtime_ns": file_stat.st_mtime_ns,
+            "size": file_stat.st_size,
+            "sheet_names": [],
+            "row_counts": [],
+            "columns": [],
+            "error": None,
+            "name": name,
+        }
+
+        try:
+            entry.update(self.read_layout(file_path))
+        except Exception as e:
+            # Anything that cannot be opened is kept in the index as an invalid dataset
+            entry["error"] = f"{e.__class__.__name__}: {e}"
+
+        return entry
+
+    def read_layout(self, file_path: str) -> dict:
+        extension = get_file_extension(file_path)
+        if extension == "parquet":
+            from pyarrow.parquet import ParquetFile
+
+            parquet_file = ParquetFile(file_path)
+            return {"row_counts": [parquet_file.metadata.num_rows], "columns": [clean_column(name) for name in parquet_file.schema_arrow.names]}
+
+        if extension == "csv":
+            return {"row_counts": [self.count_csv_rows(file_path)], "columns": [clean_column(column) for column in read_csv(file_path, nrows=0).columns]}
+
+        with ExcelFile(file_path) as excel_file:
+            sheet_names = [str(sheet_name) for sheet_name in excel_file.sheet_names]
+            columns = [clean_column(column) for column in excel_file.parse(sheet_name=1, nrows=0).columns] if len(sheet_names) > 1 else []
+            row_counts = [self.count_sheet_rows(excel_file=excel_file, sheet_name=sheet_name) for sheet_name in sheet_names]
+
+        return {"sheet_names": sheet_names, "row_counts": row_counts, "columns": columns}
+
+    def count_sheet_rows(self, excel_file: ExcelFile, sheet_name: str) -> int:
+        book = excel_file.book
+        # xlrd and openpyxl expose the sheet dimensions without parsing the cells
+        rows = book.sheet_by_name(sheet_name).nrows if hasattr(book, "sheet_by_name") else book[sheet_name].max_row
+        return max(rows - 1, 0)
+
+    def count_csv_rows(self, file_path: str, chunk_size: int = 1024 * 1024) -> int:
+        lines = 0
+        last_chunk = b""
+        with open(file_path, "rb") as file:
+            while chunk := file.read(chunk_size):
+                lines += chunk.count(b"\n")
+                last_chunk = chunk
+
+        # Subtract the header and count a last line without a trailing newline
+        return max(lines - 1 + (1 if last_chunk and not last_chunk.endswith(b"\n") else 0), 0)
+
+    def get_test_name(self, name: str) -> str | None:
+        root, extension = path.splitext(name)
+        return f"{root[:-len('_train')]}_test{extension}" if root.lower().endswith("_train") else None
+
+    def has_columns(self, entry: dict) -> bool:
+        return not entry["error"] and set(FEATURE_COLUMNS + [TARGET_COLUMN]).issubset(entry["columns"])
+
+    def is_valid_layout(self, entry: dict, entries: dict[str, dict]) -> bool:
+        if not self.has_columns(entry):
+            return False
+
+        if get_file_extension(entry["name"]) in ["xls", "xlsx"]:
+            return len(entry["sheet_names"]) > 2
+
+        # Same split rules as StreamingDatasetReader, a matching "_test" file wins over a SPLIT column
+        test_entry = entries.get(self.get_test_name(entry["name"]) or "")
+        return self.has_columns(test_entry) if test_entry else SPLIT_COLUMN in entry["columns"]
+
+    def set_entries(self, entries: dict[str, dict]) -> None:
+        valid_names = {name for name, entry in entries.items() if self.is_valid_layout(entry=entry, entries=entries)}
+        # A "_train"/"_test" pair is listed once, under its "_train" file
+        valid_names -= {self.get_test_name(name) for name in valid_names if self.get_test_name(name) in entries}
+
+        for name, entry in entries.items():
+            entry["valid"] = name in valid_names
+
+        self.entries = entries
+        self.names = sorted(valid_names)
+        self.trigrams = {}
+        for name in self.names:
+            lowered_name = name.lower()
+            for i in range(len(lowered_name) - 2):
+                self.trigrams.setdefault(lowered_name[i:i + 3], set()).add(name)
+
+    def list_names(self) -> list[str]:
+        self.refresh()
+        return self.names
+
+    def search(self, query: str) -> list[str]:
+        self.refresh()
+        query = query.lower()
+        if len(query) < 3:
+            return [name for name in self.names if query in name.lower()]
+
+        # Every name containing the query contains all of its trigrams, verify the intersection only
+        candidates = set.intersection(*(self.trigrams.get(query[i:i + 3], set()) for i in range(len(query) - 2)))
+        return sorted(name for name in candidates if query in name.lower())
+
+    # Lookups answer from the last listing, only list_names and search rescan the folder
+    def is_valid(self, name: str) -> bool:
+        entry = self.get(name)
+        return entry is not None and entry["valid"]
+
+    def get(self, name: str) -> dict | None:
+        if not self.is_read:
+            self.refresh()
+
+        return self.entries.get(name)
+
+    def get_rows_summary(self, name: str) -> str:
+        entry = self.get(name)
+        if not entry or not entry["row_counts"]:
+            return "unknown rows"
+
+        if entry["sheet_names"]:
+            # Workbooks keep the training data on sheet 1 and the test data on sheet 2
+            return f"{entry['row_counts'][1]} train / {entry['row_counts'][2]} test rows" if len(entry["row_counts"]) > 2 else "unknown rows"
+
+        test_entry = self.entries.get(self.get_test_name(name) or "")
+        if test_entry and test_entry["row_counts"]:
+            return f"{entry['row_counts'][0]} train / {test_entry['row_counts'][0]} test rows"
+
+        return f"{entry['row_counts'][0]} rows"
+
+    def read_index(self) -> None:
+        self.is_read = True
+        if not path.exists(self.index_path):
+            return
+
+        try:
+            with open(self.index_path, "r") as file:
+                index = load(file)
+        except (JSONDecodeError, OSError):
+            return
+
+        if index.get("version") == self.version and index.get("folder") == path.abspath(self.folder):
+            self.set_entries(index["entries"])
+
+    def write_index(self) -> None:
+        makedirs(self.cache_folder, exist_ok=True)
+        with open(f"{self.index_path}.tmp", "w") as file:
+            dump({"version": self.version, "folder": path.abspath(self.folder), "entries": self.entries}, file)
+        replace(f"{self.index_path}.tmp", self.index_path)
+
+dataset_catalog = DatasetCatalog()
@@ -1,5 +1,6 @@
-from src.config.main import DATASETS_FOLDER
+from src.config.main import DATASETS_FOLDER, RESULTS_FOLDER, SESSION_FILE_EXTENSION
 from src.utils.conversion import Conversion
+from src.utils.catalog import dataset_catalog
 from src.types.dataclass import Dataset
 from os import listdir, path, makedirs
 from src.utils.catch import try_catch
@@ -8,24 +9,11 @@ from json import dump
 
 def get_file_path_by_name(name: str = "", show_all: bool = False) -> list[str]:
     def _get_files() -> list[str]:
-        all_files = listdir(DATASETS_FOLDER)
-        
-        files = []
-
-        # Filter for files only
-        for file in all_files:
-            if path.isfile(path.join(DATASETS_FOLDER, file)):
-                files.append(file)
-        
         if show_all or not name:
-            return files
-        else:
-            # Filter for files that contain the search name
-            filtered_files = []
-            for file in files:
-                if name.lower() in file.lower():
-                    filtered_files.append(file)
-            return filtered_files
+            return dataset_catalog.list_names()
+
+        # Filter for files that contain the search name
+        return dataset_catalog.search(name)
     
     result = try_catch(
         err_msg=f"Dataset folder '{DATASETS_FOLDER}' not found",
@@ -36,9 +24,10 @@ def get_file_path_by_name(name: str = "", show_all: bool = False) -> list[str]:
     
     return result if result is not None else []
 
-def get_file_name(prompt: str, available_files: list[str], conversion: Conversion) -> str:
+def get_file_name(prompt: str, available_files: list[str], conversion: Conversion, is_valid_file: Callable[[str], bool] | None = None) -> str:
+        is_valid_file = is_valid_file if is_valid_file else lambda file_name: file_name in available_files
         file_name = conversion.to_str(
-            additional_checks=lambda file_name: (file_name.isdigit() and available_files[int(file_name) - 1] in available_files) or file_name in available_files,
+            additional_checks=lambda file_name: (file_name.isdigit() and 0 < int(file_name) <= len(available_files)) or is_valid_file(file_name),
             err_msg=f"Please enter a valid file name or number",
             prompt=prompt,
         )
@@ -50,7 +39,7 @@ def render_available_datasets() -> list[str]:
 
     print("Available datasets:")
     for i,file in enumerate(files):
-        print(f"{i + 1}. {file}")
+        print(f"{i + 1}. {file} ({dataset_catalog.get_rows_summary(file)})")
     print("\n")
 
     return files
@@ -58,12 +47,40 @@ def render_available_datasets() -> list[str]:
 def render_available_datasets_and_get_file_name_and_load_dataset(load_dataset: Callable[[str, int], Dataset], conversion: Conversion, load_rows: int) -> Dataset:
     available_datasets = render_available_datasets()
 
-    file_name_or_number = get_file_name(prompt="Select a dataset by name or number: ", available_files=available_datasets, conversion=conversion)
+    file_name_or_number = get_file_name(prompt="Select a dataset by name or number: ", available_files=available_datasets, conversion=conversion, is_valid_file=dataset_catalog.is_valid)
     file_name_or_number = available_datasets[int(file_name_or_number) - 1] if file_name_or_number.isdigit() else file_name_or_number
 
     dataset = load_dataset(file_path=f"{DATASETS_FOLDER}/{file_name_or_number}", load_rows=load_rows)
     return dataset
 
+def render_available_sessions() -> list[str]:
+    def _get_sessions() -> list[str]:
+        return sorted(file for file in listdir(RESULTS_FOLDER) if file.endswith(f".{SESSION_FILE_EXTENSION}"))
+
+    sessions = try_catch(
+        err_msg=f"Results folder '{RESULTS_FOLDER}' not found",
+        exception=FileNotFoundError,
+        include_exception=True,
+        callback=_get_sessions,
+    ) or []
+
+    print("Available saved sessions:")
+    for i, session in enumerate(sessions):
+        print(f"{i + 1}. {session}")
+    print("\n")
+
+    return sessions
+
+def get_latest_session() -> str | None:
+    sessions = try_catch(
+        callback=lambda: [path.join(RESULTS_FOLDER, file) for file in listdir(RESULTS_FOLDER) if file.endswith(f".{SESSION_FILE_EXTENSION}")],
+        err_msg=f"Results folder '{RESULTS_FOLDER}' not found",
+        exception=FileNotFoundError,
+        include_exception=True,
+    )
+
+    return max(sessions, key=path.getmtime) if sessions else None
+
 def write_to_file_json(file_path: str, dataset: Dataset, timestamp: float | None = None) -> None:
     with open(file_path, "w") as file:
         dump(dataset.to_dict(timestamp=timestamp), file, indent=4)
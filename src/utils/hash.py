@@ -0,0 +1,9 @@
+from hashlib import sha256
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    file_hash = sha256()
+    with open(file_path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
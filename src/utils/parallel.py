@@ -0,0 +1,50 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count
+import numpy as np
+
+# Arrays attached in a worker process, filled by the pool initializer
+shared_arrays: dict[str, np.ndarray] = {}
+shared_memories: list[SharedMemory] = []
+
+class SharedArrays:
+    def __init__(self, arrays: dict[str, np.ndarray]) -> None:
+        self.descriptors: dict[str, tuple[str, tuple[int, ...], str]] = {}
+        self.memories: list[SharedMemory] = []
+        self.arrays = arrays
+
+    def __enter__(self) -> "SharedArrays":
+        for name, array in self.arrays.items():
+            array = np.ascontiguousarray(array)
+            memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[...] = array
+
+            self.descriptors[name] = (memory.name, array.shape, array.dtype.str)
+            self.memories.append(memory)
+
+        return self
+
+    def __exit__(self, *_) -> None:
+        for memory in self.memories:
+            memory.close()
+            memory.unlink()
+
+    def create_pool(self, max_workers: int | None = None) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=get_worker_count(max_workers), initializer=attach_shared_arrays, initargs=(self.descriptors,))
+
+def attach_shared_arrays(descriptors: dict[str, tuple[str, tuple[int, ...], str]]) -> None:
+    for name, (memory_name, shape, dtype) in descriptors.items():
+        try:
+            memory = SharedMemory(name=memory_name, track=False)
+        except TypeError:
+            # Python < 3.13 has no track argument, the parent process still owns the block
+            memory = SharedMemory(name=memory_name)
+
+        shared_memories.append(memory)
+        shared_arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf)
+
+def get_shared_array(name: str) -> np.ndarray:
+    return shared_arrays[name]
+
+def get_worker_count(max_workers: int | None = None) -> int:
+    return max(1, min(max_workers or cpu_count() or 1, cpu_count() or 1))
@@ -0,0 +1,182 @@
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+from src.types.dataclass import ApproximationDrift, BootstrapResult, ConfidenceInterval, ConfusionMatrix, Dataset, ModelClassifier, ModelEvaluation, PairedBootstrap, PruningCandidate, SearchResult
+from pandas import Categorical, CategoricalDtype, DataFrame, Series
+from numpy.lib.format import read_array, write_array
+from sklearn import __version__ as sklearn_version
+from pickle import HIGHEST_PROTOCOL, dumps as pickle_dumps, loads as pickle_loads
+from json import dumps, loads
+from dataclasses import asdict
+from datetime import datetime
+from hashlib import sha256
+import numpy as np
+
+SESSION_FORMAT_VERSION = 2
+SUPPORTED_SESSION_FORMAT_VERSIONS = [1, 2]
+
+def write_session(file_path: str, dataset: Dataset, timestamp: float | None = None, compress: bool = True) -> None:
+    metadata = {
+        "version": SESSION_FORMAT_VERSION,
+        "timestamp": timestamp if timestamp else datetime.now().timestamp(),
+        "loaded_msg": dataset.loaded_msg,
+        "load_rows": dataset.load_rows,
+        "loaded": dataset.loaded,
+        "path": dataset.path,
+        "hyperparameter_search_results": {classifier: [asdict(result) for result in results] for classifier, results in dataset.hyperparameter_search_results.items()},
+        "paired_bootstrap_results": [asdict(paired_bootstrap) for paired_bootstrap in dataset.paired_bootstrap_results],
+        "pruning_results": [asdict(candidate) for candidate in dataset.pruning_results],
+        "dataframes": {},
+        "evaluations": {},
+        "models": {},
+    }
+
+    with ZipFile(file_path, "w", compression=ZIP_DEFLATED if compress else ZIP_STORED) as archive:
+        for split, dataframe in zip(["train", "test"], [dataset.train_dataframe, dataset.test_dataframe]):
+            metadata["dataframes"][split] = write_dataframe(archive=archive, split=split, dataframe=dataframe)
+
+        for name, evaluation in [("k_nearest_neighbors", dataset.k_nearest_neighbors_evaluation), ("decision_tree", dataset.decision_tree_evaluation)]:
+            if evaluation:
+                metadata["evaluations"][name] = write_evaluation(archive=archive, name=name, evaluation=evaluation)
+
+        for name, model_classifier in [("k_nearest_neighbors", dataset.k_nearest_neighbors), ("decision_tree", dataset.decision_tree)]:
+            if model_classifier and model_classifier.model is not None:
+                metadata["models"][name] = write_model_classifier(archive=archive, name=name, model_classifier=model_classifier)
+
+        archive.writestr("metadata.json", dumps(metadata, indent=4))
+
+def write_dataframe(archive: ZipFile, split: str, dataframe: DataFrame) -> dict:
+    columns = {}
+    for column in dataframe.columns:
+        values = dataframe[column]
+        if isinstance(values.dtype, CategoricalDtype):
+            columns[column] = {"dtype": "category", "categories": values.cat.categories.astype(str).tolist()}
+            write_entry(archive=archive, name=f"{split}/{column}.npy", array=values.cat.codes.to_numpy())
+        else:
+            columns[column] = {"dtype": str(values.dtype)}
+            write_entry(archive=archive, name=f"{split}/{column}.npy", array=values.to_numpy())
+
+    return {"columns": columns, "rows": len(dataframe)}
+
+def write_evaluation(archive: ZipFile, name: str, evaluation: ModelEvaluation) -> dict:
+    predictions = Categorical(evaluation.precisions.astype(str))
+    write_entry(archive=archive, name=f"evaluations/{name}.npy", array=predictions.codes)
+    if evaluation.confusion_matrix:
+        write_entry(archive=archive, name=f"evaluations/{name}_confusion_matrix.npy", array=evaluation.confusion_matrix.counts)
+
+    return {
+        "classification_report": evaluation.classification_report,
+        "model": type(evaluation.model).__name__ if evaluation.model else None,
+        "approximation_drift": asdict(evaluation.approximation_drift) if evaluation.approximation_drift else None,
+        "bootstrap": asdict(evaluation.bootstrap) if evaluation.bootstrap else None,
+        "confusion_matrix_labels": evaluation.confusion_matrix.labels if evaluation.confusion_matrix else None,
+        "predictions_name": evaluation.precisions.name,
+        "predict_seconds": evaluation.predict_seconds,
+        "sample_latency": evaluation.sample_latency,
+        "fit_time": evaluation.fit_time,
+        "categories": predictions.categories.tolist(),
+        "accuracy": evaluation.accuracy,
+        "name": evaluation.name,
+    }
+
+def write_model_classifier(archive: ZipFile, name: str, model_classifier: ModelClassifier) -> dict:
+    payload = pickle_dumps(model_classifier.model, protocol=HIGHEST_PROTOCOL)
+    archive.writestr(f"models/{name}.pkl", payload)
+
+    return {
+        "model": type(model_classifier.model).__name__,
+        "sha256": sha256(payload).hexdigest(),
+        "sklearn_version": sklearn_version,
+        "fit_time": model_classifier.fit_time,
+        "name": model_classifier.name,
+    }
+
+def write_entry(archive: ZipFile, name: str, array: np.ndarray) -> None:
+    with archive.open(name, "w", force_zip64=True) as entry:
+        write_array(entry, np.ascontiguousarray(array), allow_pickle=False)
+
+def read_session(file_path: str) -> tuple[dict, DataFrame, DataFrame, dict[str, ModelEvaluation], dict[str, ModelClassifier]]:
+    with ZipFile(file_path, "r") as archive:
+        metadata = loads(archive.read("metadata.json"))
+        if metadata.get("version") not in SUPPORTED_SESSION_FORMAT_VERSIONS:
+            raise ValueError(f"Unsupported session format version {metadata.get('version')} in '{file_path}'")
+
+        train_dataframe, test_dataframe = [read_dataframe(archive=archive, split=split, metadata=metadata["dataframes"][split]) for split in ["train", "test"]]
+        evaluations = {name: read_evaluation(archive=archive, name=name, metadata=evaluation) for name, evaluation in metadata["evaluations"].items()}
+
+        model_classifiers = {}
+        for name, model_metadata in metadata.get("models", {}).items():
+            model_classifier = read_model_classifier(archive=archive, name=name, metadata=model_metadata)
+            if model_classifier:
+                model_classifiers[name] = model_classifier
+
+    return metadata, train_dataframe, test_dataframe, evaluations, model_classifiers
+
+def read_dataframe(archive: ZipFile, split: str, metadata: dict) -> DataFrame:
+    columns = {}
+    for column, column_metadata in metadata["columns"].items():
+        values = read_entry(archive=archive, name=f"{split}/{column}.npy")
+        if column_metadata["dtype"] == "category":
+            values = Categorical.from_codes(values, categories=column_metadata["categories"])
+        columns[column] = values
+
+    return DataFrame(columns)
+
+def read_evaluation(archive: ZipFile, name: str, metadata: dict) -> ModelEvaluation:
+    codes = read_entry(archive=archive, name=f"evaluations/{name}.npy")
+    predictions = Categorical.from_codes(codes, categories=metadata["categories"])
+
+    # Sessions saved before the metrics engine have no confusion matrix
+    confusion_matrix = None
+    if metadata.get("confusion_matrix_labels") is not None:
+        confusion_matrix = ConfusionMatrix(labels=metadata["confusion_matrix_labels"], counts=read_entry(archive=archive, name=f"evaluations/{name}_confusion_matrix.npy"))
+
+    return ModelEvaluation(
+        precisions=Series(np.asarray(predictions), name=metadata["predictions_name"]),
+        approximation_drift=ApproximationDrift(**metadata["approximation_drift"]) if metadata.get("approximation_drift") else None,
+        classification_report=metadata["classification_report"],
+        bootstrap=read_bootstrap(metadata["bootstrap"]) if metadata.get("bootstrap") else None,
+        confusion_matrix=confusion_matrix,
+        predict_seconds=metadata.get("predict_seconds"),
+        sample_latency=metadata.get("sample_latency"),
+        fit_time=metadata.get("fit_time"),
+        accuracy=metadata["accuracy"],
+        name=metadata["name"],
+        model=None,
+    )
+
+def read_bootstrap(metadata: dict) -> BootstrapResult:
+    return BootstrapResult(
+        f1_scores={label: ConfidenceInterval(**interval) for label, interval in metadata["f1_scores"].items()},
+        accuracy=ConfidenceInterval(**metadata["accuracy"]),
+        n_replicates=metadata["n_replicates"],
+        confidence=metadata["confidence"],
+    )
+
+def read_search_results(metadata: dict) -> dict[str, list[SearchResult]]:
+    return {classifier: [SearchResult(**result) for result in results] for classifier, results in metadata.get("hyperparameter_search_results", {}).items()}
+
+def read_pruning_results(metadata: dict) -> list[PruningCandidate]:
+    return [PruningCandidate(**candidate) for candidate in metadata.get("pruning_results", [])]
+
+def read_paired_bootstraps(metadata: dict) -> list[PairedBootstrap]:
+    return [
+        PairedBootstrap(
+            **{**paired_bootstrap, "accuracy_difference": ConfidenceInterval(**paired_bootstrap["accuracy_difference"]), "macro_f1_difference": ConfidenceInterval(**paired_bootstrap["macro_f1_difference"])}
+        )
+        for paired_bootstrap in metadata.get("paired_bootstrap_results", [])
+    ]
+
+def read_model_classifier(archive: ZipFile, name: str, metadata: dict) -> ModelClassifier | None:
+    payload = archive.read(f"models/{name}.pkl")
+    if sha256(payload).hexdigest() != metadata["sha256"]:
+        print(f"Skipping {metadata['name']}: the saved model failed its integrity check and has to be retrained.")
+        return None
+
+    if metadata["sklearn_version"] != sklearn_version:
+        print(f"Warning: {metadata['name']} was saved with scikit-learn {metadata['sklearn_version']}, running {sklearn_version}.")
+
+    # Session files are trusted local files written by write_session, never load sessions from unknown sources
+    return ModelClassifier(model=pickle_loads(payload), name=metadata["name"], fit_time=metadata.get("fit_time"))
+
+def read_entry(archive: ZipFile, name: str) -> np.ndarray:
+    with archive.open(name, "r") as entry:
+        return read_array(entry, allow_pickle=False)
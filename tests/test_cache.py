@@ -0,0 +1,86 @@
+from src.config.main import FEATURE_COLUMNS, TARGET_COLUMN
+from src.utils.cache import DatasetCache
+from os import path, remove, stat, utime
+from src.model.main import Model
+from pandas import DataFrame
+from shutil import copyfile
+import numpy as np
+import pytest
+
+DATASET_PATH = path.join(path.dirname(__file__), "..", "datasets", "Data_User_Modeling_Dataset_Hamdi Tolga KAHRAMAN.xls")
+
+def get_dataframes() -> tuple[DataFrame, DataFrame]:
+    dataframe = DataFrame(np.arange(12, dtype=np.float32).reshape(4, 3), columns=["STG", "SCG", "STR"])
+    return dataframe, dataframe.iloc[:2]
+
+@pytest.fixture
+def cache(tmp_path) -> DatasetCache:
+    return DatasetCache(folder=str(tmp_path / "cache"))
+
+@pytest.fixture
+def file_path(tmp_path) -> str:
+    file_path = str(tmp_path / "dataset.xls")
+    with open(file_path, "wb") as file:
+        file.write(b"original content")
+
+    return file_path
+
+def test_unchanged_file_is_a_hit(cache: DatasetCache, file_path: str) -> None:
+    assert cache.get(file_path) is None
+
+    cache.set(file_path=file_path, dataframes=get_dataframes())
+    train_dataframe, test_dataframe = cache.get(file_path)
+    assert train_dataframe.equals(get_dataframes()[0])
+    assert test_dataframe.equals(get_dataframes()[1].reset_index(drop=True))
+
+def test_touched_file_with_same_content_stays_fresh(cache: DatasetCache, file_path: str) -> None:
+    cache.set(file_path=file_path, dataframes=get_dataframes())
+    file_stat = stat(file_path)
+    utime(file_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 10 ** 9))
+
+    assert cache.get(file_path) is not None
+    assert cache.read_manifest(file_path)["mtime_ns"] == file_stat.st_mtime_ns + 10 ** 9
+
+@pytest.mark.parametrize("new_content", [b"changed content!", b"longer changed content"])
+def test_changed_file_invalidates_the_entry(cache: DatasetCache, file_path: str, new_content: bytes) -> None:
+    cache.set(file_path=file_path, dataframes=get_dataframes())
+    file_stat = stat(file_path)
+    with open(file_path, "wb") as file:
+        file.write(new_content)
+    # At the same size only the content hash tells the two files apart
+    if len(new_content) == file_stat.st_size:
+        utime(file_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 1))
+
+    assert cache.get(file_path) is None
+    assert not path.exists(cache.get_entry_path(file_path, "manifest.json"))
+    assert not path.exists(cache.get_entry_path(file_path, "train.parquet"))
+
+def test_removed_file_and_old_version_miss(cache: DatasetCache, file_path: str) -> None:
+    cache.set(file_path=file_path, dataframes=get_dataframes())
+    cache.version += 1
+    assert cache.get(file_path) is None
+
+    cache.set(file_path=file_path, dataframes=get_dataframes())
+    remove(file_path)
+    assert cache.get(file_path) is None
+    assert not path.exists(cache.get_entry_path(file_path, "manifest.json"))
+
+def test_entry_without_manifest_is_never_read(cache: DatasetCache, file_path: str) -> None:
+    cache.set(file_path=file_path, dataframes=get_dataframes())
+    remove(cache.get_entry_path(file_path, "manifest.json"))
+
+    assert cache.get(file_path) is None
+
+def test_read_file_returns_the_parsed_workbook_from_cache(tmp_path) -> None:
+    file_path = str(tmp_path / "workbook.xls")
+    copyfile(DATASET_PATH, file_path)
+    model = Model()
+    model.dataset_cache = DatasetCache(folder=str(tmp_path / "cache"))
+
+    parsed = model.read_file(file_path)
+    cached = model.read_file(file_path)
+    assert cached is not parsed
+    for dataframe, cached_dataframe in zip(parsed, cached):
+        assert cached_dataframe.columns.tolist() == FEATURE_COLUMNS + [TARGET_COLUMN]
+        assert cached_dataframe.dtypes.equals(dataframe.dtypes)
+        assert cached_dataframe.equals(dataframe)
@@ -0,0 +1,125 @@
+from src.model.metrics import ConfusionMatrixAccumulator, get_accuracy, get_classification_report, get_confusion_matrix
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from src.model.approximate import ApproximateKNeighborsClassifier
+from src.model.compiled_tree import CompiledDecisionTree
+from sklearn.neighbors import KNeighborsClassifier
+from src.model.online import OnlineKNeighborsClassifier
+from sklearn.tree import DecisionTreeClassifier
+from src.model.knn import BatchedKNeighbors
+import numpy as np
+import pytest
+
+def get_data(seed: int, n_rows: int = 600, n_features: int = 4, n_classes: int = 3, decimals: int | None = None, dtype: type = np.float32) -> tuple[np.ndarray, np.ndarray]:
+    random = np.random.default_rng(seed)
+    features = random.normal(size=(n_rows, n_features)).astype(dtype)
+    if decimals is not None:
+        features = features.round(decimals)
+
+    return features, np.array(["alpha", "beta", "gamma", "delta"][:n_classes])[random.integers(0, n_classes, size=n_rows)]
+
+@pytest.mark.parametrize("algorithm", ["brute", "kd_tree"])
+@pytest.mark.parametrize("weights", ["uniform", "distance"])
+@pytest.mark.parametrize("decimals", [None, 1])
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_batched_knn_matches_predict(algorithm: str, weights: str, decimals: int | None, dtype: type) -> None:
+    train_features, train_target = get_data(seed=0, decimals=decimals, dtype=dtype)
+    test_features, _ = get_data(seed=1, n_rows=300, decimals=decimals, dtype=dtype)
+    model = KNeighborsClassifier(n_neighbors=5, weights=weights, algorithm=algorithm).fit(train_features, train_target)
+
+    # A small budget splits the test rows over several blocks and threads
+    engine = BatchedKNeighbors(model=model, memory_budget=64 * 1024, max_workers=2)
+    np.testing.assert_array_equal(engine.predict(test_features), model.predict(test_features))
+
+def test_batched_knn_falls_back_without_private_attributes() -> None:
+    train_features, train_target = get_data(seed=0)
+    model = KNeighborsClassifier(n_neighbors=5).fit(train_features, train_target)
+    expected = model.predict(train_features)
+
+    # Stand-in for a scikit-learn release that renamed the fitted attributes
+    model.predict = lambda features: expected[:len(features)]
+    del model._fit_X
+
+    engine = BatchedKNeighbors(model=model)
+    assert engine.is_fallback
+    np.testing.assert_array_equal(engine.predict(train_features), expected)
+
+def test_approximate_knn_matches_exact_search_with_one_leaf() -> None:
+    train_features, train_target = get_data(seed=2)
+    test_features, _ = get_data(seed=3, n_rows=200)
+    model = ApproximateKNeighborsClassifier(n_neighbors=5, leaf_size=len(train_features)).fit(train_features, train_target)
+    exact_model = KNeighborsClassifier(n_neighbors=5, algorithm="brute").fit(train_features, train_target)
+
+    distances, neighbours = model.kneighbors(test_features)
+    exact_distances, exact_neighbours = exact_model.kneighbors(test_features)
+    np.testing.assert_array_equal(neighbours, exact_neighbours)
+    np.testing.assert_allclose(distances, exact_distances, rtol=1e-5)
+    np.testing.assert_array_equal(model.predict(test_features), exact_model.predict(test_features))
+
+def test_approximate_knn_never_beats_exact_distances() -> None:
+    train_features, train_target = get_data(seed=4, n_rows=2000)
+    test_features, _ = get_data(seed=5, n_rows=200)
+    model = ApproximateKNeighborsClassifier(n_neighbors=5, leaf_size=16).fit(train_features, train_target)
+    exact_distances, _ = KNeighborsClassifier(n_neighbors=5, algorithm="brute").fit(train_features, train_target).kneighbors(test_features)
+
+    distances, neighbours = model.kneighbors(test_features)
+    assert (np.diff(distances, axis=1) >= 0).all()
+    assert (distances >= exact_distances - 1e-5).all()
+    assert all(len(set(row)) == len(row) for row in neighbours.tolist())
+
+@pytest.mark.parametrize("weights", ["uniform", "distance"])
+@pytest.mark.parametrize("max_samples", [None, 700])
+def test_online_knn_matches_refit(weights: str, max_samples: int | None) -> None:
+    features, target = get_data(seed=6, n_rows=1000, n_classes=4)
+    test_features, _ = get_data(seed=7, n_rows=300)
+    model = KNeighborsClassifier(n_neighbors=5, weights=weights).fit(features[:400], target[:400])
+    online_model = OnlineKNeighborsClassifier.from_model(model, max_samples=max_samples)
+
+    # Uneven appends cross several rebuilds, the last class only shows up in the appended rows
+    for start, stop in [(400, 401), (401, 450), (450, 700), (700, 1000)]:
+        online_model.append(features[start:stop], target[start:stop])
+
+    live_rows = slice(None) if max_samples is None else slice(-max_samples, None)
+    refit_model = KNeighborsClassifier(n_neighbors=5, weights=weights, algorithm="brute").fit(features[live_rows], target[live_rows])
+    np.testing.assert_array_equal(online_model.train_target_, target[live_rows])
+    np.testing.assert_array_equal(online_model.predict(test_features), refit_model.predict(test_features))
+
+@pytest.mark.parametrize("max_depth", [4, None])
+def test_compiled_tree_matches_predict(max_depth: int | None) -> None:
+    features, target = get_data(seed=8, n_rows=800)
+    model = DecisionTreeClassifier(max_depth=max_depth, random_state=0).fit(features.astype(np.float64), target)
+    compiled_tree = CompiledDecisionTree.from_model(model)
+
+    # Every split threshold, and the floats right next to it, on its own feature
+    tree = model.tree_
+    split_nodes = np.flatnonzero(tree.children_left != -1)
+    samples = np.repeat(get_data(seed=9, n_rows=len(split_nodes))[0].astype(np.float64), 3, axis=0)
+    thresholds = tree.threshold[split_nodes]
+    adjacent = np.stack([np.nextafter(thresholds, -np.inf), thresholds, np.nextafter(thresholds, np.inf)], axis=1).ravel()
+    samples[np.arange(len(samples)), np.repeat(tree.feature[split_nodes], 3)] = adjacent
+    samples = np.concatenate([samples, get_data(seed=10, n_rows=300)[0].astype(np.float64)])
+
+    expected = model.predict(samples)
+    np.testing.assert_array_equal(compiled_tree.predict(samples), expected)
+    assert [compiled_tree.predict_one(sample) for sample in samples] == expected.tolist()
+    assert [compiled_tree.walk(sample.tolist()) for sample in samples] == expected.tolist()
+
+@pytest.mark.parametrize("seed", range(5))
+def test_metrics_match_scikit_learn(seed: int) -> None:
+    _, target = get_data(seed=11 + seed, n_rows=500, n_classes=3)
+    _, predictions = get_data(seed=111 + seed, n_rows=500, n_classes=4)
+    labels = sorted(set(target) | set(predictions))
+
+    # Same formulas in the same float64 order, so even the scores compare exactly
+    matrix = get_confusion_matrix(target, predictions)
+    assert matrix.labels == labels
+    assert np.array_equal(matrix.counts, confusion_matrix(target, predictions, labels=labels))
+    assert get_accuracy(matrix) == accuracy_score(target, predictions)
+    assert get_classification_report(matrix) == classification_report(target, predictions, output_dict=True, zero_division=0)
+
+    accumulator = ConfusionMatrixAccumulator()
+    for start in range(0, len(target), 128):
+        accumulator.update(target[start:start + 128], predictions[start:start + 128])
+
+    accumulated_matrix = accumulator.to_confusion_matrix()
+    assert accumulated_matrix.labels == labels
+    assert np.array_equal(accumulated_matrix.counts, matrix.counts)
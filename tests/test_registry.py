@@ -0,0 +1,83 @@
+from src.model.registry import DatasetRegistry
+from src.types.dataclass import Dataset
+from src.model.main import Model
+from pandas import DataFrame
+import numpy as np
+import pytest
+
+def get_dataset(file_path: str, n_rows: int = 1000) -> Dataset:
+    dataframe = DataFrame({"STG": np.zeros(n_rows, dtype=np.float64)})
+    dataset = Model().create_dataset(file_path=file_path, dataframes=(dataframe, dataframe.iloc[:0]), load_rows=10)
+    # Reading the frames makes the dataset count against the budget
+    _ = dataset.dataframes
+    return dataset
+
+@pytest.fixture
+def file_paths(tmp_path) -> list[str]:
+    file_paths = []
+    for i in range(3):
+        file_path = str(tmp_path / f"dataset_{i}.csv")
+        with open(file_path, "w") as file:
+            file.write(f"content {i}")
+        file_paths.append(file_path)
+
+    return file_paths
+
+def test_key_follows_the_content(file_paths: list[str]) -> None:
+    registry = DatasetRegistry()
+    key = registry.get_key(file_paths[0])
+    assert registry.get_key(file_paths[0]) == key
+
+    with open(file_paths[0], "w") as file:
+        file.write("new content")
+    new_key = registry.get_key(file_paths[0])
+    assert new_key[0] == key[0] and new_key[1] != key[1]
+
+def test_new_content_replaces_the_stale_entry(file_paths: list[str]) -> None:
+    registry = DatasetRegistry()
+    key = registry.get_key(file_paths[0])
+    registry.add(key=key, dataset=get_dataset(file_paths[0]))
+
+    with open(file_paths[0], "w") as file:
+        file.write("new content")
+    new_key = registry.get_key(file_paths[0])
+    registry.add(key=new_key, dataset=get_dataset(file_paths[0]))
+
+    assert list(registry.datasets) == [new_key]
+    assert registry.get(key) is None
+
+def test_least_recently_used_dataset_is_evicted_first(file_paths: list[str]) -> None:
+    dataset_size = DatasetRegistry().get_dataset_memory_usage(get_dataset(file_paths[0]))
+    registry = DatasetRegistry(memory_budget=2 * dataset_size)
+    keys = [registry.get_key(file_path) for file_path in file_paths]
+
+    registry.add(key=keys[0], dataset=get_dataset(file_paths[0]))
+    registry.add(key=keys[1], dataset=get_dataset(file_paths[1]))
+    assert registry.get(keys[0]) is not None
+
+    registry.add(key=keys[2], dataset=get_dataset(file_paths[2]))
+    assert list(registry.datasets) == [keys[0], keys[2]]
+    assert (registry.hits, registry.misses) == (1, 0)
+
+def test_pinned_dataset_is_never_evicted(file_paths: list[str]) -> None:
+    dataset_size = DatasetRegistry().get_dataset_memory_usage(get_dataset(file_paths[0]))
+    registry = DatasetRegistry(memory_budget=dataset_size)
+    keys = [registry.get_key(file_path) for file_path in file_paths]
+
+    registry.add(key=keys[0], dataset=get_dataset(file_paths[0]))
+    registry.pin(keys[0])
+    registry.add(key=keys[1], dataset=get_dataset(file_paths[1]))
+    assert list(registry.datasets) == [keys[0]]
+
+    # Unpinned, the active dataset is just the least recently used one
+    registry.pin(keys[2])
+    registry.add(key=keys[2], dataset=get_dataset(file_paths[2]))
+    assert list(registry.datasets) == [keys[2]]
+
+def test_lazy_datasets_do_not_count_against_the_budget(file_paths: list[str]) -> None:
+    registry = DatasetRegistry(memory_budget=0)
+    dataset = Model().create_dataset(file_path=file_paths[0], dataframes=(DataFrame({"STG": np.zeros(1000)}), DataFrame({"STG": []})), load_rows=10)
+
+    registry.add(key=registry.get_key(file_paths[0]), dataset=dataset)
+    assert registry.get_memory_usage() == 0
+    assert len(registry.datasets) == 1
@@ -0,0 +1,88 @@
+from asyncio import gather, open_connection, run, sleep, start_server
+from src.server.main import PredictionServer
+from src.server.batching import MicroBatcher
+from time import perf_counter
+import numpy as np
+import pytest
+
+def get_samples(first_row: int, n_rows: int) -> np.ndarray:
+    return np.arange(first_row, first_row + n_rows, dtype=np.float32)[:, None].repeat(2, axis=1)
+
+def test_results_are_split_back_across_batches() -> None:
+    batch_sizes = []
+
+    def predict(samples: np.ndarray) -> list:
+        batch_sizes.append(len(samples))
+        return samples[:, 0].astype(int).tolist()
+
+    async def submit_all() -> tuple[list[list], list]:
+        batcher = MicroBatcher(predict=predict, max_batch_size=4, max_wait=0.01)
+        batcher.start()
+        sizes = [3, 1, 2, 5, 1, 1, 2]
+        starts = np.cumsum([0] + sizes[:-1])
+        results = await gather(*(batcher.submit(get_samples(start, size)) for start, size in zip(starts, sizes)))
+        batcher.stop()
+
+        stats = batcher.get_stats()
+        assert (stats.requests, stats.samples, stats.batches, stats.errors) == (len(sizes), sum(sizes), len(batch_sizes), 0)
+        return [list(range(start, start + size)) for start, size in zip(starts, sizes)], results
+
+    expected, results = run(submit_all())
+    assert results == expected
+    assert len(batch_sizes) > 1
+    # A batch is closed once it holds max_batch_size samples, only its last request can overshoot
+    assert all(size <= 3 + 5 for size in batch_sizes)
+
+def test_partial_batch_is_flushed_after_max_wait() -> None:
+    calls = []
+
+    async def submit_one() -> tuple[list, float]:
+        batcher = MicroBatcher(predict=lambda samples: calls.append(len(samples)) or ["ok"] * len(samples), max_batch_size=100, max_wait=0.05)
+        batcher.start()
+        started_at = perf_counter()
+        result = await batcher.submit(get_samples(0, 2))
+        batcher.stop()
+        return result, perf_counter() - started_at
+
+    result, seconds = run(submit_one())
+    assert result == ["ok", "ok"]
+    assert calls == [2]
+    assert 0.04 <= seconds < 1
+
+def test_failing_batch_fails_every_request_in_it() -> None:
+    def predict(samples: np.ndarray) -> list:
+        raise RuntimeError("model failed")
+
+    async def submit_all() -> tuple[list, MicroBatcher]:
+        batcher = MicroBatcher(predict=predict, max_batch_size=10, max_wait=0.01)
+        batcher.start()
+        results = await gather(*(batcher.submit(get_samples(start, 1)) for start in range(3)), return_exceptions=True)
+
+        # The batcher keeps serving after a failed batch
+        batcher.predict = lambda samples: ["ok"] * len(samples)
+        results.append(await batcher.submit(get_samples(3, 1)))
+        batcher.stop()
+        return results, batcher
+
+    results, batcher = run(submit_all())
+    assert all(isinstance(result, RuntimeError) and str(result) == "model failed" for result in results[:3])
+    assert results[3] == ["ok"]
+    assert batcher.errors == 3
+
+@pytest.mark.parametrize("request_head", [b"GARBAGE\r\n\r\n", b"POST /predict HTTP/1.1\r\nContent-Length: abc\r\n\r\n", b"POST /predict HTTP/1.1\r\nContent-Length: -5\r\n\r\n"])
+def test_malformed_request_gets_400(request_head: bytes) -> None:
+    async def send() -> bytes:
+        server = await start_server(PredictionServer(model=None).handle_connection, host="127.0.0.1", port=0)
+        async with server:
+            reader, writer = await open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(request_head)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            # Let the handler finish closing its side before the loop shuts down
+            await sleep(0)
+            return response
+
+    response = run(send())
+    assert response.startswith(b"HTTP/1.1 400 Bad Request\r\n")
+    assert b"Connection: close" in response
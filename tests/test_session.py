@@ -0,0 +1,107 @@
+from src.types.dataclass import ConfidenceInterval, PairedBootstrap, PruningCandidate, SearchResult
+from src.config.main import FEATURE_COLUMNS, TARGET_COLUMN
+from src.utils.session import read_session, write_session
+from zipfile import ZIP_STORED, ZipFile
+from src.model.main import Model
+from json import dumps, loads
+from pandas import DataFrame
+import numpy as np
+import pytest
+
+def get_dataframe(seed: int, n_rows: int) -> DataFrame:
+    random = np.random.default_rng(seed)
+    dataframe = DataFrame(random.random((n_rows, len(FEATURE_COLUMNS)), dtype=np.float32), columns=FEATURE_COLUMNS)
+    dataframe[TARGET_COLUMN] = random.choice(np.array(["High", "Low", "Middle", "very_low"]), size=n_rows)
+    return dataframe.astype({TARGET_COLUMN: "category"})
+
+@pytest.fixture
+def trained_model(tmp_path, monkeypatch) -> Model:
+    # The training cache writes under the working directory
+    monkeypatch.chdir(tmp_path)
+
+    model = Model()
+    model.set_active_dataset(model.create_dataset(file_path="datasets/example.xls", dataframes=(get_dataframe(seed=0, n_rows=300), get_dataframe(seed=1, n_rows=120)), load_rows=10))
+    model.train_model(classifier="Decision Tree", random_state=42, n_neighbors=None)
+    model.train_model(classifier="K Nearest Neighbors", random_state=42, n_neighbors=3)
+
+    evaluate_model = model.get_evaluate_model()
+    monkeypatch.setattr(evaluate_model, "load_additional_dataset_for_evaluation", lambda: None)
+    model.dataset.decision_tree_evaluation = evaluate_model.evaluate(model.dataset.decision_tree)
+
+    interval = ConfidenceInterval(estimate=0.1, lower=-0.05, upper=0.2)
+    model.dataset.hyperparameter_search_results = {"Decision Tree": [SearchResult(parameters={"max_depth": 4}, mean_score=0.8, std_score=0.02, classifier="Decision Tree", fit_time=0.001, rank=1)]}
+    model.dataset.pruning_results = [PruningCandidate(ccp_alpha=0.01, node_count=9, depth=3, accuracy=0.7, sample_latency=1e-6, fit_time=0.002, selected=True)]
+    model.dataset.paired_bootstrap_results = [PairedBootstrap(first_name="K Nearest Neighbors", second_name="Decision Tree", accuracy_difference=interval, macro_f1_difference=interval, probability_first_better=0.8, n_replicates=100, confidence=0.95)]
+    return model
+
+def rewrite_entry(file_path: str, name: str, payload: bytes) -> None:
+    with ZipFile(file_path, "r") as archive:
+        entries = {entry: archive.read(entry) for entry in archive.namelist()}
+
+    entries[name] = payload
+    with ZipFile(file_path, "w", compression=ZIP_STORED) as archive:
+        for entry, entry_payload in entries.items():
+            archive.writestr(entry, entry_payload)
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_session_round_trip(trained_model: Model, tmp_path, compress: bool) -> None:
+    dataset = trained_model.dataset
+    session_path = str(tmp_path / "session.npz")
+    write_session(file_path=session_path, dataset=dataset, timestamp=1.0, compress=compress)
+
+    restored_model = Model()
+    restored = restored_model.load_progress(session_path)
+
+    for frame, restored_frame in [(dataset.train_dataframe, restored.train_dataframe), (dataset.test_dataframe, restored.test_dataframe)]:
+        assert restored_frame.dtypes.equals(frame.dtypes)
+        assert restored_frame.equals(frame)
+
+    for name in ["decision_tree", "k_nearest_neighbors"]:
+        model_classifier, restored_classifier = getattr(dataset, name), getattr(restored, name)
+        assert restored_classifier.name == model_classifier.name
+        assert restored_classifier.fit_time == model_classifier.fit_time
+        assert np.array_equal(restored_classifier.model.predict(restored.test_features), model_classifier.model.predict(dataset.test_features))
+
+    evaluation, restored_evaluation = dataset.decision_tree_evaluation, restored.decision_tree_evaluation
+    assert restored_evaluation.precisions.equals(evaluation.precisions.reset_index(drop=True))
+    assert restored_evaluation.classification_report == evaluation.classification_report
+    assert restored_evaluation.confusion_matrix.labels == evaluation.confusion_matrix.labels
+    assert np.array_equal(restored_evaluation.confusion_matrix.counts, evaluation.confusion_matrix.counts)
+    assert restored_evaluation.model is restored.decision_tree.model
+    assert restored.k_nearest_neighbors_evaluation is None
+
+    assert restored.hyperparameter_search_results == dataset.hyperparameter_search_results
+    assert restored.paired_bootstrap_results == dataset.paired_bootstrap_results
+    assert restored.pruning_results == dataset.pruning_results
+    assert restored.path == dataset.path and restored.load_rows == dataset.load_rows
+
+def test_tampered_model_is_skipped(trained_model: Model, tmp_path, capsys) -> None:
+    session_path = str(tmp_path / "session.npz")
+    write_session(file_path=session_path, dataset=trained_model.dataset)
+    rewrite_entry(session_path, "models/decision_tree.pkl", b"not the pickled model")
+
+    _, _, _, _, model_classifiers = read_session(session_path)
+    assert list(model_classifiers) == ["k_nearest_neighbors"]
+    assert "failed its integrity check" in capsys.readouterr().out
+
+def test_other_sklearn_version_warns(trained_model: Model, tmp_path, capsys) -> None:
+    session_path = str(tmp_path / "session.npz")
+    write_session(file_path=session_path, dataset=trained_model.dataset)
+    with ZipFile(session_path, "r") as archive:
+        metadata = loads(archive.read("metadata.json"))
+    metadata["models"]["decision_tree"]["sklearn_version"] = "0.0.1"
+    rewrite_entry(session_path, "metadata.json", dumps(metadata).encode())
+
+    _, _, _, _, model_classifiers = read_session(session_path)
+    assert set(model_classifiers) == {"decision_tree", "k_nearest_neighbors"}
+    assert "saved with scikit-learn 0.0.1" in capsys.readouterr().out
+
+def test_unsupported_version_is_rejected(trained_model: Model, tmp_path) -> None:
+    session_path = str(tmp_path / "session.npz")
+    write_session(file_path=session_path, dataset=trained_model.dataset)
+    with ZipFile(session_path, "r") as archive:
+        metadata = loads(archive.read("metadata.json"))
+    rewrite_entry(session_path, "metadata.json", dumps({**metadata, "version": 99}).encode())
+
+    with pytest.raises(ValueError, match="Unsupported session format version 99"):
+        read_session(session_path)
@@ -0,0 +1,61 @@
+from src.model.statistics import StatisticsAccumulator, append_basic_statistics, merge_basic_statistics
+from pandas import DataFrame, concat
+import numpy as np
+import pytest
+
+def get_dataframe(seed: int, n_rows: int) -> DataFrame:
+    random = np.random.default_rng(seed)
+    dataframe = DataFrame({
+        "STG": random.normal(loc=0.4, scale=0.2, size=n_rows),
+        "PEG": random.exponential(size=n_rows).astype(np.float32),
+        "UNS": random.choice(np.array(["High", "Low", "Middle"]), size=n_rows),
+    })
+    dataframe.loc[random.random(n_rows) < 0.05, "STG"] = np.nan
+    return dataframe
+
+def get_statistics(dataframes: list[DataFrame]) -> StatisticsAccumulator:
+    accumulator = StatisticsAccumulator()
+    for dataframe in dataframes:
+        accumulator.update(dataframe)
+
+    return accumulator
+
+def assert_matches_describe(summary: DataFrame, dataframe: DataFrame) -> None:
+    expected = dataframe.describe()
+    assert summary.columns.tolist() == expected.columns.tolist()
+    assert summary.index.tolist() == expected.index.tolist()
+    np.testing.assert_allclose(summary.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64), rtol=1e-6)
+
+def test_chunked_statistics_match_describe() -> None:
+    dataframe = get_dataframe(seed=0, n_rows=1500)
+    basic_statistics = get_statistics([dataframe.iloc[start:start + 256] for start in range(0, len(dataframe), 256)]).to_basic_statistics()
+
+    assert_matches_describe(basic_statistics.summary, dataframe)
+    assert basic_statistics.missing_values.equals(dataframe.isnull().sum())
+    assert basic_statistics.data_types.equals(dataframe.dtypes)
+
+def test_appended_and_merged_statistics_match_describe() -> None:
+    first, second = get_dataframe(seed=1, n_rows=700), get_dataframe(seed=2, n_rows=300)
+    expected_dataframe = concat([first, second], ignore_index=True)
+
+    appended = append_basic_statistics(get_statistics([first]).to_basic_statistics(), second)
+    assert_matches_describe(appended.summary, expected_dataframe)
+    assert appended.missing_values.equals(expected_dataframe.isnull().sum())
+
+    merged = merge_basic_statistics(get_statistics([first]).to_basic_statistics(), get_statistics([second]).to_basic_statistics())
+    assert_matches_describe(merged.summary, expected_dataframe)
+
+def test_sketch_quantiles_stay_within_rank_error() -> None:
+    dataframe = get_dataframe(seed=3, n_rows=200_000)
+    summary = get_statistics([dataframe.iloc[start:start + 10_000] for start in range(0, len(dataframe), 10_000)]).to_basic_statistics().summary
+    expected = dataframe.describe()
+
+    # Mean, std and extremes are exact, the quantiles come from the compacted sketch
+    for row in ["count", "mean", "std", "min", "max"]:
+        np.testing.assert_allclose(summary.loc[row], expected.loc[row], rtol=1e-6)
+
+    for column in ["STG", "PEG"]:
+        values = np.sort(dataframe[column].dropna().to_numpy(dtype=np.float64))
+        for percentile in [0.25, 0.5, 0.75]:
+            rank = np.searchsorted(values, summary.loc[f"{percentile * 100:g}%", column]) / len(values)
+            assert rank == pytest.approx(percentile, abs=0.01)